@@ -2,6 +2,7 @@ import customtkinter as ctk
 from tkinter import messagebox
 import pyautogui
 import os
+import multiprocessing
 
 from ui.theme import Theme, init_theme
 from ui.widgets import AnimatedButton
@@ -25,6 +26,7 @@ from input.controller import InputController
 from input.keyboard import setup_shortcuts
 from utils.version import VersionChecker, open_bilibili, open_tool_intro
 from utils.tesseract import TesseractManager
+from utils.ocr_executor import limit_engine_threads
 from modules.ocr import OCRModule
 from modules.timed import TimedModule
 from modules.number import NumberModule
@@ -187,6 +189,8 @@ class AutoDoorOCR:
         self.color_var = tk.StringVar(value="未选择颜色")
         self.tolerance_var = tk.StringVar(value="10")
         self.interval_var = tk.StringVar(value="5")
+        self.color_probes_var = tk.StringVar(value="")
+        self.color_probe_mode_var = tk.StringVar(value="全部")
 
     def _create_layout(self):
         self._create_header()
@@ -522,4 +526,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # OCR 工作进程使用 spawn 方式启动，打包后的可执行文件需要 freeze_support
+    multiprocessing.freeze_support()
+    # 在创建任何 OCR 引擎和工作进程之前限制 tesseract 的 OpenMP 线程数
+    limit_engine_threads()
     main()
@@ -98,6 +98,7 @@ a = Analysis(
         'PIL.Image',
         'PIL.ImageGrab',
         'pytesseract',
+        'tesserocr',
         'screeninfo',
         'screeninfo.common',
         'pynput',
@@ -103,6 +103,7 @@ a = Analysis(
         'PIL.Image',
         'PIL.ImageGrab',
         'pytesseract',
+        'tesserocr',
         'screeninfo',
         'screeninfo.common',
         'pynput',
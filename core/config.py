@@ -152,7 +152,9 @@ class ConfigManager:
             # 首页功能状态勾选框配置
             'home_checkboxes': self._get_home_checkboxes_config(),
             # 脚本和颜色识别配置
-            'script': self._get_script_config()
+            'script': self._get_script_config(),
+            # 帧历史（调试）配置
+            'frame_history': self._get_frame_history_config()
         }
         return config
     
@@ -487,6 +489,19 @@ class ConfigManager:
                     if module in home_checkboxes and module in self.app.module_check_vars:
                         self.app.module_check_vars[module].set(home_checkboxes[module])
     
+    def load_frame_history_config(self, config):
+        """加载帧历史配置"""
+        history_config = self.get_config_value(config, 'frame_history', {})
+        if not hasattr(self.app, 'frame_history_enabled'):
+            return
+        if 'enabled' in history_config:
+            self.app.frame_history_enabled.set(bool(history_config['enabled']))
+        if 'budget_mb' in history_config:
+            try:
+                self.app.frame_history_budget.set(str(int(float(history_config['budget_mb']))))
+            except (ValueError, TypeError):
+                pass
+    
     def load_script_config(self, config):
         """加载脚本和颜色识别配置"""
         script_config = self.get_config_value(config, 'script', {})
@@ -547,6 +562,13 @@ class ConfigManager:
             except (ValueError, TypeError):
                 self.app.interval_var.set("5")
 
+        # 加载颜色探针
+        if 'color_probes' in script_config and hasattr(self.app, 'color_probes_var'):
+            from modules.color import PROBE_MODES
+            self.app.color_probes_var.set(script_config['color_probes'] or '')
+            labels = {mode: label for label, mode in PROBE_MODES.items()}
+            self.app.color_probe_mode_var.set(labels.get(script_config.get('color_probe_mode'), '全部'))
+
         # 加载颜色识别启用状态
         if 'color_recognition_enabled' in script_config and hasattr(self.app, 'color_enabled'):
             color_recognition_enabled = script_config['color_recognition_enabled']
@@ -640,7 +662,11 @@ class ConfigManager:
                 'alarm': group['alarm'].get(),
                 'keywords': group['keywords'].get(),
                 'language': group['language'].get(),
-                'click': group['click'].get()
+                'click': group['click'].get(),
+                'incremental': group['incremental'].get(),
+                'ocr_scale': group['ocr_scale'].get(),
+                'prefilter': group['prefilter'].get(),
+                'prefilter_sensitivity': group['prefilter_sensitivity'].get()
             })
         return {
             'groups': ocr_groups_config
@@ -765,6 +791,15 @@ class ConfigManager:
             'background': self.app.module_check_vars.get('background', tk.BooleanVar(value=False)).get()
         }
     
+    def _get_frame_history_config(self):
+        """获取帧历史配置"""
+        if not hasattr(self.app, 'frame_history_enabled'):
+            return {}
+        return {
+            'enabled': self.app.frame_history_enabled.get(),
+            'budget_mb': self.app.frame_history_budget.get()
+        }
+    
     def _get_script_config(self):
         """获取脚本和颜色识别配置"""
         # 获取脚本内容
@@ -805,6 +840,14 @@ class ConfigManager:
             except (ValueError, TypeError):
                 color_interval = 5
         
+        # 获取颜色探针（"x,y:R,G,B; ..." 文本，容差沿用 color_tolerance）
+        color_probes = ''
+        color_probe_mode = 'all'
+        if hasattr(self.app, 'color_probes_var'):
+            from modules.color import PROBE_MODES
+            color_probes = self.app.color_probes_var.get()
+            color_probe_mode = PROBE_MODES.get(self.app.color_probe_mode_var.get(), 'all')
+        
         # 获取颜色识别启用状态
         color_recognition_enabled = False
         if hasattr(self.app, 'color_enabled'):
@@ -839,6 +882,8 @@ class ConfigManager:
             'target_color': target_color,
             'color_tolerance': color_tolerance,
             'color_interval': color_interval,
+            'color_probes': color_probes,
+            'color_probe_mode': color_probe_mode,
             'color_recognition_enabled': color_recognition_enabled,
             'delay_var': delay_var,
             'combo_key_delay': combo_key_delay,
@@ -895,6 +940,7 @@ class ConfigManager:
             self.load_shortcuts_config(config)
             self.load_home_checkboxes_config(config)
             self.load_script_config(config)
+            self.load_frame_history_config(config)
 
             self.app.logging_manager.log_message("配置加载成功")
             return True, config_version
@@ -974,6 +1020,10 @@ class ConfigManager:
             group["keywords"].trace_add("write", immediate_save)
             group["language"].trace_add("write", immediate_save)
             group["click"].trace_add("write", immediate_save)
+            group["incremental"].trace_add("write", immediate_save)
+            group["ocr_scale"].trace_add("write", immediate_save)
+            group["prefilter"].trace_add("write", immediate_save)
+            group["prefilter_sensitivity"].trace_add("write", immediate_save)
 
         for group in self.app.ocr_groups:
             setup_ocr_group_listeners(group)
@@ -1058,6 +1108,10 @@ class ConfigManager:
         if hasattr(self.app, 'interval_var'):
             self.app.interval_var.trace_add("write", immediate_save)
         
+        if hasattr(self.app, 'color_probes_var'):
+            self.app.color_probes_var.trace_add("write", immediate_save)
+            self.app.color_probe_mode_var.trace_add("write", immediate_save)
+        
         if hasattr(self.app, 'delay_var'):
             self.app.delay_var.trace_add("write", immediate_save)
         
@@ -1066,6 +1120,10 @@ class ConfigManager:
         
         if hasattr(self.app, 'combo_after_delay'):
             self.app.combo_after_delay.trace_add("write", immediate_save)
+        
+        if hasattr(self.app, 'frame_history_enabled'):
+            self.app.frame_history_enabled.trace_add("write", immediate_save)
+            self.app.frame_history_budget.trace_add("write", immediate_save)
 
     def clear_ocr_groups(self):
         """清空所有OCR组"""
@@ -1080,6 +1138,8 @@ class ConfigManager:
             group_config: 从配置文件读取的组配置
         """
         from ui.utils import update_group_style
+        from utils.recognition import OCR_SCALE_LIMITS
+        from utils.text_presence import DEFAULT_SENSITIVITY
 
         def set_key_value(val):
             if hasattr(group['key'], 'set'):
@@ -1096,18 +1156,41 @@ class ConfigManager:
             except (ValueError, TypeError):
                 var.set(str(default))
 
+        def safe_set_seconds(var, val, default=0):
+            # 间隔和暂停支持小数秒，整数值仍按整数显示
+            try:
+                seconds = float(val)
+                var.set(str(int(seconds)) if seconds.is_integer() else str(seconds))
+            except (ValueError, TypeError):
+                var.set(str(default))
+
+        def safe_set_float(var, val, default, minimum, maximum):
+            # 倍数等小数配置，超出范围时取边界值
+            try:
+                value = float(val)
+            except (ValueError, TypeError):
+                value = default
+            if value != value:
+                value = default
+            var.set(f"{min(maximum, max(minimum, value)):g}")
+
         config_mappings = {
             'enabled': lambda val: self.load_enabled_config(group, val),
             'region': lambda val: self.load_region_config(group, val),
-            'interval': lambda val: safe_set_int(group['interval'], val, 5),
-            'pause': lambda val: safe_set_int(group['pause'], val, 180),
+            'interval': lambda val: safe_set_seconds(group['interval'], val, 5),
+            'pause': lambda val: safe_set_seconds(group['pause'], val, 180),
             'key': set_key_value,
             'delay_min': lambda val: safe_set_int(group['delay_min'], val, 300),
             'delay_max': lambda val: safe_set_int(group['delay_max'], val, 500),
             'alarm': lambda val: group['alarm'].set(bool(val)),
             'keywords': lambda val: group['keywords'].set(str(val) if val else ''),
             'language': lambda val: group['language'].set(str(val) if val else 'eng'),
-            'click': lambda val: group['click'].set(bool(val))
+            'click': lambda val: group['click'].set(bool(val)),
+            'incremental': lambda val: group['incremental'].set(bool(val)),
+            'ocr_scale': lambda val: safe_set_float(group['ocr_scale'], val, 1.0, *OCR_SCALE_LIMITS),
+            'prefilter': lambda val: group['prefilter'].set(bool(val)),
+            'prefilter_sensitivity': lambda val: safe_set_float(group['prefilter_sensitivity'], val,
+                                                                DEFAULT_SENSITIVITY, 0.0, 1.0)
         }
 
         for key, setter in config_mappings.items():
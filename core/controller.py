@@ -3,6 +3,10 @@
 """
 import tkinter as tk
 from ui.theme import Theme
+from utils.frame import get_crop_cache
+from utils.screenshot import FrameBus, ScreenshotManager
+from utils.frame_history import DEFAULT_BUDGET_MB as FRAME_HISTORY_DEFAULT_BUDGET_MB
+from utils.recognition import get_ocr_cache
 
 
 class ModuleController:
@@ -46,6 +50,11 @@ class ModuleController:
         self.app.logging_manager.log_message("开始运行")
 
         self.app.system_stopped = False
+        get_crop_cache().reset_stats()
+        FrameBus().reset_stats()
+        ScreenshotManager().reset_cache_stats()
+        self._apply_frame_history()
+        get_ocr_cache().reset_stats()
 
         if hasattr(self.app, 'module_switches'):
             for switch in self.app.module_switches.values():
@@ -85,6 +94,20 @@ class ModuleController:
         
         self.app.is_running = True
 
+    def _apply_frame_history(self):
+        """按设置启用或停用帧历史（触发时保存最近画面）"""
+        screenshot_manager = ScreenshotManager()
+        if not (hasattr(self.app, 'frame_history_enabled') and self.app.frame_history_enabled.get()):
+            screenshot_manager.disable_history()
+            return
+
+        try:
+            budget_mb = max(1, int(self.app.frame_history_budget.get()))
+        except (ValueError, TypeError, tk.TclError):
+            budget_mb = FRAME_HISTORY_DEFAULT_BUDGET_MB
+        screenshot_manager.enable_history(budget_mb)
+        self.app.logging_manager.log_message(f"帧历史已启用，内存预算 {budget_mb}MB")
+
     def stop_all(self):
         """停止运行"""
         self.app.logging_manager.log_message("停止运行")
@@ -120,6 +143,23 @@ class ModuleController:
 
         self.app.event_manager.clear_events()
 
+        frame_bus = FrameBus()
+        if frame_bus.get_stats()["frame_count"]:
+            self.app.logging_manager.log_message(frame_bus.format_stats())
+
+        screenshot_manager = ScreenshotManager()
+        if screenshot_manager.get_cache_stats()["misses"]:
+            self.app.logging_manager.log_message(screenshot_manager.format_cache_stats())
+
+        crop_cache = get_crop_cache()
+        if crop_cache.get_stats()["misses"]:
+            self.app.logging_manager.log_message(crop_cache.format_stats())
+        crop_cache.clear()
+
+        ocr_cache = get_ocr_cache()
+        if ocr_cache.get_stats()["misses"]:
+            self.app.logging_manager.log_message(ocr_cache.format_stats())
+
         self.app.alarm_module.play_stop_sound()
 
         if hasattr(self.app, 'module_switches'):
@@ -181,6 +181,10 @@ class ColorProxy:
         """选择颜色"""
         self.app.color_recognition_manager.select_color()
     
+    def add_probe(self):
+        """拾取一个颜色探针"""
+        self.app.color_recognition_manager.add_probe()
+    
     def start_recognition(self):
         """开始颜色识别"""
         self.app.color_recognition_manager.start_color_recognition()
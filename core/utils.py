@@ -1,5 +1,9 @@
+import datetime
+import os
+import threading
 import tkinter as tk
 from tkinter import messagebox
+from utils.screenshot import ScreenshotManager
 
 
 def handle_error(func, logging_manager=None, *args, **kwargs):
@@ -52,6 +56,32 @@ def delete_group_by_button(app, button, groups, group_type, delete_func):
     messagebox.showerror("错误", f"无法找到对应的{group_type}，请重试！")
 
 
+def dump_trigger_frames(app, label, region=None):
+    """触发时把帧历史中最近的画面保存到 <配置目录>/frame_dumps/<时间>_<label>/（设置中启用帧历史后生效）
+    Args:
+        app: 主应用实例
+        label: 触发来源（用于目录名和日志），如 "识别组1"
+        region: 只保存该区域，None 表示所有监控区域
+    """
+    screenshot_manager = ScreenshotManager()
+    if screenshot_manager.history is None:
+        return
+
+    directory = os.path.join(os.path.dirname(app.config_file_path), "frame_dumps",
+                             f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{label}")
+
+    def dump():
+        try:
+            count = screenshot_manager.dump_history(directory, region)
+        except Exception as e:
+            app.logging_manager.log_message(f"{label}保存触发前画面失败: {str(e)}")
+            return
+        if count:
+            app.logging_manager.log_message(f"{label}触发前画面已保存({count}张): {directory}")
+
+    threading.Thread(target=dump, daemon=True).start()
+
+
 def exit_program(app):
     """退出程序
     Args:
@@ -6,11 +6,12 @@ from typing import Optional, Dict, Any
 
 from utils.window_capture import (
     capture_window_region, find_window_by_title, 
-    get_window_rect, get_window_title
+    get_window_rect, get_window_title, WindowCaptureService
 )
 from utils.quick_switch import QuickSwitchBackend
 from utils.coordinate import RelativeCoordinate, WindowCoordinate
 from utils.recognition import OCRRecognizer, ImageRecognizer, ColorRecognizer
+from utils.keywords import get_keyword_matcher
 from utils.image import _preprocess_image
 from core.priority_lock import get_module_priority
 
@@ -23,9 +24,10 @@ class BackgroundMonitor:
     
     PRIORITY = get_module_priority('background')
     
-    def __init__(self, app, group_index: int = 0):
+    def __init__(self, app, group_index: int = 0, capture_service: WindowCaptureService = None):
         self.app = app
         self.group_index = group_index
+        self.capture_service = capture_service  # 由 BackgroundManager 共享，同一窗口每个 tick 只截图一次
         self.is_running = False
         self.monitor_thread = None
         self.stop_event = threading.Event()
@@ -182,6 +184,8 @@ class BackgroundMonitor:
             return None
         
         try:
+            if self.capture_service is not None:
+                return self.capture_service.capture_region(self.hwnd, region)
             return capture_window_region(self.hwnd, region)
         except Exception:
             return None
@@ -208,11 +212,12 @@ class BackgroundMonitor:
         if not processed:
             return (False, None)
         
-        keyword_list = [keyword.strip().lower() for keyword in keywords.split(",") if keyword.strip()]
-        if not keyword_list:
+        matcher = get_keyword_matcher(keywords)
+        if not matcher:
             return (False, None)
         
-        text = OCRRecognizer.get_text(processed, language)
+        result = OCRRecognizer.read(processed, language, source=image)
+        text = result.text if result is not None else None
         
         if text and text.strip() != self._last_text:
             self.app.logging_manager.log_message(
@@ -223,15 +228,14 @@ class BackgroundMonitor:
         if not text:
             return (False, None)
         
-        lower_text = text.lower()
-        if not any(keyword in lower_text for keyword in keyword_list):
+        if not result.contains(matcher):
             return (False, None)
         
         self.app.logging_manager.log_message(
             f"后台监控组{self.group_index + 1}识别到关键词: {text.strip()}"
         )
         
-        click_pos = OCRRecognizer.find_keyword_position(processed, keyword_list, language)
+        click_pos = result.find(matcher)
         
         if click_pos is None:
             region = self._get_current_region()
@@ -349,6 +353,7 @@ class BackgroundManager:
         self.quick_switch = QuickSwitchBackend()
         self.target_hwnd: Optional[int] = None
         self.target_title: Optional[str] = None
+        self.capture_service = WindowCaptureService()
     
     def find_target_window(self, keyword: str) -> tuple:
         """
@@ -375,7 +380,7 @@ class BackgroundManager:
     
     def create_group(self, index: int, monitor_type: str = "ocr") -> BackgroundMonitor:
         """创建监控组"""
-        monitor = BackgroundMonitor(self.app, index)
+        monitor = BackgroundMonitor(self.app, index, self.capture_service)
         monitor.recognition_type = monitor_type
         
         if self.target_hwnd:
@@ -488,6 +493,7 @@ class BackgroundManager:
         """停止所有监控组"""
         for monitor in self.monitors.values():
             monitor.stop_monitoring()
+        self.capture_service.invalidate()
 
     def get_window_info(self) -> Optional[Dict[str, Any]]:
         """获取目标窗口信息"""
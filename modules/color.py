@@ -2,15 +2,60 @@ import threading
 import time
 import numpy as np
 from PIL import Image, ImageGrab
-import imagehash
 import tkinter as tk
 from tkinter import messagebox
 
-from utils.screenshot import ScreenshotManager
-from utils.recognition import ColorRecognizer
+from utils.screenshot import ScreenshotManager, FrameBus
+from utils.frame import image_size
+from utils.recognition import ColorRecognizer, PixelProbeSet
 from core.priority_lock import get_module_priority
 
 
+PROBE_MODES = {"全部": PixelProbeSet.MODE_ALL, "任一": PixelProbeSet.MODE_ANY}
+
+
+def parse_probes(text, tolerance):
+    """
+    解析探针文本
+    
+    Args:
+        text: "x,y:R,G,B; x,y:R,G,B" 格式的探针列表（屏幕绝对坐标）
+        tolerance: 所有探针共用的颜色容差
+    
+    Returns:
+        list: [(x, y, (R, G, B), tolerance), ...]，文本为空时返回空列表
+    
+    Raises:
+        ValueError: 探针格式错误
+    """
+    probes = []
+    for item in (text or "").replace("；", ";").split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            position, color = item.split(":")
+            x, y = (int(value) for value in position.split(","))
+            r, g, b = (int(value) for value in color.split(","))
+        except ValueError:
+            raise ValueError(f"探针格式错误: {item}（应为 x,y:R,G,B）")
+        probes.append((x, y, (r, g, b), int(tolerance)))
+    return probes
+
+
+def format_probes(probes):
+    """
+    把探针列表格式化为 "x,y:R,G,B; ..." 文本
+    
+    Args:
+        probes: [(x, y, (R, G, B)), ...]，可带第四项容差（忽略）
+    
+    Returns:
+        str: 探针文本
+    """
+    return "; ".join(f"{x},{y}:{color[0]},{color[1]},{color[2]}" for x, y, color, *_ in probes)
+
+
 class ColorRecognition:
     """
     颜色识别类
@@ -18,6 +63,8 @@ class ColorRecognition:
     """
     
     PRIORITY = get_module_priority('color')
+    MAX_FRAME_AGE = 0.5  # 可接受的最大帧龄（秒），颜色探测可以复用缓存帧
+    PROBE_INTERVAL = 0.02  # 探针模式的轮询间隔（秒）
     
     def __init__(self, app):
         self.app = app
@@ -29,13 +76,58 @@ class ColorRecognition:
         self.interval = 5.0
         self.commands = ""
         
-        self.last_image_hash = None
+        self._last_miss_signature = None  # 上次未匹配时的区域签名，画面未变化则跳过识别
+        self.probe_set = None
         self.screenshot_manager = ScreenshotManager()
+        self.frame_bus = FrameBus()
 
     def set_region(self, region):
         """设置颜色识别区域"""
         self.region = region
 
+    def start_probe_recognition(self, probes, mode="all", commands="",
+                                poll_interval=PROBE_INTERVAL, cooldown=5.0):
+        """
+        探针模式：只检查若干个像素点的颜色（如血球、技能冷却点）
+        
+        Args:
+            probes: [(x, y, (R, G, B), tolerance), ...] - 屏幕绝对坐标
+            mode: "all" 所有探针匹配才触发（AND），"any" 任一探针匹配即触发（OR）
+            commands: 触发后执行的命令
+            poll_interval: 轮询间隔（秒），同时作为可接受的最大帧龄
+            cooldown: 触发后的冷却时间（秒）
+        """
+        self.probe_set = PixelProbeSet(probes, mode)
+        self.commands = commands
+        probe_key = ("color_probe", id(self))
+        
+        def probe_loop():
+            self.is_running = True
+            self.screenshot_manager.register_capture_region(probe_key, self.probe_set.bbox)
+            
+            try:
+                while self.is_running:
+                    matched, _ = self.screenshot_manager.probe_pixels(
+                        self.probe_set, priority=self.PRIORITY, max_age=poll_interval
+                    )
+                    
+                    if matched and not (hasattr(self.app, 'event_queue') and not self.app.event_queue.empty()):
+                        self.app.logging_manager.log_message(f"✅ 颜色探针匹配（{len(self.probe_set)}个探针，模式: {mode}）")
+                        self.execute_commands()
+                        time.sleep(cooldown)
+                    else:
+                        time.sleep(poll_interval)
+            finally:
+                self.screenshot_manager.unregister_capture_region(probe_key)
+            
+            self.is_running = False
+            self.app.root.after(0, lambda:
+                (self.app.status_var.set("颜色识别已停止"),)
+            )
+        
+        self.recognition_thread = threading.Thread(target=probe_loop, daemon=True)
+        self.recognition_thread.start()
+
     def start_recognition(self, target_color, tolerance, interval, commands):
         self.target_color = target_color
         self.tolerance = int(tolerance)
@@ -43,17 +135,38 @@ class ColorRecognition:
         self.commands = commands
         
         def recognize():
+            if not self.region:
+                self.app.logging_manager.log_message("颜色识别失败: 未设置识别区域")
+                self.is_running = False
+                self.app.root.after(0, lambda: self.app.status_var.set("颜色识别已停止"))
+                return
+            
             self.is_running = True
+            subscription = self.frame_bus.subscribe(
+                self.region, interval=self.interval, priority=self.PRIORITY, name="颜色识别",
+                max_age=self.MAX_FRAME_AGE
+            )
             
-            while self.is_running:
-                time.sleep(self.interval)
-                
-                if hasattr(self.app, 'event_queue') and not self.app.event_queue.empty():
-                    continue
-                
-                if self.recognize_color():
-                    self.execute_commands()
-                    time.sleep(self.interval)
+            try:
+                while self.is_running:
+                    screenshot = subscription.get(timeout=1)
+                    if screenshot is None:
+                        continue
+                    
+                    if hasattr(self.app, 'event_queue') and not self.app.event_queue.empty():
+                        continue
+                    
+                    signature = subscription.last_frame.region_signature(self.region)
+                    if signature is not None and signature == self._last_miss_signature:
+                        continue
+                    
+                    matched = self.recognize_color(screenshot, subscription.last_frame)
+                    self._last_miss_signature = None if matched else signature
+                    if matched:
+                        self.execute_commands()
+                        time.sleep(self.interval)
+            finally:
+                subscription.close()
             
             self.is_running = False
             self.app.status_var.set("颜色识别已停止")
@@ -65,25 +178,32 @@ class ColorRecognition:
         self.recognition_thread = threading.Thread(target=recognize, daemon=True)
         self.recognition_thread.start()
 
-    def recognize_color(self):
-        """执行颜色识别 - 使用公共识别工具类"""
+    def recognize_color(self, screenshot=None, frame=None):
+        """执行颜色识别 - 使用公共识别工具类
+        
+        Args:
+            screenshot: 帧总线投递的区域对象（FrameRegion），为 None 时自行截图
+            frame: screenshot 所属的帧，用于在日志中记录帧龄
+        """
         if not self.region:
             self.app.logging_manager.log_message("颜色识别失败: 未设置识别区域")
             return False
         
         try:
-            screenshot = self.screenshot_manager.get_region_screenshot(self.region, priority=self.PRIORITY)
+            if screenshot is None:
+                frame = self.screenshot_manager.get_region_frame(self.region, priority=self.PRIORITY,
+                                                                 max_age=self.MAX_FRAME_AGE)
+                screenshot = frame.region(self.region) if frame is not None else None
             
-            if not screenshot:
+            if screenshot is None:
                 self.app.logging_manager.log_message("颜色识别失败: 无法获取截图")
                 return False
             
-            if screenshot.size[0] == 0 or screenshot.size[1] == 0:
+            width, height = image_size(screenshot)
+            if width == 0 or height == 0:
                 self.app.logging_manager.log_message("颜色识别失败: 截图为空")
                 return False
-            
-            current_hash = imagehash.average_hash(screenshot.resize((32, 32)))
-            self.last_image_hash = current_hash
+
             
             matched, click_pos, match_pixels = ColorRecognizer.match_color(
                 screenshot, self.target_color, self.tolerance,
@@ -91,7 +211,8 @@ class ColorRecognition:
             )
             
             if matched:
-                self.app.logging_manager.log_message(f"✅ 识别到目标颜色，匹配像素: {match_pixels}")
+                frame_age = f", 帧龄: {frame.age * 1000:.0f}ms" if frame is not None else ""
+                self.app.logging_manager.log_message(f"✅ 识别到目标颜色，匹配像素: {match_pixels}{frame_age}")
                 return True
             else:
                 return False
@@ -145,18 +266,23 @@ class ColorRecognitionManager:
         from ui.utils import create_color_picker
         create_color_picker(self.app, on_color_selected, self.app.logging_manager.log_message)
     
+    def add_probe(self):
+        """拾取屏幕上的一个点作为颜色探针（坐标和当前颜色）"""
+        def on_probe_selected(color, position):
+            text = self.app.color_probes_var.get().strip().rstrip(";")
+            probe = format_probes([(position[0], position[1], color)])
+            self.app.color_probes_var.set(f"{text}; {probe}" if text else probe)
+        
+        from ui.utils import create_color_picker
+        create_color_picker(self.app, on_probe_selected, self.app.logging_manager.log_message,
+                            include_position=True)
+    
     def start_color_recognition(self):
         """开始颜色识别"""
         if not self.color_recognition:
             self.color_recognition = ColorRecognition(self.app)
         
         try:
-            if hasattr(self.app, 'target_color') and self.app.target_color:
-                target_color = self.app.target_color
-            else:
-                messagebox.showwarning("警告", "请先选择目标颜色！")
-                return
-            
             tolerance = int(self.app.tolerance_var.get())
             interval = float(self.app.interval_var.get())
             commands = self.app.color_commands.get(1.0, tk.END)
@@ -164,6 +290,26 @@ class ColorRecognitionManager:
             messagebox.showwarning("警告", "颜色设置参数格式错误，请检查！")
             return
         
+        probes_text = self.app.color_probes_var.get() if hasattr(self.app, 'color_probes_var') else ""
+        try:
+            probes = parse_probes(probes_text, tolerance)
+        except ValueError as e:
+            messagebox.showwarning("警告", str(e))
+            return
+        
+        if probes:
+            # 探针模式：不需要识别区域和目标颜色
+            mode = PROBE_MODES.get(self.app.color_probe_mode_var.get(), PixelProbeSet.MODE_ALL)
+            self.color_recognition.start_probe_recognition(probes, mode, commands, cooldown=interval)
+            self.app.status_var.set("颜色探针识别中...")
+            return
+        
+        if hasattr(self.app, 'target_color') and self.app.target_color:
+            target_color = self.app.target_color
+        else:
+            messagebox.showwarning("警告", "请先选择目标颜色！")
+            return
+        
         if not hasattr(self.app, 'color_recognition_region') or not self.app.color_recognition_region:
             messagebox.showwarning("警告", "请先选择颜色识别区域！")
             return
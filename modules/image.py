@@ -12,9 +12,11 @@ try:
 except ImportError:
     CV2_AVAILABLE = False
 
-from utils.screenshot import ScreenshotManager
+from utils.screenshot import ScreenshotManager, FrameBus
+from utils.frame import image_size
 from utils.recognition import ImageRecognizer
 from core.click_handler import ClickHandler
+from core.utils import dump_trigger_frames
 from core.priority_lock import get_module_priority
 
 
@@ -41,7 +43,9 @@ class ImageDetection:
         self.click_handler = ClickHandler(app)
         self.last_trigger_time = 0
         self.last_match_pos = None
+        self._last_miss_signature = None  # 上次未匹配时的区域签名，画面未变化则跳过匹配
         self.screenshot_manager = ScreenshotManager()
+        self.frame_bus = FrameBus()
     
     def set_region(self, region):
         """设置检测区域"""
@@ -66,23 +70,37 @@ class ImageDetection:
         
         def detect():
             self.is_running = True
+            subscription = self.frame_bus.subscribe(
+                self.region, interval=self.interval, priority=self.PRIORITY,
+                name=f"检测组{self.group_index+1}"
+            )
             
-            while self.is_running:
-                time.sleep(self.interval)
-                
-                if hasattr(self.app, 'event_queue') and not self.app.event_queue.empty():
-                    continue
-                
-                current_time = time.time()
-                
-                if current_time - self.last_trigger_time < self.pause:
-                    continue
-                
-                match_result = self.detect_image()
-                if match_result:
-                    self.execute_commands(match_result)
-                    self.last_trigger_time = current_time
-                    time.sleep(5)
+            try:
+                while self.is_running:
+                    screenshot = subscription.get(timeout=1)
+                    if screenshot is None:
+                        continue
+                    
+                    if hasattr(self.app, 'event_queue') and not self.app.event_queue.empty():
+                        continue
+                    
+                    current_time = time.time()
+                    
+                    if current_time - self.last_trigger_time < self.pause:
+                        continue
+                    
+                    signature = subscription.last_frame.region_signature(self.region)
+                    if signature is not None and signature == self._last_miss_signature:
+                        continue
+                    
+                    match_result = self.detect_image(screenshot)
+                    self._last_miss_signature = None if match_result else signature
+                    if match_result:
+                        self.execute_commands(match_result)
+                        self.last_trigger_time = current_time
+                        time.sleep(5)
+            finally:
+                subscription.close()
             
             self.is_running = False
             self.app.status_var.set("图像检测已停止")
@@ -94,8 +112,12 @@ class ImageDetection:
         self.detection_thread = threading.Thread(target=detect, daemon=True)
         self.detection_thread.start()
     
-    def detect_image(self):
-        """执行图像检测 - 使用公共识别工具类"""
+    def detect_image(self, screenshot=None):
+        """执行图像检测 - 使用公共识别工具类
+        
+        Args:
+            screenshot: 帧总线投递的区域对象（FrameRegion），为 None 时自行截图
+        """
         if not self.region or self.template_image is None:
             return None
         
@@ -103,12 +125,15 @@ class ImageDetection:
             return None
         
         try:
-            screenshot = self.screenshot_manager.get_region_screenshot(self.region, priority=self.PRIORITY)
+            if screenshot is None:
+                frame = self.screenshot_manager.get_region_frame(self.region, priority=self.PRIORITY)
+                screenshot = frame.region(self.region) if frame is not None else None
             
-            if not screenshot:
+            if screenshot is None:
                 return None
             
-            if screenshot.size[0] == 0 or screenshot.size[1] == 0:
+            width, height = image_size(screenshot)
+            if width == 0 or height == 0:
                 return None
             
             matched, click_pos, score = ImageRecognizer.match_template(
@@ -147,6 +172,8 @@ class ImageDetection:
         if not group:
             return
         
+        dump_trigger_frames(self.app, f"检测组{self.group_index+1}", self.region)
+        
         key = group.get("key", tk.StringVar(value="")).get()
         
         alarm_enabled = group.get("alarm", tk.BooleanVar(value=False)).get()
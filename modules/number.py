@@ -2,9 +2,10 @@ import threading
 import time
 from PIL import Image
 from input.permissions import PermissionManager
-from utils.screenshot import ScreenshotManager
-from utils.recognition import NumberRecognizer
+from utils.screenshot import ScreenshotManager, FrameBus
+from utils.recognition import NumberRecognizer, warm_up_ocr
 from utils.image import _preprocess_image
+from utils.frame import to_image
 from core.priority_lock import get_module_priority
 
 
@@ -12,11 +13,15 @@ class NumberModule:
     """数字识别模块 - 优先级最高(6)"""
     
     PRIORITY = get_module_priority('number')
+    MAX_FRAME_AGE = 0.03  # 可接受的最大帧龄（秒），阈值判断需要最新画面
     
     def __init__(self, app):
         self.app = app
         self.screenshot_manager = ScreenshotManager()
+        self.frame_bus = FrameBus()
         self._last_results = {}  # 缓存上次识别结果，用于日志节流
+        self._region_signatures = {}  # 区域分块签名，画面未变化时复用上次OCR文本
+        self._ocr_texts = {}
     
     def start_number_recognition(self):
         def start_func():
@@ -37,10 +42,23 @@ class NumberModule:
                     self.app.number_threads.append(thread)
                     thread.start()
                     start_count += 1
+            if start_count:
+                self._warm_up_engine()
             return start_count
 
         self.app.start_module("number", start_func)
 
+    def _warm_up_engine(self):
+        """后台预热数字识别用到的 OCR 配置，完成后输出日志"""
+        def on_ready(language, config, elapsed, error):
+            if error is not None:
+                self.app.logging_manager.log_message(f"数字识别OCR预热失败: {str(error)}")
+            else:
+                self.app.logging_manager.log_message(f"数字识别OCR引擎已就绪, 预热耗时 {elapsed*1000:.0f}ms")
+
+        if not warm_up_ocr([('eng', NumberRecognizer.NUMBER_CONFIG)], on_ready):
+            self.app.logging_manager.log_message("数字识别OCR引擎不常驻模型(未使用tesserocr工作进程), 跳过预热")
+
     def stop_number_recognition(self):
         for stop_event in self.app.number_stop_events.values():
             stop_event.set()
@@ -48,22 +66,38 @@ class NumberModule:
         if self.app.number_threads:
             self.app.number_threads.clear()
         self._last_results.clear()  # 清理缓存，确保下次启动时正常输出日志
+        self._region_signatures.clear()
+        self._ocr_texts.clear()
 
     def number_recognition_loop(self, region_index, region, threshold, key, stop_event):
+        subscription = self.frame_bus.subscribe(region, interval=1, priority=self.PRIORITY,
+                                                name=f"数字识别{region_index+1}",
+                                                max_age=self.MAX_FRAME_AGE)
+        try:
+            self._number_recognition_loop(region_index, threshold, key, stop_event, subscription)
+        finally:
+            subscription.close()
+
+    def _number_recognition_loop(self, region_index, threshold, key, stop_event, subscription):
         while not stop_event.is_set() and self.app.number_regions[region_index]["enabled"].get():
             if not self.app.is_running:
                 break
             try:
-                time.sleep(1)
+                screenshot = subscription.get(timeout=1)
 
                 if stop_event.is_set():
                     return
 
-                screenshot = self.take_screenshot(region)
                 if screenshot is None:
                     continue
                 
-                text = self.ocr_number(screenshot)
+                signature = subscription.last_frame.region_signature(subscription.region)
+                if signature is not None and signature == self._region_signatures.get(region_index):
+                    text = self._ocr_texts.get(region_index)
+                else:
+                    text = self.ocr_number(screenshot)
+                    self._region_signatures[region_index] = signature
+                    self._ocr_texts[region_index] = text
 
                 number = NumberRecognizer.parse_number(text, self.app._number_cache)
                 if number is not None:
@@ -76,7 +110,8 @@ class NumberModule:
                         self.app.alarm_module.play_alarm_sound(self.app.number_regions[region_index]["alarm"])
 
                         if key:
-                            self.app.logging_manager.log_message(f"数字识别{region_index+1}触发按键: {key}")
+                            frame_age = subscription.last_frame.age * 1000
+                            self.app.logging_manager.log_message(f"数字识别{region_index+1}触发按键: {key} (帧龄: {frame_age:.0f}ms)")
                             
                             from modules.input import KeyEventExecutor
                             delay_min_var = self.app.number_regions[region_index]["delay_min"]
@@ -100,7 +135,8 @@ class NumberModule:
 
     def take_screenshot(self, region):
         try:
-            return self.screenshot_manager.get_region_screenshot(region, priority=self.PRIORITY)
+            return self.screenshot_manager.get_region_screenshot(region, priority=self.PRIORITY,
+                                                                 max_age=self.MAX_FRAME_AGE)
         except Exception as e:
             self.app.logging_manager.log_message(f"数字识别错误: 屏幕截图失败 - {str(e)}")
             return None
@@ -108,6 +144,6 @@ class NumberModule:
     def ocr_number(self, image):
         processed_image = _preprocess_image(image, group_index=None)
         if processed_image is None:
-            processed_image = image.convert('L')
+            processed_image = to_image(image).convert('L')
         
         return NumberRecognizer.recognize(processed_image)
@@ -3,13 +3,17 @@ import time
 import tkinter as tk
 from tkinter import messagebox
 from PIL import Image
-import imagehash
 
 from utils.image import _preprocess_image
-from utils.screenshot import ScreenshotManager
-from utils.recognition import OCRRecognizer
+from utils.screenshot import ScreenshotManager, FrameBus
+from utils.recognition import OCRRecognizer, OCR_SCALE_LIMITS, get_ocr_engine, warm_up_ocr
+from utils.keywords import get_keyword_matcher
+from utils.text_presence import TextPresenceFilter, DEFAULT_SENSITIVITY
+from utils.ocr_executor import OCRExecutor, default_worker_count
+from utils.scheduler import DeadlineScheduler
 from core.priority_lock import get_module_priority
 from core.click_handler import ClickHandler
+from core.utils import dump_trigger_frames
 
 
 class OCRModule:
@@ -20,13 +24,25 @@ class OCRModule:
     
     PRIORITY = get_module_priority('ocr')
     
+    MIN_INTERVAL = 0.05  # 识别间隔下限（秒）
+    DEFAULT_INTERVAL = 5.0
+    DEFAULT_PAUSE = 180.0
+    FRAME_TIMEOUT = 1.0  # 等待帧总线投递的超时（秒）
+    SYNC_INTERVAL = 0.5  # 检查新增/删除识别组的间隔（秒）
+    
     def __init__(self, app):
         self.app = app
         self.last_recognition_times = {}
         self.last_trigger_times = {}
         self.click_handler = ClickHandler(app)
         self.screenshot_manager = ScreenshotManager()
+        self.frame_bus = FrameBus()
+        self._subscriptions = {}  # 识别组索引 -> 帧总线按需订阅
+        self._subscriptions_lock = threading.Lock()
         self._last_texts = {}  # 缓存上次识别文本，用于日志节流
+        self._text_filters = {}  # 识别组索引 -> 文字预过滤器（启用预过滤的组）
+        self.executor = None  # 各识别组并行识别的执行器
+        self.scheduler = None  # 各识别组下次识别时间的调度器
     
     def start_monitoring(self):
         """开始监控"""
@@ -45,6 +61,12 @@ class OCRModule:
             return
 
         def start_func():
+            enabled_count = sum(1 for group in self.app.ocr_groups if group["enabled"].get() and group["region"])
+            self.executor = OCRExecutor(max_workers=min(default_worker_count(), enabled_count))
+            # 每种语言的工作进程数与并发识别数一致，同一语言的识别组不必排队
+            get_ocr_engine().set_concurrency(self.executor.max_workers)
+            self.scheduler = DeadlineScheduler()
+            self._warm_up_engine()
             self.app.is_running = True
             self.app.is_paused = False
             self.app.ocr_thread = threading.Thread(target=self.ocr_loop, daemon=True)
@@ -53,86 +75,280 @@ class OCRModule:
 
         self.app.start_module("ocr", start_func)
 
+    def _warm_up_engine(self):
+        """后台预热启用的识别组用到的语言/识别模式，完成后输出日志"""
+        combinations = []
+        for group in self.app.ocr_groups:
+            if not (group["enabled"].get() and group["region"]):
+                continue
+            language = group.get("language", tk.StringVar(value="eng")).get()
+            incremental_var = group.get("incremental")
+            incremental = bool(incremental_var.get()) if incremental_var is not None else False
+            combinations.append((language, OCRRecognizer.LINE_CONFIG if incremental else OCRRecognizer.TESSERACT_CONFIG))
+        
+        def on_ready(language, config, elapsed, error):
+            mode = "逐行" if config == OCRRecognizer.LINE_CONFIG else "整块"
+            if error is not None:
+                self.app.logging_manager.log_message(f"OCR预热失败({language}, {mode}): {str(error)}")
+            else:
+                self.app.logging_manager.log_message(f"OCR引擎已就绪({language}, {mode}), 预热耗时 {elapsed*1000:.0f}ms")
+        
+        if not warm_up_ocr(combinations, on_ready):
+            self.app.logging_manager.log_message("OCR引擎不常驻模型(未使用tesserocr工作进程), 跳过预热")
+    
     def stop_monitoring(self):
         """停止监控"""
         self.app.is_running = False
+        if self.scheduler is not None:
+            self.scheduler.stop()
         self._last_texts.clear()  # 清理缓存，确保下次启动时正常输出日志
+        self._close_subscriptions()
+        
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self._log_executor_stats()
+            self.executor = None
+        
+        for group_index, text_filter in sorted(self._text_filters.items()):
+            if text_filter.get_stats()["checked"]:
+                self.app.logging_manager.log_message(f"识别组{group_index+1}{text_filter.format_stats()}")
+        self._text_filters.clear()
+    
+    def _log_executor_stats(self):
+        """输出各识别组的识别耗时和排队延迟"""
+        for group_index, stats in sorted(self.executor.get_stats().items()):
+            if not stats["completed"]:
+                continue
+            self.app.logging_manager.log_message(
+                f"识别组{group_index+1}统计: 识别 {stats['completed']} 次, "
+                f"平均耗时 {stats['avg_latency_ms']:.0f}ms (最大 {stats['max_latency_ms']:.0f}ms), "
+                f"平均排队 {stats['avg_queue_ms']:.0f}ms (最大 {stats['max_queue_ms']:.0f}ms), "
+                f"跳过 {stats['coalesced']} 次"
+            )
+    
+    def _get_subscription(self, group_index, region):
+        """
+        获取识别组的帧总线订阅
+        
+        按需订阅：识别时才请求一帧，与其他模块的订阅在同一个 tick 中合并截图。
+        区域变化（重新选择区域）时替换订阅；监控已停止时返回 None。
+        """
+        with self._subscriptions_lock:
+            if not self.app.is_running:
+                return None
+            subscription = self._subscriptions.get(group_index)
+            if subscription is not None and subscription.region == region and not subscription.closed:
+                return subscription
+            if subscription is not None:
+                subscription.close()
+            subscription = self.frame_bus.subscribe(region, priority=self.PRIORITY,
+                                                    name=f"识别组{group_index+1}", on_demand=True)
+            self._subscriptions[group_index] = subscription
+            return subscription
+    
+    def _close_subscriptions(self, keep=None):
+        """
+        取消识别组的帧总线订阅
+        
+        Args:
+            keep: 保留订阅的识别组索引集合，None 表示全部取消
+        """
+        with self._subscriptions_lock:
+            for group_index in list(self._subscriptions):
+                if keep is None or group_index not in keep:
+                    self._subscriptions.pop(group_index).close()
     
     def ocr_loop(self):
         """
         OCR识别循环
+        
+        每个识别组按自己的间隔（支持小数秒）在截止时间堆中排队，循环睡眠到最早的到期时间，
+        把到期的组交给执行器并行识别；触发后的暂停期内不识别。监控期间新增的识别组在
+        SYNC_INTERVAL 内加入调度。stop_monitoring 立即唤醒并结束循环。
         """
-        self.last_recognition_times = {i: 0 for i in range(len(self.app.ocr_groups))}
-        self.last_trigger_times = {i: 0 for i in range(len(self.app.ocr_groups))}
+        self.last_recognition_times = {}
+        self.last_trigger_times = {}
         
-        last_hashes = {i: None for i in range(len(self.app.ocr_groups))}
-        frame_counts = {i: 0 for i in range(len(self.app.ocr_groups))}
+        last_hashes = {}
+        frame_counts = {}
+        scheduled = set()
+        executor = self.executor
+        scheduler = self.scheduler
 
-        while True:
-            if not self.app.is_running:
-                break
+        while self.app.is_running:
             try:
-                min_interval = self._calculate_min_interval()
-                self._wait_for_interval(min_interval)
-
-                if self.app.is_paused:
+                self._sync_groups(scheduler, scheduled)
+                
+                item = scheduler.wait_next(timeout=self.SYNC_INTERVAL)
+                if not self.app.is_running:
+                    break
+                if item is None:
+                    if scheduler.stopped:
+                        break
                     continue
-
-                current_time = time.time()
-
-                for i, group in enumerate(self.app.ocr_groups):
-                    if self._should_process_group(group, i, current_time):
-                        self.perform_ocr_for_group_optimized(group, i, last_hashes, frame_counts)
-                        self.last_recognition_times[i] = current_time
+                
+                i, deadline = item
+                if i >= len(self.app.ocr_groups):
+                    continue
+                group = self.app.ocr_groups[i]
+                interval = self._get_group_interval(group)
+                now = scheduler.clock()
+                
+                if self.app.is_paused or not group["enabled"].get() or not group["region"]:
+                    scheduler.schedule(i, now + interval)
+                    continue
+                
+                resume_time = self._get_resume_time(group, i)
+                if resume_time > now:
+                    scheduler.schedule(i, resume_time)
+                    continue
+                
+                if executor.submit(i, self.perform_ocr_for_group_optimized,
+                                   group, i, last_hashes, frame_counts):
+                    self.last_recognition_times[i] = now
+                
+                # 按计划时间推进，避免间隔累积漂移；已落后一个间隔以上时从当前时间重新计
+                next_deadline = deadline + interval
+                scheduler.schedule(i, next_deadline if next_deadline > now else now + interval)
             except Exception as e:
                 self.app.logging_manager.log_message(f"错误: {str(e)}")
-                time.sleep(5)
-    
-    def _calculate_min_interval(self):
-        enabled_groups = [group for group in self.app.ocr_groups if group["enabled"].get()]
-        if enabled_groups:
-            try:
-                intervals = []
-                for group in enabled_groups:
-                    try:
-                        interval = int(group["interval"].get())
-                        intervals.append(interval)
-                    except (ValueError, TypeError):
-                        intervals.append(5)
-                return min(intervals)
-            except (ValueError, TypeError):
-                return 5
-        return 5        
+                if scheduler.sleep(5):
+                    break
     
-    def _wait_for_interval(self, interval):
-        for _ in range(interval):
-            if not self.app.is_running:
-                break
-            time.sleep(1)
+    def _sync_groups(self, scheduler, scheduled):
+        """
+        让调度器与当前的识别组列表保持一致
+        
+        监控期间新增的识别组立即加入调度，删除的识别组取消调度并关闭帧订阅。
+        已调度的组在到期处理时总会重新调度，因此只需处理索引集合的变化。
+        
+        Args:
+            scheduler: 截止时间调度器
+            scheduled: 已加入调度的识别组索引集合（原地更新）
+        """
+        group_count = len(self.app.ocr_groups)
+        now = scheduler.clock()
+        for i in range(group_count):
+            if i not in scheduled:
+                scheduled.add(i)
+                self.last_recognition_times.setdefault(i, None)
+                self.last_trigger_times.setdefault(i, None)
+                scheduler.schedule(i, now)
+        
+        removed = [i for i in scheduled if i >= group_count]
+        for i in removed:
+            scheduled.discard(i)
+            scheduler.remove(i)
+        if removed:
+            self._close_subscriptions(keep=set(range(group_count)))
     
-    def _should_process_group(self, group, i, current_time):
-        if not group["enabled"].get() or not group["region"]:
-            return False
-
+    @staticmethod
+    def _parse_seconds(var, default):
+        """读取以秒为单位的配置（支持小数），无效时返回默认值"""
         try:
-            pause_duration = int(group["pause"].get())
-        except (ValueError, TypeError):
-            pause_duration = 180
+            value = float(var.get())
+        except (ValueError, TypeError, tk.TclError):
+            return default
+        return value if value >= 0 else default
+    
+    @staticmethod
+    def _parse_scale(var, default=1.0):
+        """读取缩放倍数，无效或不是正数时返回默认值，超出 OCR_SCALE_LIMITS 时取边界值"""
         try:
-            group_interval = int(group["interval"].get())
-        except (ValueError, TypeError):
-            group_interval = 5
-
-        time_since_trigger = current_time - self.last_trigger_times[i]
-        time_since_recognition = current_time - self.last_recognition_times[i]
+            scale = float(var.get())
+        except (ValueError, TypeError, tk.TclError):
+            return default
+        if not scale > 0:
+            return default
+        return min(OCR_SCALE_LIMITS[1], max(OCR_SCALE_LIMITS[0], scale))
+    
+    def _get_text_filter(self, group, group_index):
+        """
+        识别组的文字预过滤器（需在组配置中开启，默认关闭）
         
-        if time_since_trigger < pause_duration:
-            return False
-
-        if time_since_recognition < group_interval:
-            return False
-
-        return True
+        每个组使用独立的过滤器，强制识别的计数和统计按组计算；灵敏度变化时重新创建。
+        
+        Returns:
+            TextPresenceFilter: 预过滤器，未开启时返回 None
+        """
+        prefilter_var = group.get("prefilter")
+        if prefilter_var is None or not prefilter_var.get():
+            self._text_filters.pop(group_index, None)
+            return None
+        
+        sensitivity = DEFAULT_SENSITIVITY
+        sensitivity_var = group.get("prefilter_sensitivity")
+        if sensitivity_var is not None:
+            try:
+                sensitivity = min(1.0, max(0.0, float(sensitivity_var.get())))
+            except (ValueError, TypeError, tk.TclError):
+                pass
+        
+        text_filter = self._text_filters.get(group_index)
+        if text_filter is None or text_filter.sensitivity != sensitivity:
+            text_filter = TextPresenceFilter(sensitivity)
+            self._text_filters[group_index] = text_filter
+        return text_filter
+    
+    def _get_group_scale(self, group):
+        """识别组校准得到的缩放倍数，未校准时为 1.0"""
+        scale_var = group.get("ocr_scale")
+        if scale_var is None:
+            return 1.0
+        return self._parse_scale(scale_var)
+    
+    def calibrate_group_scale(self, group_index):
+        """
+        校准识别组的 OCR 缩放倍数
+        
+        在后台线程中截取识别区域，估计字形高度并选择缩放倍数，结果写入组配置（ocr_scale），
+        日志中输出校准前后的识别耗时和平均置信度。
+        """
+        if not self.app.tesseract_available:
+            messagebox.showinfo("提示", "Tesseract OCR引擎未配置，请在设置中配置Tesseract路径后再校准！")
+            return
+        if group_index >= len(self.app.ocr_groups):
+            return
+        
+        group = self.app.ocr_groups[group_index]
+        if not group["region"]:
+            messagebox.showwarning("警告", "请先选择识别区域")
+            return
+        
+        language = group.get("language", tk.StringVar(value="eng")).get()
+        
+        def calibrate():
+            valid, left, top, right, bottom = self._validate_region_coordinates(group["region"], group_index)
+            if not valid:
+                return
+            frame = self._capture_screen_frame(left, top, right, bottom, group_index)
+            if frame is None:
+                return
+            
+            report = OCRRecognizer.calibrate_scale(frame.region((left, top, right, bottom)), language)
+            if report is None:
+                self.app.logging_manager.log_message(f"识别组{group_index+1}缩放校准失败: 图像预处理失败")
+                return
+            
+            before, after = report["before"], report["after"]
+            self.app.logging_manager.log_message(
+                f"识别组{group_index+1}缩放校准: 字形高度 {report['text_height']:.0f}px, 缩放 {report['scale']:g}x; "
+                f"校准前 耗时 {before['latency_ms']:.0f}ms 置信度 {before['confidence']:.1f}, "
+                f"校准后 耗时 {after['latency_ms']:.0f}ms 置信度 {after['confidence']:.1f}"
+            )
+            self.app.root.after(0, lambda: group["ocr_scale"].set(f"{report['scale']:g}"))
+        
+        threading.Thread(target=calibrate, daemon=True).start()
+    
+    def _get_group_interval(self, group):
+        return max(self.MIN_INTERVAL, self._parse_seconds(group["interval"], self.DEFAULT_INTERVAL))
+    
+    def _get_resume_time(self, group, i):
+        """触发后暂停期的结束时间（time.monotonic()），未触发过返回 0"""
+        last_trigger = self.last_trigger_times.get(i)
+        if last_trigger is None:
+            return 0
+        return last_trigger + self._parse_seconds(group["pause"], self.DEFAULT_PAUSE)
     
     def _validate_ocr_group_input(self, group, group_index):
         if not group:
@@ -169,9 +385,9 @@ class OCRModule:
 
         return True, left, top, right, bottom
     
-    def _capture_screen_region(self, left, top, right, bottom, group_index):
+    def _capture_screen_frame(self, left, top, right, bottom, group_index):
         try:
-            return self.screenshot_manager.get_region_screenshot((left, top, right, bottom), priority=self.PRIORITY)
+            return self.screenshot_manager.get_region_frame((left, top, right, bottom), priority=self.PRIORITY)
         except Exception as e:
             self.app.logging_manager.log_message(f"识别组{group_index+1}错误: 屏幕截图失败 - {str(e)}")
             return None
@@ -192,33 +408,46 @@ class OCRModule:
             if not valid:
                 return
 
-            screenshot = self._capture_screen_region(left, top, right, bottom, group_index)
-            if not screenshot:
+            subscription = self._get_subscription(group_index, (left, top, right, bottom))
+            if subscription is None:
                 return
+            screenshot = subscription.fetch(timeout=self.FRAME_TIMEOUT)
+            if screenshot is None:
+                if self.app.is_running:
+                    self.app.logging_manager.log_message(f"识别组{group_index+1}错误: 屏幕截图失败 - 等待帧超时")
+                return
+            frame = subscription.last_frame
 
-            current_hash = imagehash.average_hash(screenshot.resize((64, 64)))
+            current_hash = frame.region_signature((left, top, right, bottom))
             
-            if current_hash == last_hashes.get(group_index) and frame_counts.get(group_index, 0) % 5 != 0:
-                frame_counts[group_index] += 1
+            frame_count = frame_counts.get(group_index, 0)
+            frame_counts[group_index] = frame_count + 1
+            if current_hash == last_hashes.get(group_index) and frame_count % 5 != 0:
                 return
             
             last_hashes[group_index] = current_hash
-            frame_counts[group_index] += 1
 
             start_time = time.time()
 
-            processed_image = _preprocess_image(screenshot, group_index)
+            scale = self._get_group_scale(group)
+            processed_image = _preprocess_image(screenshot, group_index, scale)
             if not processed_image:
                 return
 
+            # 增量模式逐行识别，未变化（或只是移动）的行复用缓存结果
+            incremental = group.get("incremental", tk.BooleanVar(value=False)).get()
+            read = OCRRecognizer.read_lines if incremental else OCRRecognizer.read
+            text_filter = self._get_text_filter(group, group_index)
+
             if keywords_str:
-                keywords = [keyword.strip().lower() for keyword in keywords_str.split(",") if keyword.strip()]
+                # 关键词字符串未变化时直接取已编译的匹配器，相同关键词集合的组共享
+                matcher = get_keyword_matcher(keywords_str)
                 
-                text = OCRRecognizer.get_text(processed_image, current_lang)
-                if not text:
+                result = read(processed_image, current_lang, source=screenshot, prefilter=text_filter)
+                if result is None or not result.text:
                     return
                 
-                lower_text = text.lower()
+                text = result.text
                 
                 elapsed_time = time.time() - start_time
                 sleep_time = max(0.01, 0.1 - elapsed_time)
@@ -229,11 +458,12 @@ class OCRModule:
                     self.app.logging_manager.log_message(f"识别组{group_index+1}识别结果: '{text.strip()}' (耗时: {elapsed_time:.2f}s, 延迟: {sleep_time:.2f}s)")
                     self._last_texts[group_index] = text.strip()
 
-                if any(keyword in lower_text for keyword in keywords):
+                if result.contains(matcher):
                     if click_enabled:
-                        rel_pos = OCRRecognizer.find_keyword_position(processed_image, keywords, current_lang)
+                        rel_pos = result.find(matcher)
                         if rel_pos:
-                            click_pos = (left + rel_pos[0], top + rel_pos[1])
+                            # 识别结果的坐标基于缩放后的图像
+                            click_pos = (left + int(rel_pos[0] / scale), top + int(rel_pos[1] / scale))
                         else:
                             click_pos = ((left + right) // 2, (top + bottom) // 2)
                     else:
@@ -241,7 +471,8 @@ class OCRModule:
 
                     self.trigger_action_for_group(group, group_index, click_enabled, click_pos)
             else:
-                text = OCRRecognizer.get_text(processed_image, current_lang)
+                result = read(processed_image, current_lang, source=screenshot, prefilter=text_filter)
+                text = result.text if result is not None else None
                 if text:
                     elapsed_time = time.time() - start_time
                     sleep_time = max(0.01, 0.1 - elapsed_time)
@@ -304,7 +535,7 @@ class OCRModule:
         executor.execute_keypress(key)
         
         self.app.logging_manager.log_message(f"识别组{group_index+1}按下了 {key} 键")
-        self.last_trigger_times[group_index] = time.time()
+        self.last_trigger_times[group_index] = time.monotonic()
     
     def _play_alarm_if_enabled(self, alarm_enabled, group_index):
         try:
@@ -325,6 +556,7 @@ class OCRModule:
                 return
 
             self.app.logging_manager.log_message(f"识别组{group_index+1}触发动作，按键: {key}")
+            dump_trigger_frames(self.app, f"识别组{group_index+1}", region)
 
             if click_enabled:
                 click_x, click_y = self._calculate_click_position(click_pos, region, group_index)
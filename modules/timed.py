@@ -2,13 +2,9 @@ import threading
 import time
 import tkinter as tk
 
-try:
-    import screeninfo
-except ImportError:
-    screeninfo = None
-
 from core.priority_lock import get_module_priority
 from core.click_handler import ClickHandler
+from utils.monitor import get_monitor_topology
 
 
 class TimedModule:
@@ -115,16 +111,14 @@ class TimedModule:
         self.app.is_selecting = True
         self.app.current_timed_group = group_index
 
-        if screeninfo is None:
+        topology = get_monitor_topology()
+        topology.invalidate()
+        bounds = topology.get_virtual_bounds()
+        if bounds is None:
             self.app.show_message("错误", "screeninfo库未安装，无法支持多显示器选择。请运行 'pip install screeninfo' 安装该库。")
             return
 
-        monitors = screeninfo.get_monitors()
-
-        self.app.min_x = min(monitor.x for monitor in monitors)
-        self.app.min_y = min(monitor.y for monitor in monitors)
-        max_x = max(monitor.x + monitor.width for monitor in monitors)
-        max_y = max(monitor.y + monitor.height for monitor in monitors)
+        self.app.min_x, self.app.min_y, max_x, max_y = bounds
 
         self.app.select_window = tk.Toplevel(self.app.root)
         self.app.select_window.geometry(f"{max_x - self.app.min_x}x{max_y - self.app.min_y}+{self.app.min_x}+{self.app.min_y}")
@@ -0,0 +1,99 @@
+import numpy as np
+from PIL import Image
+
+from utils.capture import (ReplayCaptureBackend, SequenceCaptureBackend, SyntheticCaptureBackend,
+                           create_capture_backend)
+
+
+def _solid(value, size=(40, 30)):
+    return np.full((size[1], size[0], 3), value, dtype=np.uint8)
+
+
+def test_sequence_advances_and_loops():
+    backend = SequenceCaptureBackend([_solid(1), _solid(2), _solid(3)])
+    assert [int(backend.grab().array[0, 0, 0]) for _ in range(5)] == [1, 2, 3, 1, 2]
+
+
+def test_sequence_without_loop_holds_last_frame():
+    backend = SequenceCaptureBackend([_solid(1), _solid(2)], loop=False)
+    assert [int(backend.grab().array[0, 0, 0]) for _ in range(4)] == [1, 2, 2, 2]
+
+
+def test_sequence_reads_directory_and_crops(tmp_path):
+    first = np.arange(30 * 40 * 3, dtype=np.uint32).reshape(30, 40, 3).astype(np.uint8)
+    Image.fromarray(first).save(tmp_path / "000.png")
+    np.save(tmp_path / "001.npy", _solid(7))
+
+    backend = SequenceCaptureBackend(str(tmp_path), origin=(100, 200))
+    assert len(backend) == 2
+
+    frame = backend.grab((110, 205, 120, 215))
+    assert frame.origin == (110, 205)
+    np.testing.assert_array_equal(frame.array, first[5:15, 10:20])
+
+    frame = backend.grab()
+    assert frame.origin == (100, 200)
+    assert frame.array.shape == (30, 40, 3)
+    assert int(frame.array[0, 0, 0]) == 7
+
+    # 截取范围在帧外
+    assert backend.grab((0, 0, 10, 10)) is None
+
+
+def test_replay_follows_clock():
+    now = [0.0]
+    backend = ReplayCaptureBackend([(0.0, _solid(1)), (0.5, _solid(2)), (1.0, _solid(3))],
+                                   clock=lambda: now[0], loop=False)
+
+    def value_at(time):
+        now[0] = time
+        return int(backend.grab().array[0, 0, 0])
+
+    assert [value_at(t) for t in (0.0, 0.2, 0.5, 0.9, 1.0, 5.0)] == [1, 1, 2, 2, 3, 3]
+
+
+def test_replay_speed_loop_and_restart():
+    now = [10.0]
+    backend = ReplayCaptureBackend([(0.0, _solid(1)), (0.5, _solid(2)), (1.0, _solid(3))],
+                                   speed=2.0, clock=lambda: now[0])
+    assert int(backend.grab().array[0, 0, 0]) == 1
+    now[0] = 10.3  # 倍速下已回放 0.6 秒
+    assert int(backend.grab().array[0, 0, 0]) == 2
+    now[0] = 11.3  # 2.6 秒，循环回到 0.6 秒
+    assert int(backend.grab().array[0, 0, 0]) == 2
+
+    backend.restart()
+    assert int(backend.grab().array[0, 0, 0]) == 1
+
+
+def test_replay_reads_millisecond_file_names(tmp_path):
+    for name, value in (("000000", 1), ("000250", 2)):
+        Image.fromarray(_solid(value)).save(tmp_path / f"{name}.png")
+    backend = ReplayCaptureBackend(str(tmp_path))
+    assert backend.timestamps == [0.0, 0.25]
+
+
+def test_synthetic_is_deterministic():
+    first = SyntheticCaptureBackend((200, 100), origin=(-50, 0))
+    second = SyntheticCaptureBackend((200, 100), origin=(-50, 0))
+    frames = [first.grab() for _ in range(3)]
+
+    np.testing.assert_array_equal(frames[0].array, second.grab().array)
+    assert not np.array_equal(frames[0].array, frames[1].array)
+    assert frames[0].bbox == (-50, 0, 150, 100)
+
+    crop = second.grab((0, 10, 20, 30))
+    np.testing.assert_array_equal(crop.array, frames[1].array[10:30, 50:70])
+
+
+def test_synthetic_custom_generator():
+    backend = SyntheticCaptureBackend((8, 4), generator=lambda index, width, height: _solid(index, (width, height)))
+    assert [int(backend.grab().array[0, 0, 0]) for _ in range(3)] == [0, 1, 2]
+
+
+def test_create_capture_backend_from_spec(tmp_path):
+    backend = create_capture_backend("synthetic:320x200")
+    assert isinstance(backend, SyntheticCaptureBackend)
+    assert (backend.width, backend.height) == (320, 200)
+    assert isinstance(create_capture_backend(f"sequence:{tmp_path}"), SequenceCaptureBackend)
+    assert isinstance(create_capture_backend(f"replay:{tmp_path}"), ReplayCaptureBackend)
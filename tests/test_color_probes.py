@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from modules.color import format_probes, parse_probes
+from utils.capture import SyntheticCaptureBackend
+from utils.recognition import ColorRecognizer, PixelProbeSet
+from utils.screenshot import ScreenshotManager
+
+
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+
+
+@pytest.fixture
+def image():
+    array = np.zeros((20, 30, 3), dtype=np.uint8)
+    array[5, 10] = RED
+    array[15, 25] = GREEN
+    return array
+
+
+def test_all_mode_requires_every_probe(image):
+    probes = [(10, 5, RED, 0), (25, 15, GREEN, 0)]
+    matched, hits = ColorRecognizer.match_probes(image, probes)
+    assert matched
+    assert hits.tolist() == [True, True]
+
+    matched, hits = ColorRecognizer.match_probes(image, [(10, 5, RED, 0), (25, 15, RED, 0)])
+    assert not matched
+    assert hits.tolist() == [True, False]
+
+
+def test_any_mode_needs_one_probe(image):
+    probes = [(0, 0, RED, 0), (25, 15, GREEN, 0)]
+    assert ColorRecognizer.match_probes(image, probes, mode="any")[0]
+    assert not ColorRecognizer.match_probes(image, probes, mode="all")[0]
+    assert not ColorRecognizer.match_probes(image, [(0, 0, RED, 0)], mode="any")[0]
+
+
+def test_tolerance_is_per_channel_and_inclusive(image):
+    assert ColorRecognizer.match_probes(image, [(10, 5, (245, 10, 10), 10)])[0]
+    assert not ColorRecognizer.match_probes(image, [(10, 5, (244, 0, 0), 10)])[0]
+
+
+def test_probes_outside_image_are_misses(image):
+    matched, hits = ColorRecognizer.match_probes(image, [(10, 5, RED, 0), (30, 5, (0, 0, 0), 255)], mode="any")
+    assert matched
+    assert hits.tolist() == [True, False]
+    assert not ColorRecognizer.match_probes(image, [(-1, 0, (0, 0, 0), 255)])[0]
+
+
+def test_origin_offsets_screen_coordinates(image):
+    probes = PixelProbeSet([(110, 205, RED, 0)])
+    assert ColorRecognizer.match_probes(image, probes, origin=(100, 200))[0]
+    assert not ColorRecognizer.match_probes(image, probes)[0]
+
+
+def test_accepts_pil_image_and_frame_region(image):
+    probes = PixelProbeSet([(10, 5, RED, 0), (25, 15, GREEN, 0)])
+    assert ColorRecognizer.match_probes(Image.fromarray(image), probes)[0]
+
+    from utils.frame import Frame
+    frame = Frame(image, origin=(50, 60))
+    region = frame.region((55, 62, 80, 80))
+    assert ColorRecognizer.match_probes(region, [(5, 3, RED, 0)])[0]
+
+
+def test_probe_set_validation():
+    with pytest.raises(ValueError):
+        PixelProbeSet([])
+    with pytest.raises(ValueError):
+        PixelProbeSet([(0, 0, RED, 0)], mode="most")
+    assert PixelProbeSet([(3, 4, RED, 0), (10, 2, RED, 0)]).bbox == (3, 2, 11, 5)
+
+
+def test_screenshot_manager_probe_pixels(image):
+    manager = ScreenshotManager()
+    old_backend = manager.capture_backend
+    manager.set_capture_backend(SyntheticCaptureBackend(size=(30, 20), generator=lambda index, width, height: image))
+    try:
+        matched, hits = manager.probe_pixels(PixelProbeSet([(10, 5, RED, 0), (25, 15, GREEN, 0)]))
+        assert matched
+        assert hits.tolist() == [True, True]
+    finally:
+        manager.set_capture_backend(old_backend)
+
+
+def test_parse_and_format_probes_round_trip():
+    probes = parse_probes("10,5:255,0,0； 25,15:0,255,0;", 12)
+    assert probes == [(10, 5, RED, 12), (25, 15, GREEN, 12)]
+    assert format_probes(probes) == "10,5:255,0,0; 25,15:0,255,0"
+    assert parse_probes("", 10) == []
+    with pytest.raises(ValueError):
+        parse_probes("10,5", 10)
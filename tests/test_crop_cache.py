@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import utils.frame as frame_module
+from utils.frame import CropCache, Frame
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # 区域对象使用独立的缓存，统计不受其他测试影响
+    cache = CropCache(max_entries=8)
+    monkeypatch.setattr(frame_module, "_crop_cache", cache)
+    return cache
+
+
+def _frame(seed=0, size=(120, 80)):
+    rng = np.random.default_rng(seed)
+    return Frame(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8), origin=(100, 50))
+
+
+def test_same_region_is_shared_between_consumers(cache):
+    frame = _frame()
+    first = frame.region((110, 60, 150, 90)).gray
+    second = frame.region((110, 60, 150, 90)).gray
+    assert second is first
+    assert not first.flags.writeable
+    assert cache.get_stats()["misses"] == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_contained_region_is_cut_from_cached_container(cache):
+    frame = _frame()
+    outer = frame.region((100, 50, 200, 120))
+    inner = frame.region((120, 70, 150, 100))
+
+    hsv = outer.hsv
+    inner_hsv = inner.hsv
+    assert np.shares_memory(inner_hsv, hsv)
+    np.testing.assert_array_equal(inner_hsv, hsv[20:50, 20:50])
+    np.testing.assert_array_equal(inner.bgr, inner.rgb[:, :, ::-1])
+    stats = cache.get_stats()
+    assert stats["subview_hits"] == 1
+    assert stats["misses"] == 2  # outer.hsv 和 inner.bgr
+
+
+def test_subviews_only_for_per_pixel_reps(cache):
+    frame = _frame()
+    frame.region((100, 50, 200, 120)).pyramid(1)
+    frame.region((120, 70, 160, 110)).pyramid(1)
+    assert cache.get_stats()["subview_hits"] == 0
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_partial_overlap_is_not_a_container(cache):
+    frame = _frame()
+    frame.region((100, 50, 150, 100)).gray
+    frame.region((140, 90, 180, 120)).gray
+    assert cache.get_stats()["subview_hits"] == 0
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_new_frame_does_not_reuse_previous_frame(cache):
+    old = _frame(seed=1)
+    new = _frame(seed=2)
+    region = (110, 60, 150, 90)
+
+    old_gray = old.region(region).gray
+    new_gray = new.region(region).gray
+    assert new_gray is not old_gray
+    assert not np.array_equal(new_gray, old_gray)
+    # 新帧中的小区域也不会从上一帧的大区域切出
+    old.region((100, 50, 220, 130)).gray
+    new.region((155, 95, 175, 110)).gray
+    assert cache.get_stats()["subview_hits"] == 0
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = CropCache(max_entries=3)
+    builds = []
+
+    def build(value):
+        def run():
+            builds.append(value)
+            return np.full((2, 2), value, dtype=np.uint8)
+        return run
+
+    for value in range(3):
+        cache.get(1, (value, 0, value + 1, 1), "gray", build(value))
+    cache.get(1, (0, 0, 1, 1), "gray", build(0))  # 刷新最早的条目
+    cache.get(1, (3, 0, 4, 1), "gray", build(3))  # 淘汰 (1, 0, 2, 1)
+
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["entries"] == 3
+    cache.get(1, (0, 0, 1, 1), "gray", build(0))
+    cache.get(1, (1, 0, 2, 1), "gray", build(1))
+    assert builds == [0, 1, 2, 3, 1]
+
+
+def test_clear_and_reset_stats():
+    cache = CropCache()
+    cache.get(1, (0, 0, 2, 2), "gray", lambda: np.zeros((2, 2), dtype=np.uint8))
+    cache.clear()
+    cache.reset_stats()
+    built = []
+    cache.get(1, (0, 0, 2, 2), "gray", lambda: built.append(1) or np.zeros((2, 2), dtype=np.uint8))
+    assert built == [1]
+    assert cache.get_stats() == {"hits": 0, "subview_hits": 0, "misses": 1, "evictions": 0,
+                                 "entries": 1, "hit_rate": 0.0}
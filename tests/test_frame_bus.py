@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from utils.capture import SyntheticCaptureBackend
+from utils.screenshot import FrameBus, ScreenshotManager
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    # 独立的截图管理器和总线，不影响全局单例
+    monkeypatch.setattr(ScreenshotManager, "_instance", None)
+    monkeypatch.setattr(FrameBus, "_instance", None)
+    manager = ScreenshotManager(cache_duration=0.0)
+    manager.set_capture_backend(SyntheticCaptureBackend((320, 240)))
+    bus = FrameBus(frame_rate=50)
+    yield bus
+    bus._stop_event.set()
+    bus.wake()
+
+
+def test_delivery_ignores_wall_clock_steps(bus, monkeypatch):
+    # 系统时间回拨一小时：按 time.time() 计算时 is_due 会一直为 False，延迟为负数
+    wall_clock = time.time() - 3600
+    monkeypatch.setattr(time, "time", lambda: wall_clock)
+
+    subscription = bus.subscribe((10, 10, 60, 40), interval=0.02, name="test")
+    try:
+        regions = [subscription.get(timeout=1.0) for _ in range(3)]
+    finally:
+        subscription.close()
+
+    assert all(region is not None for region in regions)
+    stats = subscription.get_stats()
+    assert stats["delivered"] == 3
+    assert 0.0 <= stats["max_lag"] < 1.0
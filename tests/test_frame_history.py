@@ -0,0 +1,118 @@
+import numpy as np
+from PIL import Image
+
+from utils.frame import Frame
+from utils.frame_history import FrameHistory
+
+
+REGIONS = [(0, 0, 64, 48), (64, 16, 128, 80)]
+
+
+def _frames(count, seed=0):
+    """随机背景上逐帧变化一小块的帧序列，返回 (Frame, 各区域期望像素)"""
+    rng = np.random.default_rng(seed)
+    array = rng.integers(0, 256, (96, 160, 3), dtype=np.uint8)
+    frames = []
+    for index in range(count):
+        array = array.copy()
+        y, x = rng.integers(0, 80), rng.integers(0, 144)
+        array[y:y + 16, x:x + 16] = rng.integers(0, 256, 3, dtype=np.uint8)
+        frame = Frame(array)
+        frames.append((frame, {region: array[region[1]:region[3], region[0]:region[2]].copy()
+                               for region in REGIONS}))
+    return frames
+
+
+def test_reconstructs_every_frame_without_eviction():
+    history = FrameHistory(budget_mb=64, keyframe_interval=5)
+    frames = _frames(12)
+    for frame, _ in frames:
+        history.record(frame, REGIONS)
+
+    assert history.get_stats()["evicted"] == 0
+    for frame, expected in frames:
+        regions = history.get(frame.frame_id)["regions"]
+        for region in REGIONS:
+            np.testing.assert_array_equal(regions[region], expected[region])
+
+
+def test_reconstructs_after_eviction_rebases_deltas():
+    frames = _frames(40, seed=1)
+    history = FrameHistory(budget_mb=64, keyframe_interval=10)
+    for frame, _ in frames:
+        history.record(frame, REGIONS)
+    # 预算只够保留一部分帧：淘汰从关键帧中间截断增量链
+    stats = history.get_stats()
+    history.set_budget((stats["reference_bytes"] + stats["stored_bytes"] * 0.45) / (1024 * 1024))
+
+    stats = history.get_stats()
+    assert stats["evicted"] > 0
+    assert stats["stored_bytes"] + stats["reference_bytes"] <= stats["budget_bytes"]
+
+    kept = {frame_id for frame_id, _ in history.frame_ids()}
+    assert frames[0][0].frame_id not in kept
+    for frame, expected in frames:
+        result = history.get(frame.frame_id)
+        if frame.frame_id not in kept:
+            assert result is None
+            continue
+        for region in REGIONS:
+            np.testing.assert_array_equal(result["regions"][region], expected[region])
+
+
+def test_continuous_recording_stays_within_budget():
+    history = FrameHistory(budget_mb=0.2, keyframe_interval=4)
+    frames = _frames(60, seed=2)
+    for frame, _ in frames:
+        history.record(frame, REGIONS)
+        stats = history.get_stats()
+        assert stats["stored_bytes"] + stats["reference_bytes"] <= stats["budget_bytes"]
+
+    # 最旧的保留帧在淘汰后仍能重建
+    oldest_id = history.frame_ids()[0][0]
+    expected = next(expected for frame, expected in frames if frame.frame_id == oldest_id)
+    np.testing.assert_array_equal(history.get_region(oldest_id, REGIONS[1]), expected[REGIONS[1]])
+
+
+def test_get_at_returns_last_frame_not_after_timestamp():
+    history = FrameHistory(budget_mb=64)
+    frames = _frames(3, seed=3)
+    for offset, (frame, _) in enumerate(frames):
+        frame.timestamp = 100.0 + offset
+        history.record(frame, REGIONS)
+
+    assert history.get_at(101.5)["frame_id"] == frames[1][0].frame_id
+    assert history.get_at(99.0) is None
+
+
+def test_dump_matches_history_and_decodes_outside_lock(tmp_path, monkeypatch):
+    import utils.frame_history as frame_history
+
+    frames = _frames(25, seed=4)
+    history = FrameHistory(budget_mb=64, keyframe_interval=6)
+    for offset, (frame, _) in enumerate(frames):
+        frame.timestamp = 100.0 + offset
+        history.record(frame, REGIONS)
+
+    decode = frame_history._decode
+    locked = []
+
+    def checked_decode(*args):
+        locked.append(history._lock.locked())
+        return decode(*args)
+
+    monkeypatch.setattr(frame_history, "_decode", checked_decode)
+    # 从增量帧中间开始导出，需要从之前的关键帧解码
+    assert history.dump(str(tmp_path), since=115.0) == 10 * len(REGIONS)
+    assert locked and not any(locked)
+
+    for frame, expected in frames[15:]:
+        for region in REGIONS:
+            path = tmp_path / f"{frame.frame_id}_{region[0]}_{region[1]}.png"
+            np.testing.assert_array_equal(np.asarray(Image.open(path)), expected[region])
+
+    crop_dir = tmp_path / "crop"
+    assert history.dump(str(crop_dir), region=(70, 20, 90, 40), since=124.0) == 1
+    crop = np.asarray(Image.open(crop_dir / f"{frames[-1][0].frame_id}_70_20.png"))
+    np.testing.assert_array_equal(crop, frames[-1][1][REGIONS[1]][4:24, 6:26])
+    assert history.dump(str(tmp_path / "none"), since=200.0) == 0
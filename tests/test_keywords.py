@@ -0,0 +1,59 @@
+import random
+
+from utils.keywords import KeywordMatcher, get_keyword_matcher, parse_keywords
+
+
+def _naive_find_all(keywords, text):
+    """逐个关键词逐个位置比较，按结束位置排序（同一位置结束时长的在前）"""
+    text = text.lower()
+    matches = []
+    for keyword in keywords:
+        start = text.find(keyword)
+        while start != -1:
+            matches.append((start + len(keyword), -len(keyword), keyword, start))
+            start = text.find(keyword, start + 1)
+    return [(keyword, start, start - negative_length) for _, negative_length, keyword, start in sorted(matches)]
+
+
+def test_parse_keywords_normalizes():
+    assert parse_keywords(" 开门, Door ,door,,确定 ") == ("开门", "door", "确定")
+    assert parse_keywords(["A", " b ", "a"]) == ("a", "b")
+    assert parse_keywords(None) == ()
+
+
+def test_matcher_agrees_with_naive_search():
+    rng = random.Random(0)
+    alphabet = "abc开门"
+    for _ in range(300):
+        keywords = parse_keywords(["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                                   for _ in range(rng.randint(1, 6))])
+        text = "".join(rng.choice(alphabet + "ABC ") for _ in range(rng.randint(0, 40)))
+        matcher = KeywordMatcher(keywords)
+
+        expected = _naive_find_all(keywords, text)
+        found = [(match.keyword, match.start, match.end) for match in matcher.find_all(text)]
+        assert sorted(found) == sorted(expected)
+
+        first = matcher.search(text)
+        assert matcher.contains(text) == bool(expected)
+        if expected:
+            assert (first.keyword, first.start, first.end) == expected[0]
+        else:
+            assert first is None
+
+
+def test_search_prefers_earliest_end_then_longest():
+    matcher = KeywordMatcher(["she", "he", "hers"])
+    match = matcher.search("USHERS")
+    assert (match.keyword, match.start, match.end) == ("she", 1, 4)
+
+
+def test_empty_matcher_matches_nothing():
+    matcher = KeywordMatcher([])
+    assert not matcher
+    assert matcher.search("anything") is None
+    assert matcher.find_all("anything") == []
+
+
+def test_matchers_are_shared_by_keyword_set():
+    assert get_keyword_matcher("Door,开门") is get_keyword_matcher(["开门", "door", "DOOR"])
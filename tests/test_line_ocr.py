@@ -0,0 +1,95 @@
+import pytest
+from PIL import Image, ImageDraw
+
+from utils.recognition import OCRRecognizer, StubOCREngine, get_ocr_cache, set_ocr_engine
+from utils.text_presence import segment_text_lines
+
+
+LINE_SPACING = 16
+LINE_COUNT = 12
+
+
+class LineEngine(StubOCREngine):
+    """按行图像内容返回固定标签的替身引擎，记录送入引擎的每个行图像"""
+
+    def __init__(self):
+        self.labels = {}
+        self.strips = []
+        super().__init__(self._label)
+
+    def _label(self, image, lang, config):
+        content = image.tobytes()
+        self.strips.append(content)
+        return self.labels.setdefault(content, f"line{len(self.labels)}")
+
+
+@pytest.fixture
+def engine():
+    engine = LineEngine()
+    set_ocr_engine(engine)
+    get_ocr_cache().clear()
+    yield engine
+    set_ocr_engine(None)
+    get_ocr_cache().clear()
+
+
+def _log_canvas():
+    """滚动日志：白底黑字，每行文字不同"""
+    image = Image.new('L', (160, LINE_SPACING * LINE_COUNT + 8), 255)
+    draw = ImageDraw.Draw(image)
+    for index in range(LINE_COUNT):
+        draw.text((4, 4 + index * LINE_SPACING), f"msg {index} {'#' * index}", fill=0)
+    return image.point(lambda p: p > 128 and 255)
+
+
+def _view(canvas, offset, height=84):
+    return canvas.crop((0, offset, canvas.width, offset + height))
+
+
+def test_segment_separates_each_text_line():
+    lines = segment_text_lines(_view(_log_canvas(), 0))
+    assert len(lines) == 5
+    tops = [top for top, _ in lines]
+    assert all(later - earlier == LINE_SPACING for earlier, later in zip(tops, tops[1:]))
+    assert all(bottom - top < LINE_SPACING for top, bottom in lines)
+
+
+def test_segment_ignores_blank_and_full_width_rules():
+    image = Image.new('L', (100, 40), 255)
+    assert segment_text_lines(image) == []
+    ImageDraw.Draw(image).line((0, 20, 99, 20), fill=0)
+    assert segment_text_lines(image) == []
+
+
+def test_scrolled_lines_are_served_from_cache(engine):
+    canvas = _log_canvas()
+    first = OCRRecognizer.read_lines(_view(canvas, 0))
+    first_lines = first.text.split("\n")
+    assert len(first_lines) == 5
+    assert len(engine.strips) == 5
+
+    # 向上滚动两行多几个像素：仍完整可见的行直接复用缓存，只有新出现（或被截断）的行送入引擎
+    engine.strips.clear()
+    second = OCRRecognizer.read_lines(_view(canvas, 2 * LINE_SPACING + 3))
+    second_lines = second.text.split("\n")
+
+    assert second_lines[:3] == first_lines[2:]
+    assert not set(second_lines[3:]) & set(first_lines)
+    assert len(engine.strips) == 2
+
+
+def test_unchanged_view_does_not_reach_engine(engine):
+    view = _view(_log_canvas(), 5)
+    first = OCRRecognizer.read_lines(view)
+    calls = engine.calls
+    assert OCRRecognizer.read_lines(view.copy()).text == first.text
+    assert engine.calls == calls
+
+
+def test_line_boxes_are_in_view_coordinates(engine):
+    view = _view(_log_canvas(), 0)
+    result = OCRRecognizer.read_lines(view)
+    tops = [top for top, _ in segment_text_lines(view)]
+    line_tops = sorted({box[1] for box in result.boxes})
+    assert line_tops == tops
+    assert result.find(result.words[-1])[1] > result.find(result.words[0])[1]
@@ -0,0 +1,231 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+import utils.recognition as recognition
+from utils.recognition import OCREngineError, OCRWorkerError, StubOCREngine, TesseractWorkerEngine
+
+
+CRASH_WIDTH = 13
+HANG_WIDTH = 7
+FAIL_WIDTH = 9
+SLOW_WIDTH = 11
+
+
+class FakeRunner:
+    """工作进程内的替身识别器：按图像宽度模拟崩溃、卡死和识别错误"""
+
+    def __init__(self, lang, config):
+        self.lang = lang
+
+    def image_to_string(self, image):
+        width = image.size[0]
+        if width == CRASH_WIDTH:
+            os._exit(1)
+        if width == HANG_WIDTH:
+            time.sleep(60)
+        if width == FAIL_WIDTH:
+            raise ValueError("bad image")
+        if width == SLOW_WIDTH:
+            time.sleep(0.5)
+        return f"{self.lang}:{image.size[0]}x{image.size[1]}:{os.getpid()}"
+
+    def image_to_data(self, image):
+        return {"text": [self.image_to_string(image)]}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    if sys.platform.startswith('win'):
+        pytest.skip("fork start method is required to inject the fake runner")
+    # fork 启动的工作进程继承这里替换的识别器
+    monkeypatch.setattr(recognition, "TESSEROCR_AVAILABLE", False)
+    monkeypatch.setattr(recognition, "_StdinRunner", FakeRunner)
+    engine = TesseractWorkerEngine(context='fork', request_timeout=2.0)
+    yield engine
+    engine.close()
+
+
+def _worker(engine):
+    return next(iter(engine._pools.values())).workers[0]
+
+
+def test_stub_engine_default_text():
+    engine = StubOCREngine(text="hello world")
+    image = Image.new('L', (100, 20))
+    assert engine.image_to_string(image) == "hello world"
+
+    data = engine.image_to_data(image)
+    assert data["text"] == ["hello", "world"]
+    assert data["left"] == [0, 50]
+    assert data["width"] == [50, 50]
+    assert data["height"] == [20, 20]
+    assert engine.calls == 2
+
+
+def test_stub_engine_responder_receives_arguments():
+    seen = []
+
+    def responder(image, lang, config):
+        seen.append((image.size, lang, config))
+        return "" if lang == "eng" else "文本"
+
+    engine = StubOCREngine(responder)
+    image = Image.new('L', (40, 10))
+    assert engine.image_to_data(image, "eng", "--psm 7")["text"] == []
+    assert engine.image_to_string(image, "chi_sim") == "文本"
+    assert seen == [((40, 10), "eng", "--psm 7"), ((40, 10), "chi_sim", "")]
+
+
+def test_worker_reuses_process(engine):
+    first = engine.image_to_string(Image.new('L', (40, 10)), "eng", "--psm 7")
+    second = engine.image_to_string(Image.new('L', (41, 10)), "eng", "--psm 7")
+    assert first.split(":")[:2] == ["eng", "40x10"]
+    assert first.split(":")[2] == second.split(":")[2]
+    assert engine.restarts == 0
+
+
+def test_worker_handoff_uses_shared_memory(engine):
+    engine.image_to_string(Image.new('L', (40, 10)), "eng", "")
+    engine.image_to_string(Image.new('1', (40, 10)), "eng", "")
+    stats = engine.get_stats()
+    assert stats["shared_handoffs"] == 1
+    assert stats["pipe_handoffs"] == 1
+    assert engine._store.get_stats()["refcounts"] == [0] * engine.SHARED_SLOT_COUNT
+
+
+def test_dead_worker_is_restarted(engine):
+    image = Image.new('L', (40, 10))
+    pid = engine.image_to_string(image, "eng", "").split(":")[2]
+
+    worker = _worker(engine)
+    worker._process.kill()
+    worker._process.join(timeout=2)
+
+    result = engine.image_to_string(image, "eng", "")
+    assert result.split(":")[2] != pid
+    assert engine.restarts == 1
+
+
+def test_crash_during_request_retries_once(engine):
+    with pytest.raises(OCRWorkerError):
+        engine.image_to_string(Image.new('L', (CRASH_WIDTH, 10)), "eng", "")
+    assert engine.restarts == 1
+
+    # 重启后的工作进程继续可用
+    assert engine.image_to_string(Image.new('L', (40, 10)), "eng", "").startswith("eng:40x10")
+
+
+def test_hung_worker_times_out_and_restarts(engine):
+    engine.request_timeout = 0.3
+    with pytest.raises(OCRWorkerError):
+        engine.image_to_string(Image.new('L', (HANG_WIDTH, 10)), "eng", "")
+    assert engine.restarts == 1
+
+    # 重试仍然超时的进程被关闭，下次请求启动新进程而不是读到过期回复
+    assert engine.image_to_string(Image.new('L', (40, 10)), "eng", "").startswith("eng:40x10")
+    assert engine.restarts == 2
+
+
+def test_recognition_error_does_not_restart(engine):
+    with pytest.raises(OCREngineError) as info:
+        engine.image_to_string(Image.new('L', (FAIL_WIDTH, 10)), "eng", "")
+    assert not isinstance(info.value, OCRWorkerError)
+    assert "bad image" in str(info.value)
+    assert engine.restarts == 0
+
+
+def test_check_health_restarts_dead_workers(engine):
+    engine.image_to_string(Image.new('L', (40, 10)), "eng", "")
+    _worker(engine)._process.kill()
+    _worker(engine)._process.join(timeout=2)
+
+    assert engine.check_health()
+    assert engine.restarts == 1
+    assert all(worker["alive"] for worker in engine.get_stats()["workers"])
+
+
+def test_pool_runs_same_language_in_parallel(engine):
+    engine.set_concurrency(2)
+    results = []
+
+    def recognize():
+        results.append(engine.image_to_string(Image.new('L', (SLOW_WIDTH, 10)), "eng", ""))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=recognize) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    assert len({result.split(":")[2] for result in results}) == 2
+    assert elapsed < 0.9
+    assert len(engine.get_stats()["workers"]) == 2
+
+
+def test_pool_is_bounded(engine):
+    threads = [threading.Thread(target=engine.image_to_string, args=(Image.new('L', (40, 10)), "eng", ""))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(engine.get_stats()["workers"]) == 1
+
+
+def test_thread_limit_set_for_single_worker(monkeypatch):
+    from utils.ocr_executor import OCRExecutor
+
+    monkeypatch.delenv('OMP_THREAD_LIMIT', raising=False)
+    executor = OCRExecutor(max_workers=1)
+    try:
+        assert os.environ['OMP_THREAD_LIMIT'] == '1'
+    finally:
+        executor.shutdown(wait=True)
+
+
+def test_warm_up_skipped_for_non_persistent_engine(engine):
+    recognition.set_ocr_engine(StubOCREngine(text="0 1"))
+    try:
+        calls = []
+        assert recognition.warm_up_ocr([("eng", "")], lambda *args: calls.append(args)) == []
+        assert calls == []
+        assert recognition.get_ocr_engine().calls == 0
+    finally:
+        recognition.set_ocr_engine(None)
+
+    # 没有 tesserocr 时工作进程每次识别都启动 tesseract，同样不预热
+    assert not engine.persistent
+    recognition.set_ocr_engine(engine)
+    try:
+        assert recognition.warm_up_ocr([("eng", "")]) == []
+        assert engine.get_stats()["workers"] == []
+    finally:
+        recognition._ocr_engine = None
+
+
+def test_warm_up_starts_every_pool_worker(engine, monkeypatch):
+    monkeypatch.setattr(TesseractWorkerEngine, "persistent", True)
+    engine.set_concurrency(2)
+    recognition.set_ocr_engine(engine)
+    try:
+        ready = []
+        threads = recognition.warm_up_ocr([("eng", ""), ("eng", "")],
+                                          lambda language, config, elapsed, error: ready.append(error))
+        for thread in threads:
+            thread.join(timeout=10)
+        assert ready == [None]
+        workers = engine.get_stats()["workers"]
+        assert len(workers) == 2
+        assert all(worker["alive"] for worker in workers)
+    finally:
+        recognition._ocr_engine = None
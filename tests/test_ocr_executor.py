@@ -0,0 +1,54 @@
+import threading
+
+from utils.ocr_executor import OCRExecutor
+
+
+def test_executor_coalesces_busy_key():
+    executor = OCRExecutor(max_workers=2)
+    release = threading.Event()
+    runs = []
+
+    def task(value):
+        runs.append(value)
+        release.wait(2)
+
+    try:
+        assert executor.submit("group", task, 1)
+        assert executor.is_busy("group")
+        # 同一个 key 的上一个任务还没完成：合并
+        assert not executor.submit("group", task, 2)
+        assert not executor.submit("group", task, 3)
+        # 其他 key 不受影响
+        assert executor.submit("other", task, 4)
+
+        release.set()
+        assert executor.wait_idle(2)
+        assert sorted(runs) == [1, 4]
+
+        assert executor.submit("group", task, 5)
+        assert executor.wait_idle(2)
+        stats = executor.get_stats()
+        assert stats["group"]["completed"] == 2
+        assert stats["group"]["coalesced"] == 2
+        assert stats["other"]["coalesced"] == 0
+    finally:
+        executor.shutdown()
+
+
+def test_executor_runs_keys_concurrently():
+    executor = OCRExecutor(max_workers=3)
+    barrier = threading.Barrier(3, timeout=2)
+    try:
+        for key in range(3):
+            assert executor.submit(key, barrier.wait)
+        assert executor.wait_idle(3)
+        assert not barrier.broken
+    finally:
+        executor.shutdown()
+
+
+def test_executor_rejects_after_shutdown():
+    executor = OCRExecutor(max_workers=1)
+    executor.shutdown()
+    assert not executor.submit("group", lambda: None)
+    assert not executor.is_busy("group")
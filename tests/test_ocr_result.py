@@ -0,0 +1,39 @@
+from utils.recognition import OCRResult
+
+
+def _result(words, boxes, lines):
+    return OCRResult(words, boxes, [90.0] * len(words), lines)
+
+
+def test_ocr_result_find_single_word():
+    result = _result(["Open", "the", "Door"],
+                     [(0, 0, 40, 10), (50, 0, 30, 10), (90, 0, 40, 10)],
+                     [(1, 1, 1)] * 3)
+    assert result.text == "Open the Door"
+    assert result.find("door") == (110, 5)
+    assert result.find("window") is None
+
+
+def test_ocr_result_find_spans_words_and_lines():
+    result = _result(["Start", "Game", "Quit"],
+                     [(10, 0, 50, 20), (70, 0, 40, 20), (10, 30, 40, 20)],
+                     [(1, 1, 1), (1, 1, 1), (1, 1, 2)])
+    assert result.text == "Start Game\nQuit"
+    # 跨两个单词的关键词取外接框中心
+    assert result.find("start game") == (60, 10)
+    # 关键词从单词中间开始
+    assert result.find("tart") == (35, 10)
+    assert result.find("game\nquit") == (60, 25)
+
+
+def test_ocr_result_from_data_skips_blank_words():
+    data = {
+        "text": ["", "Hello", " ", "世界"],
+        "left": [0, 0, 0, 60], "top": [0, 0, 0, 0], "width": [100, 50, 0, 40], "height": [20, 20, 0, 20],
+        "conf": [-1, 95, -1, 85],
+        "block_num": [1, 1, 1, 1], "par_num": [1, 1, 1, 1], "line_num": [0, 1, 1, 1],
+    }
+    result = OCRResult.from_data(data)
+    assert result.words == ["Hello", "世界"]
+    assert result.confidence == 90.0
+    assert result.find("世界") == (80, 10)
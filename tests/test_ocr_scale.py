@@ -0,0 +1,108 @@
+import tkinter as tk
+
+import pytest
+from PIL import Image, ImageDraw
+
+from modules.ocr import OCRModule
+from utils.recognition import (OCR_SCALE_LIMITS, OCR_SCALE_RANGE, OCR_SCALE_STEP, OCR_TARGET_GLYPH_HEIGHT,
+                               OCRRecognizer, StubOCREngine, choose_ocr_scale, set_ocr_engine)
+
+
+class ScaleVar:
+    """只实现 get() 的变量替身，与 tk.StringVar 的读取方式相同"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+@pytest.fixture
+def sizes():
+    sizes = []
+
+    def responder(image, lang, config):
+        sizes.append(image.size)
+        return "Door Open"
+
+    set_ocr_engine(StubOCREngine(responder))
+    yield sizes
+    set_ocr_engine(None)
+
+
+def _small_text():
+    image = Image.new('RGB', (160, 24), (255, 255, 255))
+    ImageDraw.Draw(image).text((4, 6), "door open 42", fill=(0, 0, 0))
+    return image
+
+
+def test_choose_scale_targets_glyph_height():
+    assert choose_ocr_scale(OCR_TARGET_GLYPH_HEIGHT) == 1.0
+    assert choose_ocr_scale(OCR_TARGET_GLYPH_HEIGHT / 2) == 2.0
+    assert choose_ocr_scale(0) == 1.0
+    for height in (0.5, 3, 7, 13, 27, 55, 400):
+        scale = choose_ocr_scale(height)
+        assert scale % OCR_SCALE_STEP == 0
+        assert OCR_SCALE_RANGE[0] <= scale <= OCR_SCALE_RANGE[1]
+
+
+def test_chosen_scale_is_within_manual_limits():
+    # 校准选出的倍数始终是手动填写也允许的值
+    assert OCR_SCALE_LIMITS[0] <= OCR_SCALE_RANGE[0] <= OCR_SCALE_RANGE[1] <= OCR_SCALE_LIMITS[1]
+    assert choose_ocr_scale(0.01) == OCR_SCALE_RANGE[1]
+    assert choose_ocr_scale(1000) == OCR_SCALE_RANGE[0]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2", 2.0), ("1.5", 1.5), ("10", OCR_SCALE_LIMITS[1]), ("0.1", OCR_SCALE_LIMITS[0]),
+    ("0", 1.0), ("-2", 1.0), ("abc", 1.0), ("nan", 1.0), (tk.TclError("bad"), 1.0),
+])
+def test_group_scale_is_parsed_and_clamped(value, expected):
+    assert OCRModule._parse_scale(ScaleVar(value)) == expected
+
+
+def test_calibration_reports_before_and_after(sizes):
+    report = OCRRecognizer.calibrate_scale(_small_text(), rounds=2)
+
+    assert set(report) == {"scale", "text_height", "before", "after"}
+    assert report["text_height"] > 0
+    assert report["scale"] == choose_ocr_scale(report["text_height"])
+    assert report["scale"] > 1.0
+    for key in ("before", "after"):
+        assert set(report[key]) == {"latency_ms", "confidence", "text"}
+        assert report[key]["latency_ms"] >= 0
+        assert report[key]["confidence"] == 95.0
+        assert report[key]["text"] == "Door Open"
+
+    # 原尺寸和缩放后各测量 rounds 次
+    assert len(sizes) == 4
+    assert sizes[2][0] > sizes[0][0]
+
+
+def test_calibration_keeps_original_scale_when_confidence_drops():
+    base_width = []
+
+    def responder(image, lang, config):
+        if not base_width:
+            base_width.append(image.size[0])
+        return "Door" if image.size[0] == base_width[0] else ""
+
+    set_ocr_engine(StubOCREngine(responder))
+    try:
+        report = OCRRecognizer.calibrate_scale(_small_text(), rounds=1)
+    finally:
+        set_ocr_engine(None)
+
+    assert report["scale"] == 1.0
+    assert report["before"]["confidence"] == 95.0
+    assert report["after"]["confidence"] == 0.0
+
+
+def test_calibration_without_text_keeps_scale(sizes):
+    report = OCRRecognizer.calibrate_scale(Image.new('RGB', (80, 20), (255, 255, 255)), rounds=1)
+    assert report["scale"] == 1.0
+    assert report["after"] == report["before"]
+    assert len(sizes) == 1
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from utils.scheduler import DeadlineScheduler
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_due_keys_come_out_in_deadline_order():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock)
+    scheduler.schedule("c", 3.0)
+    scheduler.schedule("a", 1.0)
+    scheduler.schedule("b", 2.0)
+
+    clock.now = 10.0
+    assert [scheduler.wait_next(0)[0] for _ in range(3)] == ["a", "b", "c"]
+    assert scheduler.wait_next(0) is None
+
+
+def test_equal_deadlines_keep_schedule_order():
+    clock = FakeClock(5.0)
+    scheduler = DeadlineScheduler(clock)
+    for key in (2, 0, 1):
+        scheduler.schedule(key, 1.0)
+    assert [scheduler.wait_next(0)[0] for _ in range(3)] == [2, 0, 1]
+
+
+def test_reschedule_and_remove_discard_stale_entries():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock)
+    scheduler.schedule("a", 1.0)
+    scheduler.schedule("b", 2.0)
+    scheduler.schedule("c", 3.0)
+    scheduler.schedule("a", 4.0)
+    scheduler.remove("b")
+
+    clock.now = 10.0
+    assert scheduler.wait_next(0) == ("c", 3.0)
+    assert scheduler.wait_next(0) == ("a", 4.0)
+    assert scheduler.wait_next(0) is None
+    assert scheduler.deadline("a") is None
+
+
+def test_not_due_key_waits_for_timeout():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(clock)
+    scheduler.schedule("a", 1.0)
+    assert scheduler.wait_next(0) is None
+    assert scheduler.deadline("a") == 1.0
+
+
+def test_earlier_schedule_wakes_waiter():
+    scheduler = DeadlineScheduler()
+    scheduler.schedule("late", time.monotonic() + 60)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(scheduler.wait_next(5)))
+    waiter.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    scheduler.schedule_in("soon", 0.05)
+    waiter.join(2)
+    assert result[0][0] == "soon"
+    assert time.perf_counter() - started < 1
+
+
+def test_stop_wakes_waiter_and_sleep():
+    scheduler = DeadlineScheduler()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(scheduler.wait_next()))
+    waiter.start()
+    time.sleep(0.05)
+    scheduler.stop()
+    waiter.join(2)
+    assert result == [None]
+    assert scheduler.sleep(10)
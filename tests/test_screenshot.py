@@ -0,0 +1,144 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from utils.capture import CaptureBackend, SyntheticCaptureBackend
+from utils.frame import Frame
+from utils.screenshot import ScreenshotManager, compute_capture_boxes
+
+
+class SlowBackend(CaptureBackend):
+    """每次截图耗时 delay 秒的合成后端，记录截图次数"""
+
+    name = "slow"
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.grabs = 0
+        self._synthetic = SyntheticCaptureBackend((320, 240))
+
+    def grab(self, bbox=None):
+        self.grabs += 1
+        time.sleep(self.delay)
+        return self._synthetic.grab(bbox)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    # 每个测试使用独立的截图管理器，不影响全局单例
+    monkeypatch.setattr(ScreenshotManager, "_instance", None)
+    manager = ScreenshotManager(cache_duration=10.0)
+    manager.set_capture_backend(SyntheticCaptureBackend((320, 240)))
+    return manager
+
+
+def _covered(region, boxes):
+    return any(box[0] <= region[0] and box[1] <= region[1] and box[2] >= region[2] and box[3] >= region[3]
+               for box in boxes)
+
+
+def test_capture_boxes_merge_overlapping_and_keep_distant():
+    boxes = compute_capture_boxes([(0, 0, 100, 100), (50, 50, 150, 150), (1000, 1000, 1100, 1100)])
+    assert boxes == [(0, 0, 150, 150), (1000, 1000, 1100, 1100)]
+
+
+def test_capture_boxes_normalize_and_drop_contained():
+    boxes = compute_capture_boxes([(100, 100, 0, 0), (10, 10, 20, 20), (5, 5, 5, 50), None])
+    assert boxes == [(0, 0, 100, 100)]
+
+
+def test_capture_boxes_merge_close_regions():
+    # 合并后浪费的像素在 merge_ratio 以内
+    assert compute_capture_boxes([(0, 0, 100, 100), (110, 0, 210, 100)]) == [(0, 0, 210, 100)]
+
+
+def test_capture_boxes_cover_every_region_within_limit():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        regions = []
+        for _ in range(rng.integers(1, 12)):
+            left, top = rng.integers(0, 3000, 2)
+            width, height = rng.integers(10, 300, 2)
+            regions.append((int(left), int(top), int(left + width), int(top + height)))
+        boxes = compute_capture_boxes(regions, max_boxes=3)
+        assert 1 <= len(boxes) <= 3
+        assert all(_covered(region, boxes) for region in regions)
+
+
+def test_get_frame_single_flight(manager):
+    backend = SlowBackend()
+    manager.set_capture_backend(backend)
+    frames = []
+
+    def fetch():
+        frames.append(manager.get_full_frame())
+
+    threads = [threading.Thread(target=fetch) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.grabs == 1
+    assert len({frame.frame_id for frame in frames}) == 1
+    stats = manager.get_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["waits"] == 5
+
+    # 帧龄未超过上限时直接命中缓存，max_age 为 0 时重新截图
+    assert manager.get_full_frame() is frames[0]
+    assert manager.get_full_frame(max_age=0).frame_id != frames[0].frame_id
+    assert backend.grabs == 2
+
+
+def test_region_reads_from_capture_box(manager):
+    manager.register_capture_region(("ocr", 0), (10, 20, 60, 50))
+    manager.register_capture_region(("color", 0), (200, 100, 220, 130))
+    assert len(manager.get_capture_boxes()) == 2
+
+    view = manager.get_region_view((10, 20, 60, 50))
+    expected = SyntheticCaptureBackend((320, 240)).grab((10, 20, 60, 50)).array
+    np.testing.assert_array_equal(view, expected)
+
+
+def test_tile_change_detection_between_frames(manager):
+    base = np.zeros((128, 128, 3), dtype=np.uint8)
+    changed = base.copy()
+    changed[70:75, 80:90] = 255
+    sources = iter([base, changed, changed])
+
+    class ListBackend(CaptureBackend):
+        def grab(self, bbox=None):
+            return Frame(next(sources))
+
+    manager.set_capture_backend(ListBackend())
+    first = manager.get_full_frame()
+    assert first.changed((0, 0, 64, 64))  # 没有上一帧时视为变化
+    first.changed((64, 64, 128, 128))
+
+    second = manager.get_full_frame(max_age=0)
+    assert not second.changed((0, 0, 64, 64))
+    assert second.changed((64, 64, 128, 128))
+    # 上一帧没有计算过的分块无法比较，保守地视为变化
+    assert second.changed((0, 64, 64, 128))
+
+    third = manager.get_full_frame(max_age=0)
+    assert not third.changed((64, 64, 128, 128))
+    assert not third.changed((0, 64, 64, 128))
+
+
+def test_region_signature_detects_changes():
+    array = np.zeros((64, 64, 3), dtype=np.uint8)
+    frame = Frame(array)
+    signature = frame.region_signature((0, 0, 32, 32))
+
+    same = Frame(array.copy())
+    assert not same.changed((0, 0, 32, 32), since=signature)
+
+    modified = array.copy()
+    modified[40, 40, 2] = 1
+    assert Frame(modified).changed((0, 0, 64, 64), since=frame.region_signature((0, 0, 64, 64)))
+    # 变化在区域覆盖的分块之外
+    assert not Frame(modified).changed((0, 0, 32, 32), since=signature)
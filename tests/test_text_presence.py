@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from utils.frame import Frame
+from utils.recognition import OCRRecognizer, StubOCREngine, get_ocr_cache, set_ocr_engine
+from utils.text_presence import (BENCHMARK_SEED, CALIBRATION_SEED, DEFAULT_SENSITIVITY, TextPresenceFilter,
+                                 build_text_corpus, calibrate_text_filter)
+
+
+@pytest.fixture
+def engine():
+    engine = StubOCREngine(text="hello")
+    set_ocr_engine(engine)
+    get_ocr_cache().clear()
+    yield engine
+    set_ocr_engine(None)
+    get_ocr_cache().clear()
+
+
+def _blank(width=120, height=30):
+    return Image.new('L', (width, height), 255)
+
+
+def _text_image():
+    image = Image.new('L', (120, 30), 255)
+    ImageDraw.Draw(image).text((5, 8), "Hello 123", fill=0)
+    return image.point(lambda p: p > 128 and 255)
+
+
+def test_read_does_not_prefilter_by_default(engine):
+    result = OCRRecognizer.read(_blank())
+    assert result.text == "hello"
+    assert engine.calls == 1
+
+
+def test_group_filter_skips_blank_and_forces_periodic_ocr(engine):
+    text_filter = TextPresenceFilter(DEFAULT_SENSITIVITY, force_every=3)
+    results = [OCRRecognizer.read(_blank(120 + index), prefilter=text_filter).text for index in range(6)]
+    assert results == ["", "", "hello", "", "", "hello"]
+    stats = text_filter.get_stats()
+    assert (stats["checked"], stats["skipped"], stats["forced"]) == (6, 4, 2)
+
+
+def test_text_resets_consecutive_skips():
+    text_filter = TextPresenceFilter(1.0, force_every=2)
+    assert not text_filter.has_text(_blank())
+    assert text_filter.has_text(_text_image())
+    assert not text_filter.has_text(_blank())
+    assert text_filter.get_stats()["forced"] == 0
+
+
+def test_skipped_result_is_not_cached_on_region(engine):
+    frame = Frame(np.full((30, 120, 3), 255, dtype=np.uint8))
+    region = frame.region()
+    image = _blank()
+
+    skipped = OCRRecognizer.read(image, source=region, prefilter=TextPresenceFilter(force_every=0))
+    assert skipped.text == ""
+    # 同一帧同一区域上未开启预过滤的消费者仍然得到识别结果
+    assert OCRRecognizer.read(image, source=region).text == "hello"
+
+
+def test_calibration_reports_holdout():
+    assert CALIBRATION_SEED != BENCHMARK_SEED
+    corpus = build_text_corpus(40, seed=CALIBRATION_SEED)
+    holdout = build_text_corpus(40, seed=BENCHMARK_SEED)
+    result = calibrate_text_filter(corpus, holdout)
+    assert result["sensitivity"] in result["results"]
+    assert set(result["holdout"]) == {"false_skip_rate", "blank_skip_rate"}
+    assert result["results"][1.0]["false_skip_rate"] == 0.0
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from utils.capture import WindowCaptureBackend
+from utils.window_capture import WindowCaptureService
+
+
+class StubWindowBackend(WindowCaptureBackend):
+    """伪造的窗口来源：每次截图耗时 delay 秒，像素值为截图序号，fail 为 True 时截图失败"""
+
+    name = "stub"
+
+    def __init__(self, delay=0.1, size=(160, 120)):
+        self.delay = delay
+        self.size = size
+        self.fail = False
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def capture_window(self, hwnd):
+        with self._lock:
+            self.calls.append(hwnd)
+            count = len(self.calls)
+        time.sleep(self.delay)
+        if self.fail:
+            return None
+        return Image.new('RGB', self.size, (count, hwnd % 256, 0))
+
+
+def _concurrent(count, func):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def run(index):
+        barrier.wait()
+        results[index] = func(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_regions_share_one_capture():
+    backend = StubWindowBackend()
+    service = WindowCaptureService(backend, tick=10.0)
+
+    regions = _concurrent(8, lambda index: service.capture_region(42, (index * 10, 0, index * 10 + 10, 20)))
+
+    assert backend.calls == [42]
+    assert all(region is not None for region in regions)
+    assert len({id(region.frame) for region in regions}) == 1
+    assert regions[3].shape == (20, 10, 3)
+    assert int(np.asarray(regions[3])[0, 0, 0]) == 1
+    assert service.get_stats() == {"captures": 1, "hits": 7, "windows": 1}
+
+
+def test_windows_are_captured_separately():
+    backend = StubWindowBackend(delay=0.0)
+    service = WindowCaptureService(backend, tick=10.0)
+    service.capture_region(1, (0, 0, 10, 10))
+    service.capture_region(2, (0, 0, 10, 10))
+    service.capture_region(1, (5, 5, 15, 15))
+    assert backend.calls == [1, 2]
+
+
+def test_expired_frame_is_recaptured():
+    backend = StubWindowBackend(delay=0.0)
+    service = WindowCaptureService(backend, tick=10.0)
+
+    first = service.get_window_frame(7)
+    assert service.get_window_frame(7) is first
+    assert service.get_window_frame(7, max_age=0.5) is first
+
+    time.sleep(0.06)
+    second = service.get_window_frame(7, max_age=0.05)
+    assert second is not first
+    assert backend.calls == [7, 7]
+    assert int(second.array[0, 0, 0]) == 2
+
+
+def test_invalidate_drops_cached_frame():
+    backend = StubWindowBackend(delay=0.0)
+    service = WindowCaptureService(backend, tick=10.0)
+    service.get_window_frame(1)
+    service.get_window_frame(2)
+
+    service.invalidate(1)
+    service.get_window_frame(1)
+    service.get_window_frame(2)
+    assert backend.calls == [1, 2, 1]
+
+    service.invalidate()
+    assert service.get_stats()["windows"] == 0
+    service.get_window_frame(2)
+    assert backend.calls == [1, 2, 1, 2]
+
+
+def test_failed_capture_returns_none_to_every_waiter():
+    backend = StubWindowBackend()
+    backend.fail = True
+    service = WindowCaptureService(backend, tick=10.0)
+
+    results = _concurrent(6, lambda index: service.capture_region(9, (0, 0, 10, 10)))
+
+    assert results == [None] * 6
+    assert backend.calls == [9]
+    assert service.get_stats()["windows"] == 0
+
+    # 失败不会被缓存，下一次请求重新截图
+    backend.fail = False
+    assert service.capture_region(9, (0, 0, 10, 10)) is not None
+    assert backend.calls == [9, 9]
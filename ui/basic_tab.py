@@ -2,7 +2,8 @@ import customtkinter as ctk
 import tkinter as tk
 from modules.alarm import select_alarm_sound
 from ui.theme import Theme
-from ui.widgets import CardFrame, AnimatedButton, create_section_title, create_divider
+from ui.widgets import CardFrame, AnimatedButton, NumericEntry, create_section_title, create_divider
+from utils.frame_history import DEFAULT_BUDGET_MB
 
 def create_basic_tab(app):
     page = ctk.CTkFrame(app.content_area, fg_color='transparent')
@@ -104,4 +105,26 @@ def create_basic_tab(app):
         btn.configure(command=lambda e=entry, b=btn: start_key_listening(app, e, b))
         btn.pack(side='left')
     
-    ctk.CTkFrame(shortcut_frame, height=6, fg_color='transparent').pack()
\ No newline at end of file
+    ctk.CTkFrame(shortcut_frame, height=6, fg_color='transparent').pack()
+    
+    debug_frame = CardFrame(scroll_frame, fg_color='#ffffff', border_width=1, border_color=Theme.COLORS['border'])
+    debug_frame.pack(fill='x', pady=(0, 10))
+    
+    debug_header = ctk.CTkFrame(debug_frame, fg_color='transparent')
+    debug_header.pack(fill='x', padx=12, pady=(10, 6))
+    create_section_title(debug_header, '调试设置', level=1).pack(side='left')
+    
+    create_divider(debug_frame)
+    
+    debug_row = ctk.CTkFrame(debug_frame, fg_color='transparent')
+    debug_row.pack(fill='x', padx=12, pady=(4, 10))
+    
+    app.frame_history_enabled = tk.BooleanVar(value=False)
+    app.frame_history_budget = tk.StringVar(value=str(DEFAULT_BUDGET_MB))
+    
+    ctk.CTkLabel(debug_row, text='触发时保存画面:', font=Theme.get_font('sm')).pack(side='left')
+    ctk.CTkSwitch(debug_row, text='', width=36, variable=app.frame_history_enabled).pack(side='left', padx=(6, 12))
+    
+    ctk.CTkLabel(debug_row, text='内存预算:', font=Theme.get_font('sm')).pack(side='left')
+    NumericEntry(debug_row, textvariable=app.frame_history_budget, width=50, height=24).pack(side='left', padx=(6, 2))
+    ctk.CTkLabel(debug_row, text='MB', font=Theme.get_font('sm')).pack(side='left')
@@ -3,6 +3,7 @@ import tkinter as tk
 from ui.theme import Theme
 from ui.widgets import CardFrame, AnimatedButton, NumericEntry, create_divider
 from ui.utils import toggle_group_bg, add_group, delete_group
+from utils.text_presence import DEFAULT_SENSITIVITY
 
 
 def create_ocr_tab(app):
@@ -42,7 +43,11 @@ def create_ocr_group(app, index):
         "alarm_var": tk.BooleanVar(value=False),
         "keywords_var": tk.StringVar(value="men,door"),
         "language_var": tk.StringVar(value="eng"),
-        "click_var": tk.BooleanVar(value=True)
+        "click_var": tk.BooleanVar(value=True),
+        "incremental_var": tk.BooleanVar(value=False),
+        "ocr_scale_var": tk.StringVar(value="1"),
+        "prefilter_var": tk.BooleanVar(value=False),
+        "prefilter_sensitivity_var": tk.StringVar(value=f"{DEFAULT_SENSITIVITY:g}")
     }
     
     group_frame = CardFrame(app.ocr_groups_frame, fg_color='#ffffff', border_width=1, border_color=Theme.COLORS['border'])
@@ -101,15 +106,15 @@ def create_ocr_group(app, index):
     ctk.CTkSwitch(alarm_frame, text='', width=36, variable=group_vars["alarm_var"]).pack(side='left')
     
     row2 = ctk.CTkFrame(group_frame, fg_color='transparent')
-    row2.pack(fill='x', padx=10, pady=(4, 8))
+    row2.pack(fill='x', padx=10, pady=4)
     
     ctk.CTkLabel(row2, text='间隔:', font=Theme.get_font('xs')).pack(side='left')
-    interval_entry = NumericEntry(row2, textvariable=group_vars["interval_var"], width=45, height=24)
+    interval_entry = NumericEntry(row2, textvariable=group_vars["interval_var"], allow_decimal=True, width=45, height=24)
     interval_entry.pack(side='left', padx=(2, 2))
     ctk.CTkLabel(row2, text='秒', font=Theme.get_font('xs')).pack(side='left', padx=(0, 8))
     
     ctk.CTkLabel(row2, text='暂停:', font=Theme.get_font('xs')).pack(side='left')
-    pause_entry = NumericEntry(row2, textvariable=group_vars["pause_var"], width=45, height=24)
+    pause_entry = NumericEntry(row2, textvariable=group_vars["pause_var"], allow_decimal=True, width=45, height=24)
     pause_entry.pack(side='left', padx=(2, 2))
     ctk.CTkLabel(row2, text='秒', font=Theme.get_font('xs')).pack(side='left', padx=(0, 8))
     
@@ -127,6 +132,35 @@ def create_ocr_group(app, index):
     ctk.CTkLabel(click_frame, text='点击', font=Theme.get_font('xs')).pack(side='left', padx=(0, 2))
     ctk.CTkSwitch(click_frame, text='', width=36, variable=group_vars["click_var"]).pack(side='left')
     
+    incremental_frame = ctk.CTkFrame(row2, fg_color='transparent')
+    incremental_frame.pack(side='left', padx=(8, 0))
+    ctk.CTkLabel(incremental_frame, text='逐行', font=Theme.get_font('xs')).pack(side='left', padx=(0, 2))
+    ctk.CTkSwitch(incremental_frame, text='', width=36, variable=group_vars["incremental_var"]).pack(side='left')
+    
+    ctk.CTkLabel(row2, text='缩放:', font=Theme.get_font('xs')).pack(side='left', padx=(8, 0))
+    scale_entry = NumericEntry(row2, textvariable=group_vars["ocr_scale_var"], allow_decimal=True, width=40, height=24)
+    scale_entry.pack(side='left', padx=(2, 2))
+    calibrate_btn = AnimatedButton(row2, text='校准', font=Theme.get_font('xs'), width=36, height=24,
+                                  corner_radius=4, fg_color=Theme.COLORS['primary'],
+                                  hover_color=Theme.COLORS['primary_hover'],
+                                  command=lambda: app.ocr_module.calibrate_group_scale(index))
+    calibrate_btn.pack(side='left')
+    
+    row3 = ctk.CTkFrame(group_frame, fg_color='transparent')
+    row3.pack(fill='x', padx=10, pady=(0, 8))
+    
+    prefilter_frame = ctk.CTkFrame(row3, fg_color='transparent')
+    prefilter_frame.pack(side='left')
+    ctk.CTkLabel(prefilter_frame, text='文字预过滤', font=Theme.get_font('xs')).pack(side='left', padx=(0, 2))
+    ctk.CTkSwitch(prefilter_frame, text='', width=36, variable=group_vars["prefilter_var"]).pack(side='left')
+    
+    ctk.CTkLabel(row3, text='灵敏度:', font=Theme.get_font('xs')).pack(side='left', padx=(8, 0))
+    sensitivity_entry = NumericEntry(row3, textvariable=group_vars["prefilter_sensitivity_var"], allow_decimal=True,
+                                     width=40, height=24)
+    sensitivity_entry.pack(side='left', padx=(2, 8))
+    ctk.CTkLabel(row3, text='判断区域无文字时跳过识别（0-1，越低跳过越多，可能漏识别）',
+                 font=Theme.get_font('xs'), text_color=Theme.COLORS['text_muted']).pack(side='left')
+    
     group_config = {
         "frame": group_frame,
         "enabled": enabled_var,
@@ -141,6 +175,10 @@ def create_ocr_group(app, index):
         "keywords": group_vars["keywords_var"],
         "language": group_vars["language_var"],
         "click": group_vars["click_var"],
+        "incremental": group_vars["incremental_var"],
+        "ocr_scale": group_vars["ocr_scale_var"],
+        "prefilter": group_vars["prefilter_var"],
+        "prefilter_sensitivity": group_vars["prefilter_sensitivity_var"],
         "title_label": title_label
     }
     app.ocr_groups.append(group_config)
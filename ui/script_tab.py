@@ -3,7 +3,7 @@ import tkinter as tk
 from tkinter import messagebox, filedialog
 
 from ui.theme import Theme
-from ui.widgets import CardFrame, AnimatedButton, NumericEntry, create_divider
+from ui.widgets import CardFrame, AnimatedButton, NumericEntry, create_divider, create_bordered_option_menu
 
 def create_script_tab(app):
     page = ctk.CTkFrame(app.content_area, fg_color='transparent')
@@ -249,6 +249,21 @@ def create_color_recognition_tab(app, parent):
     app.color_interval.pack(side='left', padx=(2, 0))
     ctk.CTkLabel(color_row3, text='秒', font=Theme.get_font('xs')).pack(side='left')
     
+    color_row4 = ctk.CTkFrame(color_content, fg_color='transparent')
+    color_row4.pack(fill='x', pady=4)
+    AnimatedButton(color_row4, text='添加探针', font=Theme.get_font('xs'), width=60, height=24, corner_radius=4,
+                  fg_color=Theme.COLORS['primary'], hover_color=Theme.COLORS['primary_hover'],
+                  command=lambda: app.color.add_probe() if hasattr(app, 'color') else None).pack(side='left', padx=(0, 4))
+    app.color_probes_entry = ctk.CTkEntry(color_row4, textvariable=app.color_probes_var, width=160, height=24,
+                                          placeholder_text='x,y:R,G,B; ...')
+    app.color_probes_entry.pack(side='left', padx=(0, 4))
+    create_bordered_option_menu(color_row4, values=['全部', '任一'], variable=app.color_probe_mode_var, width=60)
+    AnimatedButton(color_row4, text='清空', font=Theme.get_font('xs'), width=40, height=24,
+                  fg_color='transparent', text_color=Theme.COLORS['primary'],
+                  border_width=1, corner_radius=4,
+                  hover_color=Theme.COLORS['info_light'],
+                  command=lambda: app.color_probes_var.set('')).pack(side='left', padx=(4, 0))
+    
     ctk.CTkLabel(color_content, text='执行命令:', font=Theme.get_font('sm')).pack(anchor='w', pady=(8, 2))
     app.color_commands = ctk.CTkTextbox(color_content, font=('Consolas', 10), height=100)
     app.color_commands.pack(fill='both', expand=True)
@@ -256,6 +271,9 @@ def create_color_recognition_tab(app, parent):
     info_label = ctk.CTkLabel(color_content, text="额外命令: StartScript/StopScript；用于开始/停止脚本运行", 
                               font=Theme.get_font('xs'), text_color=Theme.COLORS['text_muted'])
     info_label.pack(anchor='w', pady=(4, 0))
+    probe_label = ctk.CTkLabel(color_content, text="设置探针后只检查探针像素（容差沿用上方设置），不再扫描识别区域",
+                               font=Theme.get_font('xs'), text_color=Theme.COLORS['text_muted'])
+    probe_label.pack(anchor='w')
 
 def insert_key_command(app):
     key = app.key_var.get().strip()
@@ -321,19 +339,12 @@ def select_coordinate(app):
     create_coordinate_selection_window(app)
 
 def create_coordinate_selection_window(app):
-    try:
-        import screeninfo
-        monitors = screeninfo.get_monitors()
-        
-        min_x = min(monitor.x for monitor in monitors)
-        min_y = min(monitor.y for monitor in monitors)
-        max_x = max(monitor.x + monitor.width for monitor in monitors)
-        max_y = max(monitor.y + monitor.height for monitor in monitors)
-    except ImportError:
+    from utils.monitor import get_monitor_topology, SCREENINFO_AVAILABLE
+    if not SCREENINFO_AVAILABLE:
         messagebox.showerror("错误", "screeninfo库未安装，无法支持多显示器选择。")
         return
-    except Exception:
-        min_x, min_y, max_x, max_y = 0, 0, 1920, 1080
+    
+    min_x, min_y, max_x, max_y = get_monitor_topology().get_virtual_bounds() or (0, 0, 1920, 1080)
     
     app.coordinate_window = tk.Toplevel(app.root)
     app.coordinate_window.overrideredirect(True)
@@ -92,7 +92,7 @@ def delete_group(app, groups, group_frame, renumber_func, confirm=True, confirm_
     return False
 
 
-def create_color_picker(app, callback, log_func=None):
+def create_color_picker(app, callback, log_func=None, include_position=False):
     """
     创建颜色选择器
     
@@ -102,22 +102,18 @@ def create_color_picker(app, callback, log_func=None):
         app: 应用实例（需要有 root 属性）
         callback: 回调函数，参数为 (r, g, b) 元组
         log_func: 日志函数（可选）
+        include_position: 为 True 时回调参数为 ((r, g, b), (x, y))，(x, y) 为点击位置的屏幕绝对坐标
     
     Returns:
         None
     """
-    try:
-        import screeninfo
-        monitors = screeninfo.get_monitors()
-        min_x = min(monitor.x for monitor in monitors)
-        min_y = min(monitor.y for monitor in monitors)
-        max_x = max(monitor.x + monitor.width for monitor in monitors)
-        max_y = max(monitor.y + monitor.height for monitor in monitors)
-    except ImportError:
+    from utils.monitor import get_monitor_topology, SCREENINFO_AVAILABLE
+    if not SCREENINFO_AVAILABLE:
         messagebox.showerror("错误", "screeninfo库未安装，无法支持多显示器选择。\n请运行 'pip install screeninfo' 安装该库。")
         return
-    except Exception:
-        min_x, min_y, max_x, max_y = 0, 0, 1920, 1080
+    
+    topology = get_monitor_topology()
+    min_x, min_y, max_x, max_y = topology.get_virtual_bounds() or (0, 0, 1920, 1080)
     
     selection_window = tk.Toplevel(app.root)
     selection_window.overrideredirect(True)
@@ -142,13 +138,7 @@ def create_color_picker(app, callback, log_func=None):
             from PIL import ImageGrab
             screen = ImageGrab.grab(all_screens=True)
         
-        try:
-            import screeninfo
-            monitors = screeninfo.get_monitors()
-            offset_x = min(monitor.x for monitor in monitors)
-            offset_y = min(monitor.y for monitor in monitors)
-        except:
-            offset_x, offset_y = 0, 0
+        offset_x, offset_y = topology.get_virtual_offset()
         
         rel_x = abs_x - offset_x
         rel_y = abs_y - offset_y
@@ -162,7 +152,10 @@ def create_color_picker(app, callback, log_func=None):
             log_func(f"选择颜色: RGB({r}, {g}, {b})")
             log_func(f"选择位置: ({abs_x}, {abs_y})")
         
-        callback((r, g, b))
+        if include_position:
+            callback((r, g, b), (abs_x, abs_y))
+        else:
+            callback((r, g, b))
     
     def on_escape(e):
         if log_func:
@@ -4,9 +4,10 @@ from ui.theme import Theme
 
 
 class NumericEntry(ctk.CTkEntry):
-    def __init__(self, master, textvariable=None, **kwargs):
+    def __init__(self, master, textvariable=None, allow_decimal=False, **kwargs):
         self._valid = True
         self._textvariable = textvariable
+        self._allow_decimal = allow_decimal
         
         if textvariable is not None:
             try:
@@ -48,6 +49,9 @@ class NumericEntry(ctk.CTkEntry):
         if event.char.isdigit() or event.char == '-':
             return
         
+        if self._allow_decimal and event.char == '.':
+            return
+        
         if event.keysym not in ('BackSpace', 'Delete', 'Tab'):
             return 'break'
     
@@ -0,0 +1,401 @@
+import os
+import glob
+import time
+import threading
+import numpy as np
+from PIL import Image
+from typing import Callable, List, Optional, Tuple
+
+from utils.frame import Frame
+
+try:
+    from PIL import ImageGrab
+    IMAGEGRAB_AVAILABLE = True
+except ImportError:
+    ImageGrab = None
+    IMAGEGRAB_AVAILABLE = False
+
+try:
+    import win32gui
+    import win32ui
+    import win32con
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+
+CAPTURE_BACKEND_ENV = 'AUTODOOR_CAPTURE_BACKEND'
+
+
+def _load_frame_array(source) -> np.ndarray:
+    """读取帧数据：支持 .png 等图像文件、.npy 文件或 NumPy 数组"""
+    if isinstance(source, np.ndarray):
+        array = source
+    elif str(source).lower().endswith('.npy'):
+        array = np.load(source)
+    else:
+        with Image.open(source) as image:
+            array = np.asarray(image.convert('RGB'))
+
+    if array.ndim == 2:
+        array = np.stack([array] * 3, axis=2)
+    return array[:, :, :3]
+
+
+def _list_frame_files(directory: str) -> List[str]:
+    """按文件名排序列出目录中的帧文件"""
+    files = []
+    for pattern in ('*.png', '*.bmp', '*.jpg', '*.npy'):
+        files.extend(glob.glob(os.path.join(directory, pattern)))
+    return sorted(files)
+
+
+def _crop_frame(array: np.ndarray, origin: Tuple[int, int], bbox) -> Optional[Frame]:
+    """按屏幕绝对坐标裁剪帧，bbox 为 None 时返回整帧"""
+    frame = Frame(array, origin)
+    if bbox is None:
+        return frame
+
+    view = frame.view(bbox)
+    if view is None:
+        return None
+    left = max(bbox[0], origin[0])
+    top = max(bbox[1], origin[1])
+    return Frame(view, (left, top))
+
+
+class CaptureBackend:
+    """
+    截图后端接口
+
+    ScreenshotManager 通过后端获取屏幕像素，可替换为回放或合成数据源，
+    使识别流程在无显示器的环境下也能确定性地运行。
+    """
+
+    name = "base"
+
+    def grab(self, bbox=None) -> Optional[Frame]:
+        """
+        截取屏幕
+
+        Args:
+            bbox: 截取范围 (left, top, right, bottom) - 屏幕绝对坐标，None 表示整个虚拟屏幕
+
+        Returns:
+            Frame: 截图帧，失败返回 None
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放后端资源"""
+        pass
+
+
+class ImageGrabBackend(CaptureBackend):
+    """
+    PIL.ImageGrab 截图后端（非 Windows 平台的默认后端）
+
+    注意：Windows 上 ImageGrab.grab(bbox=..., all_screens=True) 仍会截取整个虚拟桌面再裁剪，
+    只截取监控区域并不能减少截图的像素量，Windows 上默认使用 BitBltCaptureBackend。
+    """
+
+    name = "imagegrab"
+
+    def grab(self, bbox=None) -> Optional[Frame]:
+        if not IMAGEGRAB_AVAILABLE:
+            return None
+
+        if bbox is None:
+            from utils.monitor import get_monitor_topology
+            image = ImageGrab.grab(all_screens=True)
+            return Frame.from_image(image, get_monitor_topology().get_virtual_offset())
+
+        image = ImageGrab.grab(bbox=bbox, all_screens=True)
+        return Frame.from_image(image, bbox[:2])
+
+
+class BitBltCaptureBackend(CaptureBackend):
+    """
+    GDI BitBlt 截图后端（Windows 默认）
+
+    直接从屏幕 DC 复制 bbox 范围内的像素，截图开销与截取面积成正比，
+    只截取监控区域的并集时真正减少了像素拷贝量。
+    """
+
+    name = "bitblt"
+
+    def grab(self, bbox=None) -> Optional[Frame]:
+        if not WIN32_AVAILABLE:
+            return None
+
+        if bbox is None:
+            from utils.monitor import get_monitor_topology
+            bbox = get_monitor_topology().get_virtual_bounds()
+            if bbox is None:
+                return None
+
+        left, top, right, bottom = bbox
+        width = right - left
+        height = bottom - top
+        if width <= 0 or height <= 0:
+            return None
+
+        hwnd = win32gui.GetDesktopWindow()
+        hwndDC = None
+        mfcDC = None
+        saveDC = None
+        saveBitMap = None
+
+        try:
+            hwndDC = win32gui.GetWindowDC(hwnd)
+            mfcDC = win32ui.CreateDCFromHandle(hwndDC)
+            saveDC = mfcDC.CreateCompatibleDC()
+
+            saveBitMap = win32ui.CreateBitmap()
+            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
+            saveDC.SelectObject(saveBitMap)
+            # 桌面 DC 使用虚拟屏幕坐标（主显示器左上角为原点，副屏可以是负坐标）
+            saveDC.BitBlt((0, 0), (width, height), mfcDC, (left, top), win32con.SRCCOPY)
+
+            image = Image.frombuffer('RGB', (width, height), saveBitMap.GetBitmapBits(True),
+                                     'raw', 'BGRX', 0, 1)
+            return Frame.from_image(image, (left, top))
+        except Exception:
+            return None
+        finally:
+            try:
+                if saveBitMap:
+                    win32gui.DeleteObject(saveBitMap.GetHandle())
+            except Exception:
+                pass
+            try:
+                if saveDC:
+                    saveDC.DeleteDC()
+            except Exception:
+                pass
+            try:
+                if mfcDC:
+                    mfcDC.DeleteDC()
+            except Exception:
+                pass
+            try:
+                if hwndDC:
+                    win32gui.ReleaseDC(hwnd, hwndDC)
+            except Exception:
+                pass
+
+
+class SequenceCaptureBackend(CaptureBackend):
+    """
+    帧序列截图后端
+
+    按顺序读取目录中的 PNG/NPY 帧（或直接传入的帧列表），每次 grab 前进一帧，
+    不做任何等待，适合在 CI 中全速运行识别流程。
+    """
+
+    name = "sequence"
+
+    def __init__(self, source, origin=(0, 0), loop: bool = True):
+        """
+        Args:
+            source: 帧目录路径，或由文件路径/NumPy 数组组成的列表
+            origin: 帧左上角对应的屏幕绝对坐标
+            loop: 播放到末尾后是否从头循环；否则停留在最后一帧
+        """
+        if isinstance(source, str):
+            source = _list_frame_files(source)
+        self._sources = list(source)
+        self._cache = {}
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.loop = loop
+        self.index = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sources)
+
+    def _frame_array(self, index: int) -> np.ndarray:
+        array = self._cache.get(index)
+        if array is None:
+            array = _load_frame_array(self._sources[index])
+            array.setflags(write=False)
+            self._cache[index] = array
+        return array
+
+    def _next_index(self) -> Optional[int]:
+        with self._lock:
+            if not self._sources:
+                return None
+            index = self.index
+            if index >= len(self._sources):
+                index = 0 if self.loop else len(self._sources) - 1
+            self.index = index + 1
+            return index
+
+    def grab(self, bbox=None) -> Optional[Frame]:
+        index = self._next_index()
+        if index is None:
+            return None
+        return _crop_frame(self._frame_array(index), self.origin, bbox)
+
+
+class ReplayCaptureBackend(SequenceCaptureBackend):
+    """
+    按录制时间戳回放的截图后端
+
+    grab 返回当前回放时间对应的帧（时间戳不晚于回放时间的最后一帧），
+    回放时间由可注入的 clock 决定，speed 控制回放倍速。
+    """
+
+    name = "replay"
+
+    def __init__(self, frames, origin=(0, 0), speed: float = 1.0, loop: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            frames: [(timestamp_seconds, 路径或数组), ...]，或帧目录路径
+                    （目录中文件名为毫秒时间戳，如 000120.png 表示 0.12 秒）
+            origin: 帧左上角对应的屏幕绝对坐标
+            speed: 回放倍速
+            loop: 播放到末尾后是否从头循环
+            clock: 时钟函数，测试时可注入
+        """
+        if isinstance(frames, str):
+            frames = [(int(os.path.splitext(os.path.basename(path))[0]) / 1000.0, path)
+                      for path in _list_frame_files(frames)]
+        frames = sorted(frames, key=lambda item: item[0])
+
+        super().__init__([source for _, source in frames], origin, loop)
+        self.timestamps = [float(timestamp) for timestamp, _ in frames]
+        self.speed = speed
+        self.clock = clock
+        self._start = None
+
+    def restart(self) -> None:
+        """从头开始回放"""
+        self._start = None
+
+    def _next_index(self) -> Optional[int]:
+        if not self.timestamps:
+            return None
+
+        now = self.clock()
+        if self._start is None:
+            self._start = now
+
+        elapsed = (now - self._start) * self.speed
+        span = self.timestamps[-1] - self.timestamps[0]
+        if self.loop and span > 0:
+            elapsed %= span
+        position = self.timestamps[0] + elapsed
+
+        index = int(np.searchsorted(self.timestamps, position, side='right')) - 1
+        self.index = max(0, index)
+        return self.index
+
+
+class SyntheticCaptureBackend(CaptureBackend):
+    """
+    合成画面截图后端
+
+    每次 grab 生成一帧确定性的画面，默认是渐变背景上一个移动的方块；
+    可传入 generator(frame_index, width, height) -> ndarray 自定义画面。
+    """
+
+    name = "synthetic"
+
+    def __init__(self, size=(1920, 1080), origin=(0, 0),
+                 generator: Callable[[int, int, int], np.ndarray] = None):
+        self.width, self.height = int(size[0]), int(size[1])
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.generator = generator or self._default_generator
+        self.frame_index = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _default_generator(frame_index: int, width: int, height: int) -> np.ndarray:
+        array = np.empty((height, width, 3), dtype=np.uint8)
+        array[:, :, 0] = (np.arange(width, dtype=np.uint32) * 255 // max(1, width - 1))[None, :]
+        array[:, :, 1] = (np.arange(height, dtype=np.uint32) * 255 // max(1, height - 1))[:, None]
+        array[:, :, 2] = 64
+
+        block = max(8, min(width, height) // 10)
+        x = (frame_index * 16) % max(1, width - block)
+        y = (frame_index * 9) % max(1, height - block)
+        array[y:y + block, x:x + block] = (255, 0, 0)
+        return array
+
+    def grab(self, bbox=None) -> Optional[Frame]:
+        with self._lock:
+            frame_index = self.frame_index
+            self.frame_index += 1
+        return _crop_frame(self.generator(frame_index, self.width, self.height), self.origin, bbox)
+
+
+def create_capture_backend(spec: str = None) -> CaptureBackend:
+    """
+    根据描述创建截图后端
+
+    Args:
+        spec: "bitblt"、"imagegrab"、"synthetic[:宽x高]"、"sequence:<目录>" 或 "replay:<目录>"，
+              为 None 时读取环境变量 AUTODOOR_CAPTURE_BACKEND
+
+    Returns:
+        CaptureBackend: 截图后端，无法识别的描述返回默认后端（Windows 上为 BitBlt，其他平台为 ImageGrab）
+    """
+    if spec is None:
+        spec = os.environ.get(CAPTURE_BACKEND_ENV, '')
+
+    kind, _, argument = spec.partition(':')
+    kind = kind.strip().lower()
+
+    if kind == 'synthetic':
+        if argument:
+            width, _, height = argument.lower().partition('x')
+            return SyntheticCaptureBackend((int(width), int(height)))
+        return SyntheticCaptureBackend()
+    if kind == 'sequence' and argument:
+        return SequenceCaptureBackend(argument)
+    if kind == 'replay' and argument:
+        return ReplayCaptureBackend(argument)
+    if kind == 'imagegrab' or not WIN32_AVAILABLE:
+        return ImageGrabBackend()
+    return BitBltCaptureBackend()
+
+
+class WindowCaptureBackend:
+    """
+    窗口截图后端接口
+
+    capture_window_region 和后台监控通过该接口获取窗口像素。
+    """
+
+    name = "window_base"
+
+    def capture_window(self, hwnd: int):
+        """
+        截取整个窗口
+
+        Returns:
+            PIL.Image: 窗口截图，失败返回 None
+        """
+        raise NotImplementedError
+
+
+class FrameWindowCaptureBackend(WindowCaptureBackend):
+    """
+    把屏幕截图后端当作窗口来源（任意 hwnd 都返回后端的整帧）
+
+    配合回放或合成后端，使后台监控在没有真实窗口的环境中也能运行。
+    """
+
+    name = "frame_window"
+
+    def __init__(self, backend: CaptureBackend):
+        self.backend = backend
+
+    def capture_window(self, hwnd: int):
+        frame = self.backend.grab()
+        if frame is None:
+            return None
+        return frame.to_image()
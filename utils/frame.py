@@ -0,0 +1,687 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+
+TILE_SIZE = 32
+CROP_CACHE_ENTRIES = 256
+
+_frame_ids = itertools.count(1)
+
+_tile_weights = None
+
+
+def _get_tile_weights(tile_size: int) -> np.ndarray:
+    """分块校验和使用的固定奇数权重（奇数保证任意单个字的变化都会改变校验和）"""
+    global _tile_weights
+    words_per_row = tile_size * 3 // 4
+    if _tile_weights is None or _tile_weights.shape != (tile_size, words_per_row):
+        rng = np.random.default_rng(0x5EED)
+        weights = rng.integers(0, 2 ** 32, (tile_size, words_per_row), dtype=np.uint64)
+        _tile_weights = (weights | 1).astype(np.uint32)
+    return _tile_weights
+
+
+def compute_tile_hashes(array: np.ndarray, tile_size: int = TILE_SIZE) -> np.ndarray:
+    """
+    计算分块校验和（向量化）
+
+    把 RGB 数组按 tile_size x tile_size 分块，每块的像素字节按 uint32 加权求和（模 2^32）。
+
+    Args:
+        array: (H, W, 3) uint8 RGB 数组
+        tile_size: 分块边长（需为 4 的倍数）
+
+    Returns:
+        numpy.ndarray: (ceil(H/tile), ceil(W/tile)) uint32 校验和
+    """
+    height, width = array.shape[:2]
+    tiles_y = -(-height // tile_size)
+    tiles_x = -(-width // tile_size)
+
+    pad_y = tiles_y * tile_size - height
+    pad_x = tiles_x * tile_size - width
+    if pad_y or pad_x or not array.flags.c_contiguous:
+        padded = np.zeros((tiles_y * tile_size, tiles_x * tile_size, 3), dtype=np.uint8)
+        padded[:height, :width] = array
+    else:
+        padded = array
+
+    words_per_row = tile_size * 3 // 4
+    words = padded.reshape(tiles_y * tile_size, tiles_x * tile_size * 3).view(np.uint32)
+    words = words.reshape(tiles_y, tile_size, tiles_x, words_per_row)
+    weights = _get_tile_weights(tile_size)
+
+    return (words * weights[None, :, None, :]).sum(axis=(1, 3), dtype=np.uint32)
+
+
+class Frame:
+    """
+    不可变截图帧
+
+    以只读 NumPy 数组 (H, W, 3) RGB 保存像素，并记录左上角的屏幕绝对坐标。
+    区域访问返回只读视图（不复制像素），只有调用方明确需要时才生成 PIL 图像或副本。
+
+    changed()/region_signature() 基于分块校验和判断区域是否变化。校验和按需计算：
+    只计算被查询过的区域覆盖的分块，截图管理器在采集新帧时（build_tile_map）把这些
+    关注的分块传给新帧，并补全上一帧对应分块的校验和用于 changed()，没有调用方做变化检测时不计算。
+    
+    元数据：frame_id（创建时分配的全局递增编号）、timestamp（截图完成时的
+    time.monotonic()）、capture_duration（截图耗时，秒），age 为当前帧龄（秒）。
+    
+    region() 返回区域对象 FrameRegion，其灰度/BGR/HSV/金字塔表示按需计算，
+    结果保存在全局区域缓存（CropCache）中，由所有消费者共享。
+    """
+
+    def __init__(self, array, origin=(0, 0)):
+        array = np.asarray(array)
+        if array.ndim == 3 and array.shape[2] == 4:
+            array = array[:, :, :3]
+        array.setflags(write=False)
+
+        self.array = array
+        self.origin = (int(origin[0]), int(origin[1]))
+        self.tile_size = TILE_SIZE
+        tiles_shape = (-(-self.height // TILE_SIZE), -(-self.width // TILE_SIZE))
+        self.tile_hashes = np.zeros(tiles_shape, dtype=np.uint32)
+        self.previous_tile_hashes = None
+        self._tile_valid = np.zeros(tiles_shape, dtype=bool)  # 已计算校验和的分块
+        self._previous_tile_valid = None
+        self._watched_tiles = set()  # 被查询过的分块范围，传递给同一截图框的下一帧
+        self._tiles_lock = threading.Lock()
+        
+        self.frame_id = next(_frame_ids)
+        self.timestamp = time.monotonic()
+        self.capture_duration = 0.0
+        
+        self._regions = {}
+        self._regions_lock = threading.Lock()
+    
+    @property
+    def age(self) -> float:
+        """帧龄（秒）：距截图完成经过的时间"""
+        return time.monotonic() - self.timestamp
+
+    def build_tile_map(self, previous=None) -> None:
+        """
+        关联同一截图框的上一帧，用于 changed()
+
+        上一帧被查询过的分块在这里补全校验和（只计算这些分块），新帧继承这些关注范围；
+        新帧自己的校验和在第一次查询时计算。
+
+        Args:
+            previous: 同一截图框的上一帧（尺寸或原点不同时忽略）
+        """
+        if (previous is None or previous is self or previous.origin != self.origin or
+                previous.tile_hashes.shape != self.tile_hashes.shape):
+            return
+
+        with previous._tiles_lock:
+            watched = set(previous._watched_tiles)
+        for tile_bounds in watched:
+            previous._ensure_tiles(tile_bounds)
+
+        with self._tiles_lock:
+            self._watched_tiles |= watched
+        self.previous_tile_hashes = previous.tile_hashes
+        self._previous_tile_valid = previous._tile_valid
+
+    def _ensure_tiles(self, tile_bounds) -> None:
+        """计算分块范围内尚未计算的校验和，并记录为关注范围"""
+        top, left, bottom, right = tile_bounds
+        with self._tiles_lock:
+            self._watched_tiles.add(tile_bounds)
+            if self._tile_valid[top:bottom, left:right].all():
+                return
+
+            tile = self.tile_size
+            block = self.array[top * tile:bottom * tile, left * tile:right * tile]
+            self.tile_hashes[top:bottom, left:right] = compute_tile_hashes(block, tile)
+            self._tile_valid[top:bottom, left:right] = True
+
+    def _tile_bounds(self, region):
+        """区域覆盖的分块范围 (tile_top, tile_left, tile_bottom, tile_right)"""
+        bounds = self._local_bounds(region) if region is not None else (0, 0, self.width, self.height)
+        if bounds is None:
+            return None
+
+        left, top, right, bottom = bounds
+        tile = self.tile_size
+        return (top // tile, left // tile, -(-bottom // tile), -(-right // tile))
+
+    def region_signature(self, region=None):
+        """
+        获取区域的分块校验和签名，用于跨帧比较区域是否变化
+
+        Args:
+            region: 区域坐标 - 屏幕绝对坐标，None 表示整帧
+
+        Returns:
+            tuple: 可哈希的签名，区域不在帧内返回 None
+        """
+        tile_bounds = self._tile_bounds(region)
+        if tile_bounds is None:
+            return None
+
+        self._ensure_tiles(tile_bounds)
+        top, left, bottom, right = tile_bounds
+        return (self.origin, tile_bounds, self.tile_hashes[top:bottom, left:right].tobytes())
+
+    def changed(self, region=None, since=None) -> bool:
+        """
+        判断区域是否发生变化
+
+        Args:
+            region: 区域坐标 - 屏幕绝对坐标，None 表示整帧
+            since: 对比基准：region_signature() 返回的签名；
+                   为 None 时与同一截图框的上一帧比较
+
+        Returns:
+            bool: 区域有变化（或无法判断）返回 True
+        """
+        if since is not None:
+            return self.region_signature(region) != since
+
+        tile_bounds = self._tile_bounds(region)
+        if tile_bounds is None:
+            return True
+
+        self._ensure_tiles(tile_bounds)
+        if self.previous_tile_hashes is None:
+            return True
+
+        top, left, bottom, right = tile_bounds
+        if not self._previous_tile_valid[top:bottom, left:right].all():
+            return True
+        return not np.array_equal(self.tile_hashes[top:bottom, left:right],
+                                  self.previous_tile_hashes[top:bottom, left:right])
+
+    @classmethod
+    def from_image(cls, image, origin=(0, 0)):
+        """
+        从 PIL 图像创建帧
+
+        Args:
+            image: PIL.Image 截图
+            origin: 图像左上角的屏幕绝对坐标
+        """
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return cls(np.asarray(image), origin)
+
+    @property
+    def width(self) -> int:
+        return self.array.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.array.shape[0]
+
+    @property
+    def bbox(self) -> tuple:
+        """帧覆盖的屏幕绝对坐标 (left, top, right, bottom)"""
+        return (self.origin[0], self.origin[1],
+                self.origin[0] + self.width, self.origin[1] + self.height)
+
+    def _local_bounds(self, region):
+        """屏幕绝对坐标区域转换为帧内坐标（裁剪到帧范围内），无交集返回 None"""
+        x1, y1, x2, y2 = region
+        left = max(0, min(x1, x2) - self.origin[0])
+        top = max(0, min(y1, y2) - self.origin[1])
+        right = min(self.width, max(x1, x2) - self.origin[0])
+        bottom = min(self.height, max(y1, y2) - self.origin[1])
+
+        if right <= left or bottom <= top:
+            return None
+        return (left, top, right, bottom)
+
+    def view(self, region=None):
+        """
+        获取区域的只读视图（不复制像素）
+
+        Args:
+            region: 区域坐标 (x1, y1, x2, y2) - 屏幕绝对坐标，None 表示整帧
+
+        Returns:
+            numpy.ndarray: 只读 RGB 视图，区域不在帧内返回 None
+        """
+        if region is None:
+            return self.array
+
+        bounds = self._local_bounds(region)
+        if bounds is None:
+            return None
+
+        left, top, right, bottom = bounds
+        return self.array[top:bottom, left:right]
+
+    def region(self, region=None):
+        """
+        获取区域对象（同一区域返回同一个对象，派生表示在消费者间共享）
+        
+        Args:
+            region: 区域坐标 (x1, y1, x2, y2) - 屏幕绝对坐标，None 表示整帧
+        
+        Returns:
+            FrameRegion: 区域对象，区域不在帧内返回 None
+        """
+        bounds = self._local_bounds(region) if region is not None else (0, 0, self.width, self.height)
+        if bounds is None:
+            return None
+        
+        frame_region = self._regions.get(bounds)
+        if frame_region is None:
+            with self._regions_lock:
+                frame_region = self._regions.get(bounds)
+                if frame_region is None:
+                    left, top, right, bottom = bounds
+                    frame_region = FrameRegion(self, self.array[top:bottom, left:right],
+                                               (self.origin[0] + left, self.origin[1] + top), bounds)
+                    self._regions[bounds] = frame_region
+        return frame_region
+    
+    def to_image(self, region=None):
+        """
+        生成区域的 PIL 图像（复制像素）
+
+        Args:
+            region: 区域坐标 - 屏幕绝对坐标，None 表示整帧
+
+        Returns:
+            PIL.Image: RGB 图像，区域不在帧内返回 None
+        """
+        view = self.view(region)
+        if view is None:
+            return None
+        return Image.fromarray(np.ascontiguousarray(view))
+
+    def copy(self, region=None):
+        """
+        获取区域的可写副本
+
+        Returns:
+            numpy.ndarray: 可写 RGB 数组，区域不在帧内返回 None
+        """
+        view = self.view(region)
+        if view is None:
+            return None
+        return view.copy()
+
+
+def _rgb_to_gray(rgb):
+    if CV2_AVAILABLE:
+        return cv2.cvtColor(np.ascontiguousarray(rgb), cv2.COLOR_RGB2GRAY)
+    return np.asarray(Image.fromarray(np.ascontiguousarray(rgb)).convert('L'))
+
+
+def _rgb_to_bgr(rgb):
+    if CV2_AVAILABLE:
+        return cv2.cvtColor(np.ascontiguousarray(rgb), cv2.COLOR_RGB2BGR)
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+
+def _rgb_to_hsv(rgb):
+    """RGB 转 HSV，使用 OpenCV 的取值范围（H: 0-179，S/V: 0-255）"""
+    if CV2_AVAILABLE:
+        return cv2.cvtColor(np.ascontiguousarray(rgb), cv2.COLOR_RGB2HSV)
+    hsv = np.array(Image.fromarray(np.ascontiguousarray(rgb)).convert('HSV'))
+    hsv[:, :, 0] = (hsv[:, :, 0].astype(np.uint16) * 180 // 256).astype(np.uint8)
+    return hsv
+
+
+def _downscale(array):
+    """金字塔下一层：长宽各缩小一半"""
+    if CV2_AVAILABLE:
+        return cv2.pyrDown(np.ascontiguousarray(array))
+    image = Image.fromarray(np.ascontiguousarray(array))
+    return np.asarray(image.resize((max(1, image.width // 2), max(1, image.height // 2)), Image.BILINEAR))
+
+
+class CropCache:
+    """
+    区域派生表示的 LRU 缓存
+    
+    键为 (frame_id, 帧内区域, 表示)。多个模块监控相同或互相包含的区域时，
+    相同区域直接命中；逐像素转换的表示（gray/bgr/hsv）还可以从同一帧中已缓存的
+    包含该区域的大区域切出子视图，不再重新转换。
+    """
+    
+    SUBVIEW_REPS = ("gray", "bgr", "hsv")
+    
+    def __init__(self, max_entries: int = CROP_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.subview_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _find_container(self, frame_id, bounds, rep):
+        """查找同一帧同一表示中包含 bounds 的已缓存区域（调用方需持有 _lock）"""
+        left, top, right, bottom = bounds
+        for (entry_frame_id, entry_bounds, entry_rep), array in reversed(self._entries.items()):
+            if entry_frame_id != frame_id or entry_rep != rep:
+                continue
+            entry_left, entry_top, entry_right, entry_bottom = entry_bounds
+            if (entry_left <= left and entry_top <= top and
+                    entry_right >= right and entry_bottom >= bottom):
+                return array[top - entry_top:bottom - entry_top, left - entry_left:right - entry_left]
+        return None
+    
+    def get(self, frame_id, bounds, rep, build):
+        """
+        获取缓存的派生表示，未命中时调用 build() 计算并缓存
+        
+        Args:
+            frame_id: 帧编号
+            bounds: 帧内区域 (left, top, right, bottom)
+            rep: 表示名称，如 "gray" 或 ("pyramid", "rgb", 1)
+            build: 计算函数，返回 numpy.ndarray
+        
+        Returns:
+            numpy.ndarray: 只读数组
+        """
+        key = (frame_id, bounds, rep)
+        with self._lock:
+            array = self._entries.get(key)
+            if array is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return array
+            
+            if rep in self.SUBVIEW_REPS:
+                array = self._find_container(frame_id, bounds, rep)
+                if array is not None:
+                    self.subview_hits += 1
+                    self._store(key, array)
+                    return array
+            
+            self.misses += 1
+        
+        array = build()
+        array.setflags(write=False)
+        with self._lock:
+            self._store(key, array)
+        return array
+    
+    def _store(self, key, array) -> None:
+        self._entries[key] = array
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        """
+        获取缓存统计信息
+        
+        Returns:
+            dict: hits（完全命中）、subview_hits（子视图命中）、misses、evictions、
+                  entries（当前条目数）、hit_rate（命中率，含子视图命中）
+        """
+        with self._lock:
+            total = self.hits + self.subview_hits + self.misses
+            return {
+                "hits": self.hits,
+                "subview_hits": self.subview_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hit_rate": (self.hits + self.subview_hits) / total if total else 0.0,
+            }
+    
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.subview_hits = self.misses = self.evictions = 0
+    
+    def format_stats(self) -> str:
+        """生成用于日志的统计摘要"""
+        stats = self.get_stats()
+        return (f"区域缓存命中率: {stats['hit_rate']:.1%} (命中 {stats['hits']}, "
+                f"子区域 {stats['subview_hits']}, 未命中 {stats['misses']}, 淘汰 {stats['evictions']})")
+
+
+_crop_cache = CropCache()
+
+
+def get_crop_cache() -> CropCache:
+    """获取全局区域缓存"""
+    return _crop_cache
+
+
+class FrameRegion:
+    """
+    帧中的一个区域
+    
+    rgb 为只读视图；gray/bgr/hsv/pyramid() 第一次访问时计算，结果保存在全局区域缓存中（只读），
+    同一帧中相同或包含该区域的消费者共享这些结果。支持 np.asarray()，可直接当作 RGB 数组使用。
+    其他基于区域像素的计算结果（如 OCR 结果）通过 cached() 保存在区域对象上。
+    """
+    
+    def __init__(self, frame, rgb, origin, bounds=None):
+        self.frame = frame
+        self.rgb = rgb
+        self.origin = origin
+        self.bounds = bounds or (0, 0, rgb.shape[1], rgb.shape[0])
+        self._lock = threading.RLock()  # 金字塔逐层构建时会重入
+        self._results = {}
+    
+    @property
+    def shape(self):
+        return self.rgb.shape
+    
+    @property
+    def width(self) -> int:
+        return self.rgb.shape[1]
+    
+    @property
+    def height(self) -> int:
+        return self.rgb.shape[0]
+    
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None and dtype != self.rgb.dtype:
+            return self.rgb.astype(dtype)
+        return self.rgb.copy() if copy else self.rgb
+    
+    def _derive(self, key, build):
+        with self._lock:
+            return _crop_cache.get(self.frame.frame_id, self.bounds, key, build)
+    
+    @property
+    def gray(self) -> np.ndarray:
+        """灰度表示 (H, W) uint8"""
+        return self._derive("gray", lambda: _rgb_to_gray(self.rgb))
+    
+    @property
+    def bgr(self) -> np.ndarray:
+        """BGR 表示 (H, W, 3)，供 OpenCV 使用"""
+        return self._derive("bgr", lambda: _rgb_to_bgr(self.rgb))
+    
+    @property
+    def hsv(self) -> np.ndarray:
+        """HSV 表示 (H, W, 3)，OpenCV 取值范围"""
+        return self._derive("hsv", lambda: _rgb_to_hsv(self.rgb))
+    
+    def pyramid(self, level: int = 1, rep: str = "rgb") -> np.ndarray:
+        """
+        降采样金字塔
+        
+        Args:
+            level: 层级，0 为原尺寸，每层长宽减半
+            rep: 基础表示："rgb"、"gray"、"bgr" 或 "hsv"
+        
+        Returns:
+            numpy.ndarray: 只读数组
+        """
+        if level <= 0:
+            return getattr(self, rep)
+        return self._derive(("pyramid", rep, level),
+                            lambda: _downscale(self.pyramid(level - 1, rep)))
+    
+    def cached(self, key, build):
+        """
+        获取保存在该区域上的计算结果，第一次访问时调用 build() 计算
+        
+        同一帧的同一区域只有一个 FrameRegion 对象，因此多个消费者共享结果；
+        build() 抛出异常时不缓存。
+        
+        Args:
+            key: 结果名称，如 ("ocr", "eng", "--psm 6")
+            build: 计算函数
+        
+        Returns:
+            build() 的返回值
+        """
+        with self._lock:
+            if key not in self._results:
+                self._results[key] = build()
+            return self._results[key]
+    
+    def to_image(self):
+        """生成 PIL 图像（复制像素）"""
+        return Image.fromarray(np.ascontiguousarray(self.rgb))
+
+
+def to_image(image):
+    """
+    把只读视图/数组/区域对象转换为 PIL 图像，PIL 图像原样返回
+
+    Args:
+        image: PIL.Image、FrameRegion 或 numpy.ndarray (RGB / 灰度)
+
+    Returns:
+        PIL.Image: 图像，输入为 None 时返回 None
+    """
+    if image is None or isinstance(image, Image.Image):
+        return image
+    if isinstance(image, FrameRegion):
+        return image.to_image()
+    return Image.fromarray(np.ascontiguousarray(image))
+
+
+def to_gray(image) -> np.ndarray:
+    """
+    获取灰度数组，FrameRegion 使用共享的缓存结果
+
+    Args:
+        image: PIL.Image、FrameRegion 或 numpy.ndarray (RGB / 灰度)
+    """
+    if isinstance(image, FrameRegion):
+        return image.gray
+    if isinstance(image, Image.Image):
+        return np.asarray(image.convert('L'))
+    array = np.asarray(image)
+    if array.ndim == 2:
+        return array
+    return _rgb_to_gray(array[:, :, :3])
+
+
+def to_bgr(image) -> np.ndarray:
+    """
+    获取 BGR 数组，FrameRegion 使用共享的缓存结果
+
+    Args:
+        image: PIL.Image、FrameRegion 或 numpy.ndarray (RGB)
+    """
+    if isinstance(image, FrameRegion):
+        return image.bgr
+    if isinstance(image, Image.Image):
+        image = image.convert('RGB')
+    return _rgb_to_bgr(np.asarray(image)[:, :, :3])
+
+
+def image_size(image):
+    """
+    获取图像尺寸，兼容 PIL 图像、FrameRegion 和 NumPy 数组
+
+    Returns:
+        tuple: (width, height)
+    """
+    if isinstance(image, (np.ndarray, FrameRegion)):
+        return (image.shape[1], image.shape[0])
+    return image.size
+
+
+def benchmark_frame_access(group_count: int = 45, rounds: int = 20,
+                           screen_size=(3840, 2160), region_size=(200, 40)) -> dict:
+    """
+    对比旧路径（整帧 PIL 复制再裁剪）与只读视图路径的内存与耗时
+
+    模拟 group_count 个识别组并发读取同一帧中的小区域。
+
+    Args:
+        group_count: 并发读取的组数量
+        rounds: 每个组读取的次数
+        screen_size: 模拟屏幕尺寸 (width, height)
+        region_size: 每个组的区域尺寸 (width, height)
+
+    Returns:
+        dict: {"copy": {...}, "view": {...}}，包含每次访问平均耗时（毫秒）
+              和累计复制的像素字节数
+    """
+    width, height = screen_size
+    region_w, region_h = region_size
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    full_image = Image.fromarray(pixels)
+    frame = Frame(pixels)
+
+    regions = []
+    for i in range(group_count):
+        x = (i * 97) % max(1, width - region_w)
+        y = (i * 53) % max(1, height - region_h)
+        regions.append((x, y, x + region_w, y + region_h))
+
+    def run(access):
+        copied = [0]
+        copied_lock = threading.Lock()
+
+        def worker(region):
+            total = 0
+            for _ in range(rounds):
+                total += access(region)
+            with copied_lock:
+                copied[0] += total
+
+        threads = [threading.Thread(target=worker, args=(region,)) for region in regions]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        accesses = group_count * rounds
+        return {
+            "avg_ms": elapsed * 1000 / accesses,
+            "total_ms": elapsed * 1000,
+            "copied_bytes": copied[0],
+        }
+
+    def copy_access(region):
+        full_copy = full_image.copy()
+        crop = np.asarray(full_copy.crop(region))
+        crop.sum(dtype=np.uint32)
+        return width * height * 3 + crop.nbytes
+
+    def view_access(region):
+        view = frame.view(region)
+        view.sum(dtype=np.uint32)
+        return 0
+
+    return {"copy": run(copy_access), "view": run(view_access)}
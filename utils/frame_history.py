@@ -0,0 +1,360 @@
+import os
+import threading
+import zlib
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from utils.frame import TILE_SIZE
+
+
+DEFAULT_BUDGET_MB = 16
+KEYFRAME_INTERVAL = 30
+COMPRESS_LEVEL = 1
+
+
+class _RegionRecord:
+    """单个区域在某一帧中的存储：关键帧保存完整压缩像素，增量帧只保存变化分块的 XOR"""
+
+    __slots__ = ['shape', 'keyframe', 'data', 'tiles', 'nbytes']
+
+    def __init__(self, shape, keyframe: bool, data: bytes = None, tiles: list = None):
+        self.shape = shape
+        self.keyframe = keyframe
+        self.data = data
+        self.tiles = tiles or []
+        self.nbytes = len(data) if data is not None else sum(len(tile[2]) for tile in self.tiles)
+
+
+class _HistoryEntry:
+    __slots__ = ['frame_id', 'timestamp', 'regions', 'nbytes']
+
+    def __init__(self, frame_id: int, timestamp: float, regions: Dict[tuple, _RegionRecord]):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.regions = regions
+        self.nbytes = sum(record.nbytes for record in regions.values())
+
+
+def _encode_keyframe(array: np.ndarray) -> _RegionRecord:
+    return _RegionRecord(array.shape, True, zlib.compress(array.tobytes(), COMPRESS_LEVEL))
+
+
+def _encode_delta(array: np.ndarray, previous: np.ndarray, tile_size: int) -> _RegionRecord:
+    """对变化的分块做 XOR 并压缩，未变化的分块不占空间"""
+    diff = np.bitwise_xor(array, previous)
+    height, width = array.shape[:2]
+    tiles = []
+    for y in range(0, height, tile_size):
+        band = diff[y:y + tile_size]
+        if not band.any():
+            continue
+        for x in range(0, width, tile_size):
+            tile = band[:, x:x + tile_size]
+            if tile.any():
+                tiles.append((y, x, zlib.compress(np.ascontiguousarray(tile).tobytes(), COMPRESS_LEVEL)))
+    return _RegionRecord(array.shape, False, tiles=tiles)
+
+
+def _decode(record: _RegionRecord, previous: Optional[np.ndarray], tile_size: int) -> np.ndarray:
+    if record.keyframe:
+        return np.frombuffer(zlib.decompress(record.data), dtype=np.uint8).reshape(record.shape)
+
+    array = previous.copy()
+    height, width = record.shape[:2]
+    for y, x, data in record.tiles:
+        tile_h = min(tile_size, height - y)
+        tile_w = min(tile_size, width - x)
+        tile = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(tile_h, tile_w, 3)
+        np.bitwise_xor(array[y:y + tile_h, x:x + tile_w], tile, out=array[y:y + tile_h, x:x + tile_w])
+    return array
+
+
+class FrameHistory:
+    """
+    帧历史环形缓冲
+
+    只保存监控区域（ROI）的像素：每个区域相对上一帧按分块做 XOR 增量压缩，
+    每 keyframe_interval 帧或区域尺寸变化时保存一次关键帧。
+    总占用（压缩数据 + 每个区域的最新参考帧）超过 budget_mb 时从最旧的帧开始淘汰，
+    淘汰关键帧时把下一帧重建为关键帧（rebase），因此长时间运行内存保持平稳。
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB, tile_size: int = TILE_SIZE,
+                 keyframe_interval: int = KEYFRAME_INTERVAL):
+        """
+        Args:
+            budget_mb: 内存预算（MB）
+            tile_size: 增量压缩的分块边长
+            keyframe_interval: 同一区域连续增量帧的最大数量
+        """
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.tile_size = tile_size
+        self.keyframe_interval = max(1, int(keyframe_interval))
+
+        self._entries = deque()
+        self._references = {}  # region -> (最新像素, 距上个关键帧的增量数)
+        self._stored_bytes = 0
+        self._lock = threading.Lock()
+
+        self.recorded = 0
+        self.evicted = 0
+
+    def set_budget(self, budget_mb: float) -> None:
+        """修改内存预算（MB），超出部分立即淘汰"""
+        with self._lock:
+            self.budget_bytes = int(budget_mb * 1024 * 1024)
+            self._evict()
+
+    def record(self, frame, regions) -> None:
+        """
+        记录一帧中各监控区域的像素
+
+        Args:
+            frame: Frame 截图帧
+            regions: 区域坐标列表 (left, top, right, bottom) - 屏幕绝对坐标，不在帧内的区域忽略
+        """
+        views = {}
+        for region in regions:
+            view = frame.view(region)
+            if view is not None:
+                views[tuple(region)] = np.array(view)
+        if not views:
+            return
+
+        with self._lock:
+            records = {}
+            for region, view in views.items():
+                reference = self._references.get(region)
+                if (reference is None or reference[0].shape != view.shape or
+                        reference[1] + 1 >= self.keyframe_interval):
+                    records[region] = _encode_keyframe(view)
+                    self._references[region] = (view, 0)
+                else:
+                    records[region] = _encode_delta(view, reference[0], self.tile_size)
+                    self._references[region] = (view, reference[1] + 1)
+
+            entry = _HistoryEntry(frame.frame_id, frame.timestamp, records)
+            self._entries.append(entry)
+            self._stored_bytes += entry.nbytes
+            self.recorded += 1
+            self._evict()
+
+    def retain(self, regions) -> None:
+        """
+        只保留仍在监控的区域的参考帧（监控区域变化时调用）
+
+        Args:
+            regions: 仍在监控的区域坐标列表
+        """
+        keep = {tuple(region) for region in regions}
+        with self._lock:
+            for region in list(self._references):
+                if region not in keep:
+                    del self._references[region]
+
+    def _reference_bytes(self) -> int:
+        return sum(reference[0].nbytes for reference in self._references.values())
+
+    def _evict(self) -> None:
+        """超出预算时淘汰最旧的帧（调用方需持有 _lock）"""
+        while self._entries and self._stored_bytes + self._reference_bytes() > self.budget_bytes:
+            oldest = self._entries.popleft()
+            self._stored_bytes -= oldest.nbytes
+            self.evicted += 1
+            if self._entries:
+                self._rebase(oldest)
+
+    def _rebase(self, removed: _HistoryEntry) -> None:
+        """
+        被淘汰帧之后的增量帧失去基准，把每个区域的下一条记录重建为关键帧
+
+        淘汰总是从最旧的帧开始，而每个区域最旧的记录都是关键帧，所以 removed 中全是关键帧。
+        """
+        pending = {region: _decode(record, None, self.tile_size)
+                   for region, record in removed.regions.items()}
+
+        for entry in self._entries:
+            if not pending:
+                break
+            for region in list(pending):
+                record = entry.regions.get(region)
+                if record is None:
+                    continue
+                if not record.keyframe:
+                    array = _decode(record, pending[region], self.tile_size)
+                    keyframe = _encode_keyframe(array)
+                    self._stored_bytes += keyframe.nbytes - record.nbytes
+                    entry.nbytes += keyframe.nbytes - record.nbytes
+                    entry.regions[region] = keyframe
+                del pending[region]
+
+    def _find_index(self, frame_id: int) -> Optional[int]:
+        for index in range(len(self._entries) - 1, -1, -1):
+            if self._entries[index].frame_id == frame_id:
+                return index
+        return None
+
+    def _reconstruct(self, index: int) -> Dict[tuple, np.ndarray]:
+        """重建第 index 条记录中所有区域的像素（调用方需持有 _lock）"""
+        result = {}
+        for region in self._entries[index].regions:
+            start = index
+            while start >= 0:
+                record = self._entries[start].regions.get(region)
+                if record is not None and record.keyframe:
+                    break
+                start -= 1
+            if start < 0:
+                continue
+
+            array = None
+            for position in range(start, index + 1):
+                record = self._entries[position].regions.get(region)
+                if record is not None:
+                    array = _decode(record, array, self.tile_size)
+            array.setflags(write=False)
+            result[region] = array
+        return result
+
+    def get(self, frame_id: int) -> Optional[dict]:
+        """
+        按帧编号获取历史帧
+
+        Returns:
+            dict: {"frame_id", "timestamp", "regions": {区域: 只读 RGB 数组}}，不在历史中返回 None
+        """
+        with self._lock:
+            index = self._find_index(frame_id)
+            if index is None:
+                return None
+            entry = self._entries[index]
+            return {"frame_id": entry.frame_id, "timestamp": entry.timestamp,
+                    "regions": self._reconstruct(index)}
+
+    def get_at(self, timestamp: float, region=None) -> Optional[dict]:
+        """
+        获取指定时间点的历史帧（时间戳不晚于 timestamp 的最后一帧）
+
+        Args:
+            timestamp: time.monotonic() 时间
+            region: 只查找包含该区域的帧（可选）
+
+        Returns:
+            dict: 同 get()，没有符合条件的帧返回 None
+        """
+        with self._lock:
+            for index in range(len(self._entries) - 1, -1, -1):
+                entry = self._entries[index]
+                if entry.timestamp > timestamp:
+                    continue
+                if region is not None and tuple(region) not in entry.regions:
+                    continue
+                return {"frame_id": entry.frame_id, "timestamp": entry.timestamp,
+                        "regions": self._reconstruct(index)}
+        return None
+
+    def get_region(self, frame_id: int, region) -> Optional[np.ndarray]:
+        """按帧编号获取单个区域的历史像素，不存在返回 None"""
+        result = self.get(frame_id)
+        if result is None:
+            return None
+        return result["regions"].get(tuple(region))
+
+    def dump(self, directory: str, region=None, since: float = None) -> int:
+        """
+        把历史帧保存为 PNG 文件（调试用），文件名为 <frame_id>_<left>_<top>.png
+
+        Args:
+            directory: 输出目录（不存在时创建）
+            region: 只保存该区域（从包含它的监控区域中裁剪），None 表示保存所有区域
+            since: 只保存时间戳不早于 since（time.monotonic()）的帧
+
+        Returns:
+            int: 保存的图像数量
+        """
+        target = tuple(region) if region is not None else None
+        # 持锁时只复制记录引用（记录不可变，rebase 只替换字典项），解码和写文件在锁外进行，
+        # 不阻塞截图线程的 record()
+        with self._lock:
+            entries = [(entry.frame_id, entry.timestamp, dict(entry.regions)) for entry in self._entries]
+
+        first = next((index for index, entry in enumerate(entries)
+                      if since is None or entry[1] >= since), None)
+        if first is None:
+            return 0
+
+        # 从所需区域在 first 之前最近的关键帧开始解码
+        start = first
+        unresolved = set()
+        for _, _, regions in entries[first:]:
+            unresolved.update(regions)
+        for index in range(first, -1, -1):
+            for recorded, record in entries[index][2].items():
+                if record.keyframe and recorded in unresolved:
+                    unresolved.discard(recorded)
+                    start = index
+            if not unresolved:
+                break
+
+        snapshots = []
+        current = {}
+        for index in range(start, len(entries)):
+            frame_id, timestamp, regions = entries[index]
+            for recorded, record in regions.items():
+                if record.keyframe or recorded in current:
+                    current[recorded] = _decode(record, current.get(recorded), self.tile_size)
+            if index < first or (since is not None and timestamp < since):
+                continue
+            for recorded in regions:
+                array = current.get(recorded)
+                if array is None:
+                    continue
+                if target is None:
+                    snapshots.append((frame_id, recorded, array))
+                elif (recorded[0] <= target[0] and recorded[1] <= target[1] and
+                      recorded[2] >= target[2] and recorded[3] >= target[3]):
+                    left, top = target[0] - recorded[0], target[1] - recorded[1]
+                    crop = array[top:top + target[3] - target[1], left:left + target[2] - target[0]]
+                    snapshots.append((frame_id, target, crop))
+                    break
+
+        if not snapshots:
+            return 0
+        os.makedirs(directory, exist_ok=True)
+        for frame_id, box, array in snapshots:
+            path = os.path.join(directory, f"{frame_id}_{box[0]}_{box[1]}.png")
+            Image.fromarray(np.ascontiguousarray(array)).save(path)
+        return len(snapshots)
+
+    def frame_ids(self) -> List[Tuple[int, float]]:
+        """历史中所有帧的 (frame_id, timestamp)，按时间顺序"""
+        with self._lock:
+            return [(entry.frame_id, entry.timestamp) for entry in self._entries]
+
+    def clear(self) -> None:
+        """清空历史"""
+        with self._lock:
+            self._entries.clear()
+            self._references.clear()
+            self._stored_bytes = 0
+
+    def get_stats(self) -> dict:
+        """
+        获取历史统计信息
+
+        Returns:
+            dict: frames（保存的帧数）、stored_bytes（压缩数据）、reference_bytes（参考帧）、
+                  budget_bytes、recorded/evicted（累计记录与淘汰帧数）
+        """
+        with self._lock:
+            return {
+                "frames": len(self._entries),
+                "stored_bytes": self._stored_bytes,
+                "reference_bytes": self._reference_bytes(),
+                "budget_bytes": self.budget_bytes,
+                "recorded": self.recorded,
+                "evicted": self.evicted,
+            }
@@ -1,19 +1,26 @@
 from PIL import Image, ImageEnhance, ImageFilter
+from utils.frame import to_gray
 
 
-def _preprocess_image(image, group_index=None):
+def _preprocess_image(image, group_index=None, scale=1.0):
     """
     图像预处理
     Args:
-        image: 原始图像
+        image: 原始图像（PIL.Image、FrameRegion 或只读 RGB 视图）
         group_index: OCR组索引（可选）
+        scale: 缩放倍数（OCR组校准得到的 ocr_scale），使字形高度落在识别引擎的最佳范围
 
     Returns:
         Image: 处理后的图像
     """
     try:
-        # 转换为灰度图像以提高识别率
-        image = image.convert('L')
+        # 转换为灰度图像以提高识别率（FrameRegion 复用同一帧已计算的灰度）
+        image = Image.fromarray(to_gray(image))
+
+        # 在二值化之前缩放，放大时保留平滑的笔画边缘
+        if scale and abs(scale - 1.0) > 1e-3:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.LANCZOS if scale > 1 else Image.BOX)
 
         # 添加图像预处理，提高识别精度
 
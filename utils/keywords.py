@@ -0,0 +1,172 @@
+import threading
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+
+MATCHER_CACHE_SIZE = 128
+
+
+def parse_keywords(keywords) -> Tuple[str, ...]:
+    """
+    规范化关键词：逗号分隔的字符串或关键词列表 -> 去空白、转小写、去重后的元组（保持顺序）
+
+    Args:
+        keywords: "开门,Door" 形式的字符串，或关键词可迭代对象
+
+    Returns:
+        tuple: 关键词元组
+    """
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    result = []
+    for keyword in keywords or ():
+        keyword = str(keyword).strip().lower()
+        if keyword and keyword not in result:
+            result.append(keyword)
+    return tuple(result)
+
+
+class KeywordMatch:
+    """一次关键词匹配：匹配到的关键词及其在文本中的位置 [start, end)"""
+
+    __slots__ = ['keyword', 'start', 'end']
+
+    def __init__(self, keyword: str, start: int, end: int):
+        self.keyword = keyword
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"KeywordMatch({self.keyword!r}, {self.start}, {self.end})"
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 多关键词匹配器
+
+    构建时把所有关键词编译为一个自动机，匹配时对文本只做一次线性扫描，
+    与关键词数量无关。关键词和文本都按小写比较（调用方传入已转小写的文本可省去转换）。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: 关键词（会被规范化）
+        """
+        self.keywords = parse_keywords(list(keywords))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]  # 每个状态结束的关键词（含 fail 链上的）
+        self._build()
+
+    def _build(self) -> None:
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] = self._output[state] + (keyword,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def _scan(self, text: str):
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in output[state]:
+                yield KeywordMatch(keyword, index + 1 - len(keyword), index + 1)
+
+    def search(self, text: str, lowered: bool = False) -> Optional[KeywordMatch]:
+        """
+        查找第一个匹配（结束位置最靠前的关键词，同一位置结束时取最长的）
+
+        Args:
+            text: 待匹配文本
+            lowered: text 是否已转为小写
+
+        Returns:
+            KeywordMatch: 匹配结果，没有匹配返回 None
+        """
+        if not self.keywords or not text:
+            return None
+        for match in self._scan(text if lowered else text.lower()):
+            return match
+        return None
+
+    def find_all(self, text: str, lowered: bool = False) -> List[KeywordMatch]:
+        """查找所有匹配（可重叠），按结束位置排序"""
+        if not self.keywords or not text:
+            return []
+        return list(self._scan(text if lowered else text.lower()))
+
+    def contains(self, text: str, lowered: bool = False) -> bool:
+        """文本是否包含任一关键词"""
+        return self.search(text, lowered) is not None
+
+
+_matchers = {}  # 规范化关键词集合 -> KeywordMatcher
+_matchers_by_text = {}  # 原始关键词字符串 -> KeywordMatcher
+_matchers_lock = threading.Lock()
+
+
+def get_keyword_matcher(keywords) -> KeywordMatcher:
+    """
+    获取关键词匹配器（共享）
+
+    关键词集合相同（忽略顺序、大小写、空白和重复）的调用方共享同一个自动机；
+    原始字符串也会被缓存，配置未变化时不再重新拆分和编译。
+
+    Args:
+        keywords: 逗号分隔的关键词字符串、关键词列表或 KeywordMatcher
+
+    Returns:
+        KeywordMatcher: 匹配器
+    """
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+
+    if isinstance(keywords, str):
+        matcher = _matchers_by_text.get(keywords)
+        if matcher is not None:
+            return matcher
+
+    parsed = parse_keywords(keywords)
+    key = frozenset(parsed)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            if len(_matchers) >= MATCHER_CACHE_SIZE:
+                _matchers.clear()
+                _matchers_by_text.clear()
+            matcher = KeywordMatcher(parsed)
+            _matchers[key] = matcher
+        if isinstance(keywords, str):
+            _matchers_by_text[keywords] = matcher
+    return matcher
@@ -0,0 +1,185 @@
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import screeninfo
+    SCREENINFO_AVAILABLE = True
+except ImportError:
+    screeninfo = None
+    SCREENINFO_AVAILABLE = False
+
+
+DEFAULT_DPI = 96.0
+
+
+class MonitorInfo:
+    """单个显示器的布局信息（屏幕绝对坐标）"""
+
+    __slots__ = ['x', 'y', 'width', 'height', 'dpi', 'is_primary', 'name']
+
+    def __init__(self, x: int, y: int, width: int, height: int,
+                 dpi: float = DEFAULT_DPI, is_primary: bool = False, name: str = None):
+        self.x = int(x)
+        self.y = int(y)
+        self.width = int(width)
+        self.height = int(height)
+        self.dpi = float(dpi)
+        self.is_primary = bool(is_primary)
+        self.name = name
+
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    @property
+    def scale(self) -> float:
+        """相对 96 DPI 的缩放比例"""
+        return self.dpi / DEFAULT_DPI
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def __repr__(self):
+        return (f"MonitorInfo(x={self.x}, y={self.y}, width={self.width}, "
+                f"height={self.height}, dpi={self.dpi:g})")
+
+
+def enumerate_monitors() -> List[MonitorInfo]:
+    """
+    通过 screeninfo 枚举系统显示器
+
+    Returns:
+        list: MonitorInfo 列表，screeninfo 不可用或枚举失败返回空列表
+    """
+    if not SCREENINFO_AVAILABLE:
+        return []
+
+    try:
+        monitors = []
+        for monitor in screeninfo.get_monitors():
+            dpi = DEFAULT_DPI
+            width_mm = getattr(monitor, 'width_mm', None)
+            if width_mm:
+                dpi = monitor.width / (width_mm / 25.4)
+            monitors.append(MonitorInfo(
+                monitor.x, monitor.y, monitor.width, monitor.height, dpi,
+                bool(getattr(monitor, 'is_primary', False)), getattr(monitor, 'name', None)
+            ))
+        return monitors
+    except Exception:
+        return []
+
+
+class MonitorTopology:
+    """
+    显示器拓扑服务
+
+    缓存显示器布局（偏移、尺寸、DPI），避免在截图热路径上反复枚举显示器。
+    超过 refresh_interval 后下次访问时重新枚举，也可以调用 invalidate() 立即失效。
+    provider 可注入，测试时可以提供伪造的多显示器布局。
+    """
+
+    DEFAULT_REFRESH_INTERVAL = 10.0
+
+    def __init__(self, provider: Callable[[], List[MonitorInfo]] = None,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        """
+        Args:
+            provider: 返回 MonitorInfo 列表的函数，默认使用 screeninfo 枚举
+            refresh_interval: 自动刷新间隔（秒）
+        """
+        self._provider = provider or enumerate_monitors
+        self.refresh_interval = refresh_interval
+        self._monitors = None
+        self._last_refresh = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """使缓存的布局失效，下次访问时重新枚举"""
+        with self._lock:
+            self._monitors = None
+
+    def get_monitors(self) -> List[MonitorInfo]:
+        """
+        获取显示器列表（带缓存）
+
+        Returns:
+            list: MonitorInfo 列表，可能为空
+        """
+        monitors = self._monitors
+        if monitors is not None and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return monitors
+
+        with self._lock:
+            if (self._monitors is None or
+                    time.monotonic() - self._last_refresh >= self.refresh_interval):
+                try:
+                    self._monitors = list(self._provider())
+                except Exception:
+                    self._monitors = []
+                self._last_refresh = time.monotonic()
+            return self._monitors
+
+    def get_virtual_bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        获取虚拟屏幕边界
+
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)，没有显示器信息时返回 None
+        """
+        monitors = self.get_monitors()
+        if not monitors:
+            return None
+
+        return (
+            min(monitor.x for monitor in monitors),
+            min(monitor.y for monitor in monitors),
+            max(monitor.x + monitor.width for monitor in monitors),
+            max(monitor.y + monitor.height for monitor in monitors),
+        )
+
+    def get_virtual_offset(self) -> Tuple[int, int]:
+        """
+        获取虚拟屏幕的偏移量
+
+        Returns:
+            tuple: (min_x, min_y) 虚拟屏幕左上角相对于主显示器的偏移
+        """
+        bounds = self.get_virtual_bounds()
+        if bounds is None:
+            return (0, 0)
+        return (bounds[0], bounds[1])
+
+    def monitor_at(self, x: int, y: int) -> Optional[MonitorInfo]:
+        """获取包含指定点的显示器"""
+        for monitor in self.get_monitors():
+            if monitor.contains(x, y):
+                return monitor
+        return None
+
+
+_topology = None
+_topology_lock = threading.Lock()
+
+
+def get_monitor_topology() -> MonitorTopology:
+    """获取全局显示器拓扑服务"""
+    global _topology
+    if _topology is None:
+        with _topology_lock:
+            if _topology is None:
+                _topology = MonitorTopology()
+    return _topology
+
+
+def set_monitor_topology(topology: MonitorTopology) -> None:
+    """
+    替换全局显示器拓扑服务（测试时注入伪造布局）
+
+    Args:
+        topology: MonitorTopology 实例，None 表示恢复默认
+    """
+    global _topology
+    with _topology_lock:
+        _topology = topology
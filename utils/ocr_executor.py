@@ -0,0 +1,160 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+OCR_WORKERS_ENV = 'AUTODOOR_OCR_WORKERS'
+
+
+def default_worker_count() -> int:
+    """默认并发数：环境变量 AUTODOOR_OCR_WORKERS，未设置时为 CPU 核心数"""
+    try:
+        workers = int(os.environ.get(OCR_WORKERS_ENV, ''))
+    except ValueError:
+        workers = os.cpu_count() or 2
+    return max(1, workers)
+
+
+def limit_engine_threads() -> None:
+    """
+    限制 tesseract 内部的 OpenMP 线程数为 1
+
+    多个识别任务并行时，每个 tesseract 进程再各自开满线程会让 CPU 严重超订；单个识别组时
+    OpenMP 线程也只会和截图、界面线程争抢 CPU，小区域识别得不到加速。
+    OMP_THREAD_LIMIT 在进程启动时读取，只对之后启动的 tesseract 进程和 OCR 工作进程生效，
+    因此需要在创建任何 OCR 引擎之前调用（程序入口和 create_ocr_engine 中调用）；
+    用户已设置时不覆盖。
+    """
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+
+class _KeyStats:
+    __slots__ = ['completed', 'coalesced', 'latency_total', 'latency_max', 'queue_total', 'queue_max']
+
+    def __init__(self):
+        self.completed = 0
+        self.coalesced = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.queue_total = 0.0
+        self.queue_max = 0.0
+
+
+class OCRExecutor:
+    """
+    有界并发的 OCR 任务执行器
+
+    固定数量的工作线程并发执行各识别组的任务；同一个 key（识别组）同一时间最多只有一个
+    任务在排队或执行，前一个任务完成前再次提交会被合并（跳过），因此同一组的识别按顺序进行，
+    慢组也不会堆积任务。统计每个 key 的识别耗时和排队延迟。
+    """
+
+    def __init__(self, max_workers: int = None, name: str = "ocr"):
+        """
+        Args:
+            max_workers: 工作线程数，None 表示 default_worker_count()
+            name: 线程名前缀
+        """
+        self.max_workers = max_workers or default_worker_count()
+        limit_engine_threads()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._busy = set()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def submit(self, key, func: Callable, *args) -> bool:
+        """
+        提交任务
+
+        Args:
+            key: 任务所属的 key（如识别组索引）
+            func: 任务函数
+            *args: 任务参数
+
+        Returns:
+            bool: 是否已提交；同一 key 的上一个任务尚未完成时返回 False
+        """
+        with self._lock:
+            stats = self._stats.setdefault(key, _KeyStats())
+            if key in self._busy:
+                stats.coalesced += 1
+                return False
+            self._busy.add(key)
+
+        submitted = time.perf_counter()
+        try:
+            self._pool.submit(self._run, key, submitted, func, args)
+        except RuntimeError:
+            # 执行器已关闭
+            with self._lock:
+                self._busy.discard(key)
+                self._idle.notify_all()
+            return False
+        return True
+
+    def _run(self, key, submitted: float, func: Callable, args) -> None:
+        started = time.perf_counter()
+        try:
+            func(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                stats = self._stats[key]
+                stats.completed += 1
+                stats.latency_total += finished - started
+                stats.latency_max = max(stats.latency_max, finished - started)
+                stats.queue_total += started - submitted
+                stats.queue_max = max(stats.queue_max, started - submitted)
+                self._busy.discard(key)
+                self._idle.notify_all()
+
+    def is_busy(self, key) -> bool:
+        """key 是否有任务在排队或执行"""
+        with self._lock:
+            return key in self._busy
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有任务完成
+
+        Returns:
+            bool: 超时前是否全部完成
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._busy, timeout)
+
+    def get_stats(self) -> dict:
+        """
+        获取每个 key 的统计信息
+
+        Returns:
+            dict: {key: {"completed", "coalesced", "avg_latency_ms", "max_latency_ms",
+                   "avg_queue_ms", "max_queue_ms"}}
+        """
+        with self._lock:
+            result = {}
+            for key, stats in self._stats.items():
+                count = max(1, stats.completed)
+                result[key] = {
+                    "completed": stats.completed,
+                    "coalesced": stats.coalesced,
+                    "avg_latency_ms": stats.latency_total * 1000 / count,
+                    "max_latency_ms": stats.latency_max * 1000,
+                    "avg_queue_ms": stats.queue_total * 1000 / count,
+                    "max_queue_ms": stats.queue_max * 1000,
+                }
+            return result
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {key: _KeyStats() for key in self._busy}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭执行器，wait 为 True 时等待正在执行的任务结束"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            self._busy.clear()
+            self._idle.notify_all()
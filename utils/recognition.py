@@ -1,6 +1,26 @@
+import atexit
+import bisect
+import hashlib
+import importlib.util
+import io
+import multiprocessing
+import os
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import numpy as np
 import pytesseract
+from PIL import Image, ImageDraw
+from collections import OrderedDict
 from typing import Optional, Tuple, List
+from utils.frame import Frame, FrameRegion, to_bgr, to_image
+from utils.keywords import KeywordMatch, get_keyword_matcher
+from utils.ocr_executor import limit_engine_threads
+from utils.text_presence import TextPresenceFilter, segment_text_lines
 
 try:
     import cv2
@@ -8,11 +28,1032 @@ try:
 except ImportError:
     CV2_AVAILABLE = False
 
+TESSEROCR_AVAILABLE = importlib.util.find_spec('tesserocr') is not None
+
+OCR_ENGINE_ENV = 'AUTODOOR_OCR_ENGINE'
+OCR_DATA_KEYS = ('level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+                 'left', 'top', 'width', 'height', 'conf', 'text')
+
+OCR_CACHE_ENTRIES = 512
+OCR_CACHE_MAX_AGE = 600.0
+
+OCR_TARGET_GLYPH_HEIGHT = 20  # 目标字形高度（连通域高度中位数，约为小写字母高度，像素）
+OCR_SCALE_RANGE = (0.5, 4.0)
+OCR_SCALE_LIMITS = (0.25, 4.0)  # 识别组缩放倍数允许的范围（含手动填写）
+OCR_SCALE_STEP = 0.25
+
+
+class OCREngineError(Exception):
+    """OCR 引擎调用失败"""
+    pass
+
+
+class OCRWorkerError(OCREngineError):
+    """OCR 工作进程崩溃、无响应或管道断开"""
+    pass
+
+
+class OCREngine:
+    """
+    OCR 引擎接口
+    
+    OCRRecognizer / NumberRecognizer 通过全局引擎（get_ocr_engine）识别文字，
+    可替换为常驻工作进程引擎或测试用的替身引擎。
+    """
+    
+    name = "base"
+    # 模型是否常驻内存（常驻时预热才有意义）
+    persistent = False
+    
+    def image_to_string(self, image, lang: str = "eng", config: str = "") -> str:
+        """
+        识别图像中的文字
+        
+        Args:
+            image: PIL.Image、FrameRegion 或 numpy.ndarray
+            lang: 识别语言
+            config: Tesseract 参数，如 '--psm 6 --oem 3'
+        
+        Returns:
+            str: 识别结果
+        """
+        raise NotImplementedError
+    
+    def image_to_data(self, image, lang: str = "eng", config: str = "") -> dict:
+        """
+        识别图像中的单词及位置
+        
+        Returns:
+            dict: 与 pytesseract.image_to_data(output_type=Output.DICT) 相同的结构
+        """
+        raise NotImplementedError
+    
+    def check_health(self) -> bool:
+        """健康检查，返回引擎是否可用"""
+        return True
+    
+    def set_concurrency(self, count: int) -> None:
+        """
+        设置预期的并发识别数（如 OCRExecutor 的工作线程数）
+        
+        Args:
+            count: 同时调用引擎的线程数
+        """
+        pass
+    
+    def close(self) -> None:
+        """释放引擎资源"""
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    """每次调用启动一次 tesseract 进程（pytesseract 默认行为）"""
+    
+    name = "pytesseract"
+    
+    def image_to_string(self, image, lang: str = "eng", config: str = "") -> str:
+        return pytesseract.image_to_string(to_image(image), lang=lang, config=config)
+    
+    def image_to_data(self, image, lang: str = "eng", config: str = "") -> dict:
+        return pytesseract.image_to_data(to_image(image), lang=lang, config=config,
+                                         output_type=pytesseract.Output.DICT)
+
+
+def encode_pnm(image) -> bytes:
+    """
+    把图像编码为未压缩的 PBM/PGM（Tesseract 可直接从 stdin 读取，不需要解码 PNG）
+    
+    只含 0/255 的二值图像编码为 1 位的 PBM，其余转为灰度 PGM。
+    
+    Args:
+        image: PIL.Image、FrameRegion 或 numpy.ndarray
+    
+    Returns:
+        bytes: P4（PBM）或 P5（PGM）格式数据
+    """
+    if isinstance(image, Image.Image) and image.mode in ('1', 'L'):
+        gray = np.asarray(image.convert('L'))
+    elif isinstance(image, np.ndarray) and image.ndim == 2:
+        gray = image
+    else:
+        gray = np.asarray(to_image(image).convert('L'))
+    
+    height, width = gray.shape
+    if not ((gray != 0) & (gray != 255)).any():
+        # PBM 中 1 表示黑色，每行按字节对齐
+        bits = np.packbits(gray == 0, axis=1)
+        return b'P4\n%d %d\n' % (width, height) + bits.tobytes()
+    return b'P5\n%d %d\n255\n' % (width, height) + np.ascontiguousarray(gray, dtype=np.uint8).tobytes()
+
+
+def _parse_tsv(output: str) -> dict:
+    """把 Tesseract 的 TSV 输出解析为与 image_to_data(output_type=Output.DICT) 相同的字典"""
+    data = {key: [] for key in OCR_DATA_KEYS}
+    lines = output.splitlines()
+    for line in lines[1:]:
+        fields = line.split('\t')
+        if len(fields) < len(OCR_DATA_KEYS) - 1:
+            continue
+        if len(fields) < len(OCR_DATA_KEYS):
+            fields.append('')
+        for key, value in zip(OCR_DATA_KEYS[:-2], fields):
+            data[key].append(int(value))
+        data['conf'].append(float(fields[-2]))
+        data['text'].append(fields[-1])
+    return data
+
+
+class StdinTesseractEngine(OCREngine):
+    """
+    通过 stdin/stdout 调用 tesseract 的引擎
+    
+    图像以未压缩的 PBM/PGM 写入 tesseract 的标准输入，结果从标准输出读取，
+    不生成 PNG 和临时文件（pytesseract 每次调用都要编码 PNG、写入磁盘，再由 tesseract 解码）。
+    """
+    
+    name = "stdin"
+    
+    def __init__(self, timeout: float = 30.0):
+        """
+        Args:
+            timeout: 单次识别的超时时间（秒）
+        """
+        self.timeout = timeout
+    
+    def _run(self, image, lang: str, config: str, extension: str = None) -> str:
+        command = [pytesseract.pytesseract.tesseract_cmd, 'stdin', 'stdout', '-l', lang]
+        if config:
+            command += shlex.split(config, posix=not sys.platform.startswith('win'))
+        if extension:
+            command.append(extension)
+        
+        data = encode_pnm(image)
+        try:
+            # subprocess_args 在 Windows 下隐藏控制台窗口
+            process = subprocess.Popen(command, **pytesseract.pytesseract.subprocess_args())
+        except OSError as e:
+            raise OCREngineError(f"无法启动 tesseract: {e}")
+        
+        try:
+            stdout, stderr = process.communicate(data, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise OCREngineError(f"tesseract 识别超时 ({self.timeout}s)")
+        
+        if process.returncode != 0:
+            raise OCREngineError(stderr.decode('utf-8', errors='replace').strip())
+        return stdout.decode('utf-8', errors='replace')
+    
+    def image_to_string(self, image, lang: str = "eng", config: str = "") -> str:
+        return self._run(image, lang, config)
+    
+    def image_to_data(self, image, lang: str = "eng", config: str = "") -> dict:
+        return _parse_tsv(self._run(image, lang, config, 'tsv'))
+
+
+def _parse_tesseract_config(config: str):
+    """解析 Tesseract 参数，返回 (psm, oem, variables)"""
+    psm = oem = None
+    variables = {}
+    match = re.search(r'--psm\s+(\d+)', config or '')
+    if match:
+        psm = int(match.group(1))
+    match = re.search(r'--oem\s+(\d+)', config or '')
+    if match:
+        oem = int(match.group(1))
+    for key, value in re.findall(r'-c\s+([^=\s]+)=(\S*)', config or ''):
+        variables[key] = value
+    return psm, oem, variables
+
+
+class _TesserocrRunner:
+    """工作进程内的 tesserocr 识别器：traineddata 只加载一次"""
+    
+    def __init__(self, lang: str, config: str):
+        import tesserocr
+        self._tesserocr = tesserocr
+        psm, oem, variables = _parse_tesseract_config(config)
+        kwargs = {"lang": lang}
+        if psm is not None:
+            kwargs["psm"] = psm
+        if oem is not None:
+            kwargs["oem"] = oem
+        tessdata = os.environ.get("TESSDATA_PREFIX")
+        if tessdata:
+            kwargs["path"] = tessdata
+        self.api = tesserocr.PyTessBaseAPI(**kwargs)
+        for key, value in variables.items():
+            self.api.SetVariable(key, value)
+    
+    def image_to_string(self, image) -> str:
+        self.api.SetImage(image)
+        return self.api.GetUTF8Text()
+    
+    def image_to_data(self, image) -> dict:
+        RIL = self._tesserocr.RIL
+        data = {key: [] for key in OCR_DATA_KEYS}
+        self.api.SetImage(image)
+        self.api.Recognize()
+        iterator = self.api.GetIterator()
+        if iterator is None:
+            return data
+        
+        block = paragraph = line = word = 0
+        while True:
+            if not iterator.Empty(RIL.WORD):
+                if iterator.IsAtBeginningOf(RIL.BLOCK):
+                    block += 1
+                    paragraph = line = 0
+                if iterator.IsAtBeginningOf(RIL.PARA):
+                    paragraph += 1
+                    line = 0
+                if iterator.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+                    word = 0
+                word += 1
+                
+                x1, y1, x2, y2 = iterator.BoundingBox(RIL.WORD)
+                values = (5, 1, block, paragraph, line, word, x1, y1, x2 - x1, y2 - y1,
+                          iterator.Confidence(RIL.WORD), iterator.GetUTF8Text(RIL.WORD) or '')
+                for key, value in zip(OCR_DATA_KEYS, values):
+                    data[key].append(value)
+            if not iterator.Next(RIL.WORD):
+                break
+        return data
+    
+    def close(self) -> None:
+        self.api.End()
+
+
+class _StdinRunner:
+    """工作进程内的 stdin 管道识别器（未安装 tesserocr 时的回退）"""
+    
+    def __init__(self, lang: str, config: str):
+        self.lang = lang
+        self.config = config
+        self.engine = StdinTesseractEngine()
+    
+    def image_to_string(self, image) -> str:
+        return self.engine.image_to_string(image, self.lang, self.config)
+    
+    def image_to_data(self, image) -> dict:
+        return self.engine.image_to_data(image, self.lang, self.config)
+    
+    def close(self) -> None:
+        pass
+
+
+def _tesseract_worker_main(conn, lang: str, config: str, tesseract_cmd: str, handle=None) -> None:
+    """
+    OCR 工作进程主循环
+    
+    消息格式：(操作, 负载)，操作为 "ping"、"string" 或 "data"，负载为共享帧引用
+    (SharedFrameRef, mode) 或 (mode, size, 像素字节)；回复 ("ok", 结果) 或 ("error", 错误信息)；
+    收到 None 时退出。
+    """
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    
+    reader = None
+    if handle is not None:
+        try:
+            from utils.shared_frames import SharedFrameReader
+            reader = SharedFrameReader(handle)
+        except Exception:
+            reader = None
+    
+    try:
+        runner = _TesserocrRunner(lang, config) if TESSEROCR_AVAILABLE else _StdinRunner(lang, config)
+    except Exception as e:
+        runner = None
+        init_error = str(e)
+    
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            
+            operation, payload = message
+            if operation == "ping":
+                conn.send(("ok", "pong") if runner is not None else ("error", init_error))
+                continue
+            if runner is None:
+                conn.send(("error", init_error))
+                continue
+            
+            view = None
+            try:
+                if len(payload) == 2:
+                    ref, mode = payload
+                    view = reader.get(ref) if reader is not None else None
+                    if view is None:
+                        raise OCREngineError("共享帧已失效")
+                    array = view.array[:, :, 0] if mode == 'L' else view.array
+                    image = Image.fromarray(array, mode)
+                else:
+                    mode, size, pixels = payload
+                    image = Image.frombytes(mode, size, pixels)
+                if operation == "string":
+                    reply = ("ok", runner.image_to_string(image))
+                else:
+                    reply = ("ok", runner.image_to_data(image))
+            except Exception as e:
+                reply = ("error", str(e))
+            finally:
+                # 回复前释放槽位，主进程收到结果时槽位已可复用
+                image = array = None
+                if view is not None:
+                    view.release()
+            conn.send(reply)
+    finally:
+        if runner is not None:
+            runner.close()
+        if reader is not None:
+            reader.close()
+
+
+class _TesseractWorker:
+    """单个常驻 OCR 工作进程（固定语言和参数）"""
+    
+    def __init__(self, lang: str, config: str, tesseract_cmd: str, context, handle=None):
+        self.lang = lang
+        self.config = config
+        self.tesseract_cmd = tesseract_cmd
+        self._context = context
+        self._handle = handle
+        self._process = None
+        self._conn = None
+        self.lock = threading.Lock()
+    
+    def start(self) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_tesseract_worker_main,
+            args=(child_conn, self.lang, self.config, self.tesseract_cmd, self._handle),
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+    
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+    
+    def request(self, operation: str, payload, timeout: float):
+        """发送请求并等待回复（调用方需持有 lock）"""
+        try:
+            self._conn.send((operation, payload))
+            if not self._conn.poll(timeout):
+                raise OCRWorkerError(f"OCR工作进程超时 ({self.lang})")
+            status, result = self._conn.recv()
+        except (EOFError, OSError) as e:
+            raise OCRWorkerError(f"OCR工作进程通信失败 ({self.lang}): {e}")
+        
+        if status != "ok":
+            raise OCREngineError(result)
+        return result
+    
+    def close(self) -> None:
+        try:
+            if self._conn is not None:
+                self._conn.send(None)
+        except Exception:
+            pass
+        if self._process is not None:
+            self._process.join(timeout=1)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join(timeout=1)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+
+class _WorkerPool:
+    """同一 (语言, 参数) 的工作进程池，按需启动，最多 size 个进程"""
+    
+    def __init__(self, factory, size: int):
+        self._factory = factory
+        self.size = max(1, int(size))
+        self.workers = []
+        self._idle = []
+        self._cond = threading.Condition()
+    
+    def acquire(self) -> _TesseractWorker:
+        """取出一个空闲工作进程（持有其 lock），全部忙碌且已达上限时等待"""
+        with self._cond:
+            while True:
+                if self._idle:
+                    worker = self._idle.pop()
+                    break
+                if len(self.workers) < self.size:
+                    worker = self._factory()
+                    self.workers.append(worker)
+                    break
+                self._cond.wait()
+        worker.lock.acquire()
+        return worker
+    
+    def release(self, worker: _TesseractWorker) -> None:
+        worker.lock.release()
+        with self._cond:
+            self._idle.append(worker)
+            self._cond.notify()
+
+
+class TesseractWorkerEngine(OCREngine):
+    """
+    常驻工作进程 OCR 引擎
+    
+    每种 (语言, 参数) 组合一个长期运行的工作进程池，避免每次调用都启动 tesseract 进程、
+    写临时文件和重新加载 traineddata（安装了 tesserocr 时模型只加载一次）。
+    进程池大小由 set_concurrency 设置（OCRExecutor 的工作线程数），同一语言的多个识别组
+    可以并行识别，而不是排队等待同一个进程；池中的进程按需启动。
+    图像写入共享帧存储（utils.shared_frames），管道只传递 SharedFrameRef，工作进程零拷贝读取；
+    图像过大、模式不支持或没有空闲槽位时回退为通过管道发送像素字节。
+    工作进程崩溃或超时会被重启，请求自动重试一次。
+    """
+    
+    name = "worker"
+    
+    REQUEST_TIMEOUT = 30.0
+    PING_TIMEOUT = 5.0
+    SHARED_SLOT_COUNT = 8
+    SHARED_SLOT_BYTES = 4 * 1024 * 1024
+    SHARED_MODES = ('L', 'RGB')
+    
+    def __init__(self, context: str = 'spawn', request_timeout: float = REQUEST_TIMEOUT,
+                 pool_size: int = 1):
+        """
+        Args:
+            context: multiprocessing 启动方式
+            request_timeout: 单次识别的超时时间（秒）
+            pool_size: 每种 (语言, 参数) 组合最多启动的工作进程数
+        """
+        self._context = multiprocessing.get_context(context)
+        self.request_timeout = request_timeout
+        self.pool_size = max(1, int(pool_size))
+        self._context_name = context
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._store = None
+        self.restarts = 0
+        self.shared_handoffs = 0
+        self.pipe_handoffs = 0
+    
+    def _get_store(self):
+        """共享帧存储（创建第一个工作进程时启用，调用方需持有 _lock）"""
+        if self._store is None:
+            try:
+                from utils.shared_frames import SharedFrameStore
+                # 每个工作进程同一时间只占用一个槽位
+                slot_count = max(self.SHARED_SLOT_COUNT, self.pool_size * 2)
+                self._store = SharedFrameStore(slot_count, self.SHARED_SLOT_BYTES, context=self._context_name)
+                atexit.register(self._store.close)
+            except Exception:
+                self._store = False
+        return self._store or None
+    
+    @property
+    def persistent(self) -> bool:
+        """安装了 tesserocr 时工作进程常驻模型，否则每次识别仍会启动 tesseract 进程"""
+        return TESSEROCR_AVAILABLE
+    
+    def set_concurrency(self, count: int) -> None:
+        """设置每种 (语言, 参数) 组合的进程池大小，已启动的进程保留，只影响之后的扩容"""
+        with self._lock:
+            self.pool_size = max(1, int(count))
+            for pool in self._pools.values():
+                pool.size = self.pool_size
+    
+    def _get_pool(self, lang: str, config: str) -> _WorkerPool:
+        tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+        key = (lang, config, tesseract_cmd)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                store = self._get_store()
+                handle = store.handle if store is not None else None
+                
+                def start_worker():
+                    worker = _TesseractWorker(lang, config, tesseract_cmd, self._context, handle)
+                    worker.start()
+                    return worker
+                
+                pool = _WorkerPool(start_worker, self.pool_size)
+                self._pools[key] = pool
+            return pool
+    
+    def _all_workers(self) -> list:
+        with self._lock:
+            pools = list(self._pools.values())
+        return [worker for pool in pools for worker in list(pool.workers)]
+    
+    def _restart(self, worker: _TesseractWorker) -> None:
+        """重启工作进程（调用方需持有 worker.lock）"""
+        worker.close()
+        worker.start()
+        with self._lock:
+            self.restarts += 1
+    
+    def _share(self, image, key):
+        """把图像写入共享帧存储，返回 (SharedFrameRef, mode) 负载，无法写入时返回 None"""
+        store = self._store
+        if not store or image.mode not in self.SHARED_MODES:
+            return None
+        ref = store.put(Frame(np.asarray(image)), key)
+        return (ref, image.mode) if ref is not None else None
+    
+    def _call(self, operation: str, image, lang: str, config: str):
+        image = to_image(image)
+        pool = self._get_pool(lang, config)
+        worker = pool.acquire()
+        
+        try:
+            payload = self._share(image, id(worker))
+            shared = payload is not None
+            if not shared:
+                payload = (image.mode, image.size, image.tobytes())
+            with self._lock:
+                if shared:
+                    self.shared_handoffs += 1
+                else:
+                    self.pipe_handoffs += 1
+            try:
+                if not worker.is_alive():
+                    self._restart(worker)
+                try:
+                    return worker.request(operation, payload, self.request_timeout)
+                except OCRWorkerError:
+                    # 工作进程崩溃或超时：重启后重试一次（识别本身的错误直接抛出）
+                    self._restart(worker)
+                    try:
+                        return worker.request(operation, payload, self.request_timeout)
+                    except OCRWorkerError:
+                        # 仍然失败：关闭进程，避免下次请求读到过期的回复，下次调用时重新启动
+                        worker.close()
+                        raise
+            finally:
+                if shared and self._store:
+                    self._store.discard(id(worker))
+        finally:
+            pool.release(worker)
+    
+    def image_to_string(self, image, lang: str = "eng", config: str = "") -> str:
+        return self._call("string", image, lang, config)
+    
+    def image_to_data(self, image, lang: str = "eng", config: str = "") -> dict:
+        return self._call("data", image, lang, config)
+    
+    def check_health(self) -> bool:
+        """
+        检查所有工作进程，无响应的进程会被重启
+        
+        Returns:
+            bool: 检查后所有工作进程都可用
+        """
+        healthy = True
+        for worker in self._all_workers():
+            with worker.lock:
+                try:
+                    if not worker.is_alive():
+                        raise OCRWorkerError("OCR工作进程已退出")
+                    worker.request("ping", None, self.PING_TIMEOUT)
+                except OCREngineError:
+                    try:
+                        self._restart(worker)
+                        worker.request("ping", None, self.PING_TIMEOUT)
+                    except OCREngineError:
+                        healthy = False
+        return healthy
+    
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": [{"lang": lang, "config": config, "alive": worker.is_alive()}
+                            for (lang, config, _), pool in self._pools.items()
+                            for worker in list(pool.workers)],
+                "pool_size": self.pool_size,
+                "restarts": self.restarts,
+                "shared_handoffs": self.shared_handoffs,
+                "pipe_handoffs": self.pipe_handoffs,
+            }
+    
+    def close(self) -> None:
+        workers = self._all_workers()
+        with self._lock:
+            self._pools = {}
+            store, self._store = self._store, None
+        for worker in workers:
+            with worker.lock:
+                worker.close()
+        if store:
+            store.close()
+
+
+class StubOCREngine(OCREngine):
+    """
+    替身 OCR 引擎（测试或无 Tesseract 环境使用）
+    
+    识别结果由 responder(image, lang, config) 决定，默认返回固定文本；
+    image_to_data 把文本按空格拆成单词，并在图像宽度上均匀分配位置。
+    """
+    
+    name = "stub"
+    
+    def __init__(self, responder=None, text: str = ""):
+        self.responder = responder or (lambda image, lang, config: text)
+        self.calls = 0
+    
+    def image_to_string(self, image, lang: str = "eng", config: str = "") -> str:
+        self.calls += 1
+        return self.responder(image, lang, config)
+    
+    def image_to_data(self, image, lang: str = "eng", config: str = "") -> dict:
+        text = self.image_to_string(image, lang, config)
+        width, height = to_image(image).size
+        words = text.split()
+        data = {key: [] for key in OCR_DATA_KEYS}
+        step = width // max(1, len(words))
+        for index, word in enumerate(words):
+            values = (5, 1, 1, 1, 1, index + 1, index * step, 0, step, height, 95.0, word)
+            for key, value in zip(OCR_DATA_KEYS, values):
+                data[key].append(value)
+        return data
+
+
+def create_ocr_engine(spec: str = None) -> OCREngine:
+    """
+    根据描述创建 OCR 引擎
+    
+    Args:
+        spec: "stdin"、"pytesseract" 或 "worker"，为 None 时读取环境变量 AUTODOOR_OCR_ENGINE；
+              未指定时安装了 tesserocr 使用常驻工作进程，否则通过 stdin 管道调用 tesseract
+              （tesserocr 在 PyPI 上没有 Windows 预编译包，requirements.txt 只在非 Windows 平台安装，
+              Windows 上需要自行安装 tesserocr 才能使用常驻工作进程）
+    
+    Returns:
+        OCREngine: OCR 引擎
+    """
+    # 引擎启动的 tesseract 进程和工作进程都要继承线程数限制
+    limit_engine_threads()
+    
+    if spec is None:
+        spec = os.environ.get(OCR_ENGINE_ENV, '')
+    spec = spec.strip().lower()
+    
+    if spec == 'worker' or (not spec and TESSEROCR_AVAILABLE):
+        return TesseractWorkerEngine()
+    if spec == 'pytesseract':
+        return PytesseractEngine()
+    return StdinTesseractEngine()
+
+
+_ocr_engine = None
+_ocr_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OCREngine:
+    """获取全局 OCR 引擎"""
+    global _ocr_engine
+    if _ocr_engine is None:
+        with _ocr_engine_lock:
+            if _ocr_engine is None:
+                _ocr_engine = create_ocr_engine()
+    return _ocr_engine
+
+
+def warm_up_ocr(combinations, on_ready=None) -> List[threading.Thread]:
+    """
+    在后台预热 OCR 引擎
+    
+    常驻引擎（安装了 tesserocr 的 TesseractWorkerEngine）中某个语言/配置第一次识别时
+    要启动工作进程并从磁盘加载 traineddata（chi_sim、chi_tra 尤其慢），启动监控时对实际
+    用到的每个 (language, config) 组合识别一张小图，让第一次真正的识别就是稳态耗时。
+    每个组合按进程池大小并行发出请求，池中的每个工作进程都会被启动。直接调用引擎，
+    不经过结果缓存和文字预过滤。
+    非常驻引擎每次识别都重新加载模型，预热没有收益，直接跳过。
+    
+    Args:
+        combinations: (language, config) 组合（重复项只预热一次）
+        on_ready: 回调 on_ready(language, config, elapsed, error)，elapsed 为耗时（秒），
+                  error 为 None 表示预热成功；每个组合回调一次
+    
+    Returns:
+        list: 预热线程，引擎不是常驻引擎时为空列表
+    """
+    engine = get_ocr_engine()
+    if not engine.persistent:
+        return []
+    
+    image = Image.new("L", (96, 32), 255)
+    ImageDraw.Draw(image).text((8, 10), "0 1", fill=0)
+    
+    def warm_up(language, config):
+        start = time.perf_counter()
+        errors = []
+        
+        def request():
+            try:
+                engine.image_to_data(image, language, config)
+            except Exception as e:
+                errors.append(e)
+        
+        # 同时发出的请求各占用一个工作进程，池中进程全部启动
+        requests = [threading.Thread(target=request, daemon=True)
+                    for _ in range(max(1, getattr(engine, 'pool_size', 1)))]
+        for thread in requests:
+            thread.start()
+        for thread in requests:
+            thread.join()
+        if on_ready is not None:
+            on_ready(language, config, time.perf_counter() - start, errors[0] if errors else None)
+    
+    threads = []
+    for language, config in dict.fromkeys(combinations):
+        thread = threading.Thread(target=warm_up, args=(language, config), daemon=True,
+                                  name=f"ocr-warmup-{language}")
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def set_ocr_engine(engine: Optional[OCREngine]) -> None:
+    """
+    替换全局 OCR 引擎（旧引擎会被关闭）
+    
+    Args:
+        engine: OCREngine 实例（如 StubOCREngine），None 表示恢复默认
+    """
+    global _ocr_engine
+    with _ocr_engine_lock:
+        old_engine = _ocr_engine
+        _ocr_engine = engine
+    if old_engine is not None and old_engine is not engine:
+        old_engine.close()
+
+
+class OCRResult:
+    """
+    一次 OCR 调用的完整结果：全文、单词、单词位置和置信度
+    
+    由一次 image_to_data 得到，关键词匹配和点击位置查找都使用同一份结果，
+    不再为同一张图像分别调用 image_to_string 和 image_to_data。
+    """
+    
+    def __init__(self, words: List[str], boxes: List[Tuple[int, int, int, int]],
+                 confidences: List[float], lines: List[tuple]):
+        """
+        Args:
+            words: 识别出的单词
+            boxes: 每个单词的位置 (left, top, width, height) - 相对于图像
+            confidences: 每个单词的置信度（0-100）
+            lines: 每个单词所属的行 (block_num, par_num, line_num)
+        """
+        self.words = words
+        self.boxes = boxes
+        self.confidences = confidences
+        self.lines = lines
+        self.text = self._join_text()
+        self._lower_text = None
+        self._word_starts = None
+    
+    @classmethod
+    def from_data(cls, data: dict) -> 'OCRResult':
+        """从 image_to_data 的字典结果构建（跳过空白项）"""
+        words, boxes, confidences, lines = [], [], [], []
+        for i in range(len(data['text'])):
+            word = str(data['text'][i]).strip()
+            if not word:
+                continue
+            words.append(word)
+            boxes.append((int(data['left'][i]), int(data['top'][i]),
+                          int(data['width'][i]), int(data['height'][i])))
+            confidences.append(float(data['conf'][i]))
+            lines.append((data['block_num'][i], data['par_num'][i], data['line_num'][i]))
+        return cls(words, boxes, confidences, lines)
+    
+    def _join_text(self) -> str:
+        """同一行的单词用空格连接，行之间换行（与 image_to_string 的输出一致）"""
+        parts = []
+        for i, word in enumerate(self.words):
+            if i > 0:
+                parts.append(" " if self.lines[i] == self.lines[i - 1] else "\n")
+            parts.append(word)
+        return "".join(parts)
+    
+    @property
+    def confidence(self) -> float:
+        """平均置信度，没有单词时为 0"""
+        return sum(self.confidences) / len(self.confidences) if self.confidences else 0.0
+    
+    def _lowered(self) -> str:
+        """小写全文，同时记录每个单词在其中的起始位置（按转小写后的长度计算）"""
+        if self._lower_text is None:
+            parts, starts, position = [], [], 0
+            for i, word in enumerate(self.words):
+                if i > 0:
+                    parts.append(" " if self.lines[i] == self.lines[i - 1] else "\n")
+                    position += 1
+                starts.append(position)
+                word = word.lower()
+                parts.append(word)
+                position += len(word)
+            self._word_starts = starts
+            self._lower_text = "".join(parts)
+        return self._lower_text
+    
+    def match(self, keywords) -> Optional[KeywordMatch]:
+        """
+        在全文中查找第一个关键词
+        
+        Args:
+            keywords: KeywordMatcher、关键词列表或逗号分隔的关键词字符串
+        
+        Returns:
+            KeywordMatch: 匹配到的关键词及其在小写全文中的位置，未找到返回None
+        """
+        return get_keyword_matcher(keywords).search(self._lowered(), lowered=True)
+    
+    def contains(self, keywords) -> bool:
+        """全文是否包含任一关键词（参数同 match）"""
+        return self.match(keywords) is not None
+    
+    def find(self, keywords) -> Optional[Tuple[int, int]]:
+        """
+        查找第一个关键词所在位置的中心（跨多个单词的关键词取这些单词的外接框）
+        
+        Args:
+            keywords: KeywordMatcher、关键词列表或逗号分隔的关键词字符串
+        
+        Returns:
+            tuple: (center_x, center_y) 相对于图像，未找到返回None
+        """
+        match = self.match(keywords)
+        if match is None:
+            return None
+        
+        first = bisect.bisect_right(self._word_starts, match.start) - 1
+        last = bisect.bisect_right(self._word_starts, match.end - 1) - 1
+        boxes = self.boxes[first:last + 1]
+        left = min(box[0] for box in boxes)
+        top = min(box[1] for box in boxes)
+        right = max(box[0] + box[2] for box in boxes)
+        bottom = max(box[1] + box[3] for box in boxes)
+        return ((left + right) // 2, (top + bottom) // 2)
+
+
+def image_digest(image) -> bytes:
+    """
+    计算图像内容的哈希（模式、尺寸和全部像素），相同内容的图像哈希相同
+    
+    Args:
+        image: PIL.Image、FrameRegion 或 numpy.ndarray
+    
+    Returns:
+        bytes: 16 字节摘要
+    """
+    image = to_image(image)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    digest.update(image.tobytes())
+    return digest.digest()
+
+
+class OCRResultCache:
+    """
+    按内容寻址的 OCR 结果 LRU 缓存
+    
+    键为 (预处理后图像的内容哈希, 语言, 引擎参数, 结果类型)。长时间停留在屏幕上的静态文字
+    （按钮、标签、提示）每次识别得到完全相同的预处理图像，直接返回上次的结果，不再调用引擎。
+    条目数超过 max_entries 时淘汰最久未使用的条目，超过 max_age 秒的条目视为过期。
+    OCRModule、BackgroundMonitor 和 NumberModule 共享全局实例（get_ocr_cache）。
+    """
+    
+    def __init__(self, max_entries: int = OCR_CACHE_ENTRIES, max_age: float = OCR_CACHE_MAX_AGE):
+        """
+        Args:
+            max_entries: 最大条目数
+            max_age: 条目有效期（秒）
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()  # key -> (创建时间, 结果)
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+    
+    def get(self, image, lang: str, config: str, kind: str, build):
+        """
+        获取缓存的识别结果，未命中时调用 build() 识别并缓存
+        
+        Args:
+            image: 交给引擎的图像
+            lang: 识别语言
+            config: 引擎参数
+            kind: 结果类型，如 "data" 或 "string"
+            build: 识别函数，抛出异常时不缓存
+        
+        Returns:
+            build() 的返回值
+        """
+        key = (image_digest(image), lang, config, kind)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.max_age:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+        
+        result = build()
+        with self._lock:
+            self._entries[key] = (now, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        """
+        获取缓存统计信息
+        
+        Returns:
+            dict: hits、misses、evictions（容量淘汰）、expired（过期淘汰）、
+                  entries（当前条目数）、hit_rate（命中率）
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+    
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expired = 0
+    
+    def format_stats(self) -> str:
+        """生成用于日志的统计摘要"""
+        stats = self.get_stats()
+        return (f"OCR结果缓存命中率: {stats['hit_rate']:.1%} (命中 {stats['hits']}, "
+                f"未命中 {stats['misses']}, 淘汰 {stats['evictions']}, 过期 {stats['expired']}, "
+                f"条目 {stats['entries']})")
+
+
+_ocr_cache = OCRResultCache()
+
+
+def get_ocr_cache() -> OCRResultCache:
+    """获取全局 OCR 结果缓存"""
+    return _ocr_cache
+
+
+def choose_ocr_scale(text_height: float, target: float = OCR_TARGET_GLYPH_HEIGHT) -> float:
+    """
+    根据估计的字形高度选择缩放倍数，使缩放后的字形高度接近 target
+    
+    Args:
+        text_height: 字形高度（像素），0 表示未检测到文字
+        target: 目标字形高度
+    
+    Returns:
+        float: 缩放倍数（按 0.25 取整并限制在 0.5-4.0 之间），无法估计时为 1.0
+    """
+    if text_height <= 0:
+        return 1.0
+    scale = round(target / text_height / OCR_SCALE_STEP) * OCR_SCALE_STEP
+    return min(OCR_SCALE_RANGE[1], max(OCR_SCALE_RANGE[0], scale))
+
 
 class OCRRecognizer:
     """统一的OCR识别器"""
     
     TESSERACT_CONFIG = r'--psm 6 --oem 3'
+    LINE_CONFIG = r'--psm 7 --oem 3'
+    MAX_CONFIDENCE_LOSS = 5.0  # 校准后平均置信度下降超过该值时保持原尺寸
     
     @staticmethod
     def recognize(image, keywords: str, language: str = "eng", 
@@ -36,22 +1077,19 @@ class OCRRecognizer:
             return (False, None)
         
         try:
-            keyword_list = [k.strip().lower() for k in keywords.split(",") if k.strip()]
-            if not keyword_list:
+            matcher = get_keyword_matcher(keywords)
+            if not matcher:
                 return (False, None)
             
-            text = pytesseract.image_to_string(image, lang=language, config=OCRRecognizer.TESSERACT_CONFIG)
-            text_lower = text.lower()
-            
-            if not any(kw in text_lower for kw in keyword_list):
+            result = OCRRecognizer.read(image, language)
+            if result is None or not result.contains(matcher):
                 return (False, None)
             
             if log_func:
                 prefix = f"监控组{group_index + 1}" if group_index is not None else ""
-                log_func(f"{prefix}识别到关键词: {text.strip()}")
+                log_func(f"{prefix}识别到关键词: {result.text}")
             
-            click_pos = OCRRecognizer.find_keyword_position(image, keyword_list, language)
-            return (True, click_pos)
+            return (True, result.find(matcher))
             
         except Exception as e:
             if log_func:
@@ -60,41 +1098,159 @@ class OCRRecognizer:
             return (False, None)
     
     @staticmethod
-    def find_keyword_position(image, keywords: List[str], language: str = "eng") -> Optional[Tuple[int, int]]:
+    def _skip_by_prefilter(image, prefilter: Optional[TextPresenceFilter]) -> bool:
         """
-        查找关键词在图像中的位置
+        文字存在性预过滤（默认关闭）
+        
+        Args:
+            prefilter: 识别组自己的 TextPresenceFilter，None 表示不过滤
+        
+        Returns:
+            bool: 判断没有文字、可以跳过 OCR
+        """
+        if prefilter is None:
+            return False
+        return not prefilter.has_text(image)
+    
+    @staticmethod
+    def read(image, language: str = "eng", source=None,
+             prefilter: Optional[TextPresenceFilter] = None) -> Optional[OCRResult]:
+        """
+        对图像执行一次 OCR，同时得到全文和单词位置
         
         Args:
             image: PIL.Image 处理后的图像
-            keywords: 关键词列表（已转为小写）
             language: 识别语言
+            source: 图像来源的 FrameRegion（可选），结果缓存在该区域上，
+                    同一帧同一区域的其他消费者直接复用
+            prefilter: 文字存在性预过滤器（TextPresenceFilter），判断没有文字时直接返回空结果
+                       （不写入缓存）；None 表示不过滤
         
         Returns:
-            tuple: (center_x, center_y) 关键词中心位置，未找到返回None
+            OCRResult: 识别结果，失败返回None
         """
+        config = OCRRecognizer.TESSERACT_CONFIG
+        
+        def run():
+            return _ocr_cache.get(image, language, config, "data",
+                                  lambda: OCRResult.from_data(get_ocr_engine().image_to_data(image, language, config)))
+        
         try:
-            data = pytesseract.image_to_data(
-                image, lang=language, 
-                config=OCRRecognizer.TESSERACT_CONFIG, 
-                output_type=pytesseract.Output.DICT
-            )
-            
-            for i in range(len(data['text'])):
-                word = data['text'][i].lower().strip()
-                if word in keywords or any(keyword in word for keyword in keywords):
-                    left_word = data['left'][i]
-                    top_word = data['top'][i]
-                    width = data['width'][i]
-                    height = data['height'][i]
-                    center_x = left_word + width // 2
-                    center_y = top_word + height // 2
-                    return (center_x, center_y)
-            
+            if OCRRecognizer._skip_by_prefilter(image, prefilter):
+                return OCRResult([], [], [], [])
+            if isinstance(source, FrameRegion):
+                return source.cached(("ocr", language, config, image.size), run)
+            return run()
+        except Exception:
             return None
-            
+    
+    @staticmethod
+    def read_lines(image, language: str = "eng", source=None,
+                   prefilter: Optional[TextPresenceFilter] = None) -> Optional[OCRResult]:
+        """
+        逐行增量 OCR（适合聊天、战斗日志等滚动文本区域）
+        
+        用水平投影把图像切分为文字行，每行按内容哈希查找 OCR 结果缓存，
+        只有新出现或变化的行才调用引擎；只是上移的行内容不变，直接复用缓存结果。
+        各行结果按位置拼接为完整的 OCRResult，用于关键词匹配和点击位置查找。
+        
+        Args:
+            image: PIL.Image 处理后的图像
+            language: 识别语言
+            source: 图像来源的 FrameRegion（可选），同 read()
+            prefilter: 文字存在性预过滤器，同 read()
+        
+        Returns:
+            OCRResult: 识别结果，失败返回None
+        """
+        config = OCRRecognizer.LINE_CONFIG
+        
+        def run():
+            engine = get_ocr_engine()
+            words, boxes, confidences, lines = [], [], [], []
+            for index, (top, bottom) in enumerate(segment_text_lines(image)):
+                strip = image.crop((0, top, image.width, bottom))
+                line = _ocr_cache.get(strip, language, config, "data",
+                                      lambda: OCRResult.from_data(engine.image_to_data(strip, language, config)))
+                for word, (left, word_top, width, height), confidence in zip(line.words, line.boxes,
+                                                                               line.confidences):
+                    words.append(word)
+                    boxes.append((left, word_top + top, width, height))
+                    confidences.append(confidence)
+                    lines.append((1, 1, index + 1))
+            return OCRResult(words, boxes, confidences, lines)
+        
+        try:
+            if OCRRecognizer._skip_by_prefilter(image, prefilter):
+                return OCRResult([], [], [], [])
+            if isinstance(source, FrameRegion):
+                return source.cached(("ocr_lines", language, config, image.size), run)
+            return run()
         except Exception:
             return None
     
+    @staticmethod
+    def calibrate_scale(image, language: str = "eng", rounds: int = 3) -> Optional[dict]:
+        """
+        校准 OCR 输入缩放倍数
+        
+        从预处理后图像的连通域估计字形高度，选择使字形接近 OCR_TARGET_GLYPH_HEIGHT 的缩放倍数，
+        并分别在原尺寸和缩放后直接调用引擎（不经过缓存和预过滤）测量耗时与平均置信度；
+        缩放后置信度明显下降时保持 1.0。
+        
+        Args:
+            image: 识别区域的原始截图（PIL.Image 或 FrameRegion）
+            language: 识别语言
+            rounds: 每种尺寸的测量次数
+        
+        Returns:
+            dict: scale（选定的倍数）、text_height（估计的字形高度）、
+                  before/after: {"latency_ms", "confidence", "text"}；预处理失败返回None
+        """
+        from utils.image import _preprocess_image
+        from utils.text_presence import text_presence_stats
+        
+        base = _preprocess_image(image)
+        if base is None:
+            return None
+        text_height = text_presence_stats(base)["text_height"]
+        scale = choose_ocr_scale(text_height)
+        engine = get_ocr_engine()
+        config = OCRRecognizer.TESSERACT_CONFIG
+        
+        def measure(candidate):
+            processed = _preprocess_image(image, scale=candidate)
+            start = time.perf_counter()
+            for _ in range(max(1, rounds)):
+                result = OCRResult.from_data(engine.image_to_data(processed, language, config))
+            return {
+                "latency_ms": (time.perf_counter() - start) * 1000 / max(1, rounds),
+                "confidence": result.confidence,
+                "text": result.text,
+            }
+        
+        before = measure(1.0)
+        after = measure(scale) if scale != 1.0 else dict(before)
+        if after["confidence"] < before["confidence"] - OCRRecognizer.MAX_CONFIDENCE_LOSS:
+            scale = 1.0
+        return {"scale": scale, "text_height": text_height, "before": before, "after": after}
+    
+    @staticmethod
+    def find_keyword_position(image, keywords: List[str], language: str = "eng") -> Optional[Tuple[int, int]]:
+        """
+        查找关键词在图像中的位置
+        
+        Args:
+            image: PIL.Image 处理后的图像
+            keywords: 关键词列表或 KeywordMatcher
+            language: 识别语言
+        
+        Returns:
+            tuple: (center_x, center_y) 关键词中心位置，未找到返回None
+        """
+        result = OCRRecognizer.read(image, language)
+        return result.find(keywords) if result is not None else None
+    
     @staticmethod
     def get_text(image, language: str = "eng") -> Optional[str]:
         """
@@ -107,10 +1263,8 @@ class OCRRecognizer:
         Returns:
             str: 识别的文字，失败返回None
         """
-        try:
-            return pytesseract.image_to_string(image, lang=language, config=OCRRecognizer.TESSERACT_CONFIG)
-        except Exception:
-            return None
+        result = OCRRecognizer.read(image, language)
+        return result.text if result is not None else None
 
 
 class ImageRecognizer:
@@ -123,7 +1277,7 @@ class ImageRecognizer:
         模板匹配识别
         
         Args:
-            screenshot: PIL.Image 截图图像
+            screenshot: PIL.Image 截图图像、FrameRegion 或只读 RGB 视图
             template: numpy.ndarray 模板图像 (BGR格式)
             threshold: 匹配阈值 (0.0-1.0)
             log_func: 日志函数
@@ -144,7 +1298,7 @@ class ImageRecognizer:
             return (False, None, 0.0)
         
         try:
-            screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            screenshot_cv = to_bgr(screenshot)
             
             template_h, template_w = template.shape[:2]
             screenshot_h, screenshot_w = screenshot_cv.shape[:2]
@@ -173,9 +1327,93 @@ class ImageRecognizer:
             return (False, None, 0.0)
 
 
+class PixelProbeSet:
+    """
+    预编译的像素探针集合
+    
+    每个探针为 (x, y, (R, G, B), tolerance)，坐标为屏幕绝对坐标（或相对于传入图像的 origin）。
+    evaluate() 用一次向量化索引取出所有探针像素并同时比较，数百个探针只需几微秒。
+    """
+    
+    MODE_ALL = "all"
+    MODE_ANY = "any"
+    
+    def __init__(self, probes, mode: str = MODE_ALL):
+        """
+        Args:
+            probes: [(x, y, (R, G, B), tolerance), ...]
+            mode: "all" 所有探针都匹配才算匹配（AND），"any" 任一探针匹配即可（OR）
+        """
+        probes = list(probes)
+        if not probes:
+            raise ValueError("探针列表为空")
+        if mode not in (self.MODE_ALL, self.MODE_ANY):
+            raise ValueError(f"未知的探针模式: {mode}")
+        
+        self.mode = mode
+        self.xs = np.array([int(probe[0]) for probe in probes], dtype=np.intp)
+        self.ys = np.array([int(probe[1]) for probe in probes], dtype=np.intp)
+        self.colors = np.clip(np.array([probe[2][:3] for probe in probes], dtype=np.int16), 0, 255)
+        self.tolerances = np.array([int(probe[3]) for probe in probes], dtype=np.int16)[:, None]
+        self.bbox = (int(self.xs.min()), int(self.ys.min()),
+                     int(self.xs.max()) + 1, int(self.ys.max()) + 1)
+    
+    def __len__(self):
+        return len(self.xs)
+    
+    def evaluate(self, image, origin=(0, 0)) -> Tuple[bool, np.ndarray]:
+        """
+        对图像执行所有探针
+        
+        Args:
+            image: RGB 数组、FrameRegion 或 PIL.Image
+            origin: 图像左上角对应的坐标（探针坐标减去 origin 得到图像内坐标）
+        
+        Returns:
+            tuple: (matched, hits)
+                - matched: 按 mode 合并后的结果
+                - hits: 每个探针是否匹配的布尔数组（超出图像范围的探针为 False）
+        """
+        array = np.asarray(image)
+        height, width = array.shape[:2]
+        xs = self.xs - origin[0]
+        ys = self.ys - origin[1]
+        
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        if not inside.all():
+            xs = np.where(inside, xs, 0)
+            ys = np.where(inside, ys, 0)
+        
+        pixels = array[ys, xs, :3].astype(np.int16)
+        hits = np.all(np.abs(pixels - self.colors) <= self.tolerances, axis=1) & inside
+        
+        matched = bool(hits.all()) if self.mode == self.MODE_ALL else bool(hits.any())
+        return (matched, hits)
+
+
 class ColorRecognizer:
     """统一的颜色识别器"""
     
+    @staticmethod
+    def match_probes(image, probes, mode: str = PixelProbeSet.MODE_ALL,
+                     origin=(0, 0)) -> Tuple[bool, np.ndarray]:
+        """
+        像素探针匹配：只检查若干个点的颜色，而不是扫描整个区域
+        
+        Args:
+            image: RGB 数组、FrameRegion 或 PIL.Image
+            probes: PixelProbeSet，或 [(x, y, (R, G, B), tolerance), ...]（每次调用都会重新编译，
+                    循环中应预先构造 PixelProbeSet）
+            mode: probes 为列表时使用的模式，"all"（AND）或 "any"（OR）
+            origin: 图像左上角对应的坐标
+        
+        Returns:
+            tuple: (matched, hits)，hits 为每个探针的匹配结果
+        """
+        if not isinstance(probes, PixelProbeSet):
+            probes = PixelProbeSet(probes, mode)
+        return probes.evaluate(image, origin)
+    
     @staticmethod
     def match_color(image, target_color: Tuple[int, int, int], tolerance: int = 10,
                     log_func=None, group_index: int = None) -> Tuple[bool, Optional[Tuple[int, int]], int]:
@@ -183,7 +1421,7 @@ class ColorRecognizer:
         颜色匹配识别
         
         Args:
-            image: PIL.Image 截图图像
+            image: PIL.Image 截图图像、FrameRegion 或只读 RGB 视图
             target_color: 目标颜色 (R, G, B)
             tolerance: 颜色容差
             log_func: 日志函数
@@ -199,7 +1437,7 @@ class ColorRecognizer:
             return (False, None, 0)
         
         try:
-            img_array = np.array(image)
+            img_array = np.asarray(image)
             
             valid_target_color = np.clip(np.array(target_color), 0, 255)
             lower_bound = np.maximum(0, valid_target_color - tolerance)
@@ -246,7 +1484,7 @@ class ColorRecognizer:
             if x < 0 or y < 0:
                 return None
             
-            img_array = np.array(image)
+            img_array = np.asarray(image)
             if y >= img_array.shape[0] or x >= img_array.shape[1]:
                 return None
             
@@ -274,10 +1512,9 @@ class NumberRecognizer:
             str: 识别的数字字符串，失败返回None
         """
         try:
-            import pytesseract
-            
             config = f'--psm 7 --oem 3 -c tessedit_char_whitelist={whitelist}'
-            text = pytesseract.image_to_string(image, lang='eng', config=config)
+            text = _ocr_cache.get(image, 'eng', config, "string",
+                                  lambda: get_ocr_engine().image_to_string(image, 'eng', config))
             
             text = text.strip().replace('\n', '').replace('\r', '')
             
@@ -323,3 +1560,79 @@ class NumberRecognizer:
             cache[text.lower()] = number
         
         return number
+
+
+def _synthetic_text_image(width: int, height: int) -> Image.Image:
+    """生成与 _preprocess_image 输出类似的二值文字图像（白底黑字）"""
+    from PIL import ImageDraw
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(2, height - 10, 14):
+        draw.text((2, y), "AutoDoor 12345 " * (width // 90 + 1), fill=0)
+    return image
+
+
+def benchmark_ocr_transport(sizes=((80, 24), (200, 40), (400, 100), (800, 200), (1600, 400)),
+                            rounds: int = 20, lang: str = "eng") -> dict:
+    """
+    对比两种把图像交给 tesseract 的方式的单次耗时
+    
+    - png_file: pytesseract 的方式，PNG 编码写入临时文件，再读回并解码
+    - pnm_stdin: 编码为未压缩 PBM/PGM，直接写入 tesseract 的标准输入
+    
+    只统计传输部分（编码、磁盘、解码）；安装了 tesseract 时还统计完整识别耗时
+    （PytesseractEngine 与 StdinTesseractEngine）。
+    
+    Args:
+        sizes: 区域尺寸列表 (width, height)
+        rounds: 每种尺寸每种方式的次数
+        lang: 完整识别使用的语言
+    
+    Returns:
+        dict: {(width, height): {"png_file_ms", "pnm_stdin_ms", "saved_ms", "png_bytes", "pnm_bytes",
+              以及 "pytesseract_ms"、"stdin_ms"（仅当 tesseract 可用）}}
+    """
+    try:
+        pytesseract.get_tesseract_version()
+        tesseract_available = True
+    except Exception:
+        tesseract_available = False
+    
+    def measure(func):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        return (time.perf_counter() - start) * 1000 / rounds
+    
+    results = {}
+    for width, height in sizes:
+        image = _synthetic_text_image(width, height).point(lambda p: p > 128 and 255)
+        
+        def png_file():
+            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as handle:
+                path = handle.name
+                image.save(handle, format='PNG')
+            try:
+                with Image.open(path) as decoded:
+                    decoded.load()
+            finally:
+                os.remove(path)
+        
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        result = {
+            "png_file_ms": measure(png_file),
+            "pnm_stdin_ms": measure(lambda: encode_pnm(image)),
+            "png_bytes": buffer.tell(),
+            "pnm_bytes": len(encode_pnm(image)),
+        }
+        result["saved_ms"] = result["png_file_ms"] - result["pnm_stdin_ms"]
+        
+        if tesseract_available:
+            pytesseract_engine = PytesseractEngine()
+            stdin_engine = StdinTesseractEngine()
+            result["pytesseract_ms"] = measure(lambda: pytesseract_engine.image_to_data(image, lang))
+            result["stdin_ms"] = measure(lambda: stdin_engine.image_to_data(image, lang))
+        
+        results[(width, height)] = result
+    return results
@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox
-import screeninfo
+from utils.monitor import get_monitor_topology
 
 
 def _start_selection(app, selection_type, region_index):
@@ -36,19 +36,15 @@ def _start_selection(app, selection_type, region_index):
     elif selection_type == "bg_crop":
         app._bg_crop_group_index = region_index
 
-    # 检查screeninfo库是否可用
-    if screeninfo is None:
+    # 获取虚拟屏幕的边界（包含所有显示器）；选择区域前刷新一次显示器拓扑
+    topology = get_monitor_topology()
+    topology.invalidate()
+    bounds = topology.get_virtual_bounds()
+    if bounds is None:
         messagebox.showerror("错误", "screeninfo库未安装，无法支持多显示器选择。请运行 'pip install screeninfo' 安装该库。")
         return
 
-    # 获取虚拟屏幕的尺寸（包含所有显示器）
-    monitors = screeninfo.get_monitors()
-
-    # 计算整个虚拟屏幕的边界
-    app.min_x = min(monitor.x for monitor in monitors)
-    app.min_y = min(monitor.y for monitor in monitors)
-    max_x = max(monitor.x + monitor.width for monitor in monitors)
-    max_y = max(monitor.y + monitor.height for monitor in monitors)
+    app.min_x, app.min_y, max_x, max_y = bounds
 
     # 创建透明的区域选择窗口，覆盖整个虚拟屏幕
     app.select_window = tk.Toplevel(app.root)
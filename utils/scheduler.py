@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+
+
+class DeadlineScheduler:
+    """
+    基于截止时间堆的调度器
+
+    每个 key（如识别组索引）有一个下次到期时间（time.monotonic() 时间，亚秒精度），
+    wait_next() 一直睡眠到最早的截止时间并返回该 key；提前到期的新任务或 stop()
+    会立即唤醒等待线程。重新调度同一个 key 时旧的堆项被惰性丢弃。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: 单调时钟函数，测试时可注入
+        """
+        self.clock = clock
+        self._heap = []  # (到期时间, 序号, key)
+        self._deadlines = {}  # key -> 当前有效的到期时间
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    def schedule(self, key, deadline: float) -> None:
+        """
+        设置 key 的到期时间（覆盖之前的设置）
+
+        Args:
+            key: 任务标识
+            deadline: 到期时间（clock() 时间）
+        """
+        with self._condition:
+            self._deadlines[key] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._counter), key))
+            self._condition.notify_all()
+
+    def schedule_in(self, key, delay: float) -> None:
+        """在 delay 秒后到期"""
+        self.schedule(key, self.clock() + max(0.0, delay))
+
+    def remove(self, key) -> None:
+        """取消 key 的调度"""
+        with self._condition:
+            self._deadlines.pop(key, None)
+
+    def deadline(self, key) -> Optional[float]:
+        """key 当前的到期时间，未调度返回 None"""
+        with self._condition:
+            return self._deadlines.get(key)
+
+    def wait_next(self, timeout: Optional[float] = None):
+        """
+        等待并取出最早到期的 key（取出后需重新 schedule 才会再次到期）
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            (key, deadline)：到期的 key 及其计划到期时间；已停止或超时返回 None
+        """
+        give_up = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            while not self._stopped:
+                # 丢弃已被重新调度或取消的旧堆项
+                while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+
+                now = self.clock()
+                if self._heap and self._heap[0][0] <= now:
+                    deadline, _, key = heapq.heappop(self._heap)
+                    del self._deadlines[key]
+                    return key, deadline
+
+                wait = self._heap[0][0] - now if self._heap else None
+                if give_up is not None:
+                    if now >= give_up:
+                        return None
+                    wait = give_up - now if wait is None else min(wait, give_up - now)
+                self._condition.wait(wait)
+        return None
+
+    def sleep(self, seconds: float) -> bool:
+        """
+        睡眠指定时间，stop() 时立即返回
+
+        Returns:
+            bool: 是否已停止
+        """
+        end = self.clock() + seconds
+        with self._condition:
+            while not self._stopped:
+                remaining = end - self.clock()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return self._stopped
+
+    def stop(self) -> None:
+        """停止调度，立即唤醒所有等待线程"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def clear(self) -> None:
+        with self._condition:
+            self._heap.clear()
+            self._deadlines.clear()
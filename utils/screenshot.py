@@ -1,35 +1,110 @@
 import threading
 import time
-from PIL import ImageGrab
 from core.priority_lock import PriorityLock
+from utils.frame import to_image
+from utils.frame_history import FrameHistory
+from utils.capture import CaptureBackend, create_capture_backend
+from utils.monitor import get_monitor_topology
 
-try:
-    import screeninfo
-    SCREENINFO_AVAILABLE = True
-except ImportError:
-    SCREENINFO_AVAILABLE = False
 
 
 def get_virtual_screen_offset():
     """
-    获取虚拟屏幕的偏移量
+    获取虚拟屏幕的偏移量（使用缓存的显示器拓扑，不会每次枚举显示器）
     
     Returns:
         tuple: (min_x, min_y) 虚拟屏幕左上角相对于主显示器的偏移
     """
-    if not SCREENINFO_AVAILABLE:
-        return (0, 0)
+    return get_monitor_topology().get_virtual_offset()
+
+
+MAX_CAPTURE_BOXES = 4
+CAPTURE_BOX_MERGE_RATIO = 1.5
+
+
+def normalize_region(region):
+    """
+    规范化区域坐标
     
+    Args:
+        region: 区域坐标 (x1, y1, x2, y2)，两个角点顺序任意
+    
+    Returns:
+        tuple: (left, top, right, bottom) 整数坐标，无效区域返回 None
+    """
     try:
-        monitors = screeninfo.get_monitors()
-        if not monitors:
-            return (0, 0)
+        x1, y1, x2, y2 = region
+        left, right = sorted((int(x1), int(x2)))
+        top, bottom = sorted((int(y1), int(y2)))
+    except (TypeError, ValueError):
+        return None
+    
+    if right <= left or bottom <= top:
+        return None
+    return (left, top, right, bottom)
+
+
+def _box_area(box):
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def _box_union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _box_intersects(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _box_contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            outer[2] >= inner[2] and outer[3] >= inner[3])
+
+
+def compute_capture_boxes(regions, max_boxes: int = MAX_CAPTURE_BOXES,
+                          merge_ratio: float = CAPTURE_BOX_MERGE_RATIO):
+    """
+    计算覆盖所有区域的截图框集合
+    
+    贪心合并：每次合并"并集面积 / 两框面积之和"最小的一对框。
+    相交的框总是合并；比值不超过 merge_ratio 时合并（浪费像素可接受）；
+    框数量超过 max_boxes 时强制合并。每个输入区域都会完整落在某一个框内。
+    
+    Args:
+        regions: 区域坐标列表（屏幕绝对坐标）
+        max_boxes: 最多保留的框数量
+        merge_ratio: 允许合并的最大面积比
+    
+    Returns:
+        list: [(left, top, right, bottom), ...]
+    """
+    boxes = []
+    for region in regions:
+        box = normalize_region(region)
+        if box and not any(_box_contains(existing, box) for existing in boxes):
+            boxes = [existing for existing in boxes if not _box_contains(box, existing)]
+            boxes.append(box)
+    
+    while len(boxes) > 1:
+        best = None
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                union = _box_union(boxes[i], boxes[j])
+                ratio = _box_area(union) / (_box_area(boxes[i]) + _box_area(boxes[j]))
+                if _box_intersects(boxes[i], boxes[j]):
+                    ratio = 0
+                if best is None or ratio < best[0]:
+                    best = (ratio, i, j, union)
+        
+        ratio, i, j, union = best
+        if ratio > merge_ratio and len(boxes) <= max_boxes:
+            break
         
-        min_x = min(monitor.x for monitor in monitors)
-        min_y = min(monitor.y for monitor in monitors)
-        return (min_x, min_y)
-    except Exception:
-        return (0, 0)
+        boxes = [box for k, box in enumerate(boxes) if k not in (i, j)]
+        boxes = [box for box in boxes if not _box_contains(union, box)]
+        boxes.append(union)
+    
+    return sorted(boxes)
 
 
 class ScreenshotManager:
@@ -38,11 +113,34 @@ class ScreenshotManager:
     
     使用优先级锁确保高优先级模块优先获取截图资源。
     优先级顺序：Number(5) > Timed(4) > OCR(3) > Color(2) > Script(1)
+    
+    登记了监控区域后，只截取覆盖这些区域的最小框集合（而不是整个虚拟桌面），
+    区域截图从所在的框中裁剪。框集合只在登记的区域变化时重新计算。
+    
+    截图以不可变 Frame（只读 NumPy 数组）保存，get_region_view(s) 直接返回只读视图，
+    只有 get_*_screenshot 才会生成 PIL 图像副本。
+    
+    像素来源由可替换的截图后端（utils.capture.CaptureBackend）提供，默认为 PIL.ImageGrab，
+    可通过环境变量 AUTODOOR_CAPTURE_BACKEND 或 set_capture_backend() 切换为回放/合成数据源。
+    
+    读写分离：缓存命中只读取一次引用，不经过优先级锁；只有真正需要重新截图的线程
+    才竞争优先级锁，其他同时需要同一帧的线程等待这次截图完成而不是各自再截一次。
+    
+    每帧带有 frame_id、单调时钟时间戳和截图耗时。调用方可以通过 max_age 指定
+    可接受的最大帧龄（秒），只有缓存帧超过该调用方的上限时才重新截图；
+    不指定时使用全局 cache_duration。
+    
+    启用帧历史（enable_history）后，每次截图都会把登记的监控区域记入有内存预算的
+    环形缓冲（utils.frame_history.FrameHistory），可按帧编号或时间回看触发前的画面。
     """
     
     _instance = None
     _lock = threading.Lock()
     
+    FULL_FRAME_KEY = "full"
+    INFLIGHT_WAIT_TIMEOUT = 2.0
+    HISTORY_DUMP_SECONDS = 3.0  # 触发时保存的历史时长（秒）
+    
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             with cls._lock:
@@ -55,73 +153,761 @@ class ScreenshotManager:
             return
         
         self._initialized = True
-        self.last_full_screenshot = None
-        self.last_time = 0
         self.cache_duration = cache_duration
         self.screenshot_lock = PriorityLock()
+        self.capture_backend = create_capture_backend()
+        
+        self._capture_regions = {}
+        self._capture_boxes = []
+        self._regions_lock = threading.Lock()
+        
+        self._frame_cache = {}
+        self._inflight = {}
+        self._cache_lock = threading.Lock()
+        
+        self._stats = {"hits": 0, "misses": 0, "waits": 0}
+        self._wait_stats = {}
+        
+        self.history = None
+    
+    def register_capture_region(self, key, region) -> None:
+        """
+        登记监控区域，截图时只截取覆盖所有登记区域的框
+        
+        Args:
+            key: 区域所有者标识，如 ("ocr", 0)
+            region: 区域坐标 (x1, y1, x2, y2) - 屏幕绝对坐标
+        """
+        box = normalize_region(region) if region else None
+        with self._regions_lock:
+            if box is None:
+                changed = self._capture_regions.pop(key, None) is not None
+            else:
+                changed = self._capture_regions.get(key) != box
+                self._capture_regions[key] = box
+            if changed:
+                self._recompute_capture_boxes()
+    
+    def unregister_capture_region(self, key) -> None:
+        """取消登记监控区域"""
+        self.register_capture_region(key, None)
+    
+    def unregister_capture_regions(self, owner) -> None:
+        """
+        取消登记某个模块的所有监控区域
+        
+        Args:
+            owner: 模块名，匹配 key 为 (owner, ...) 的所有区域
+        """
+        with self._regions_lock:
+            keys = [key for key in self._capture_regions
+                    if isinstance(key, tuple) and key and key[0] == owner]
+            for key in keys:
+                del self._capture_regions[key]
+            if keys:
+                self._recompute_capture_boxes()
+    
+    def get_capture_boxes(self) -> list:
+        """获取当前截图框集合"""
+        return list(self._capture_boxes)
+    
+    def _recompute_capture_boxes(self) -> None:
+        """重新计算截图框（调用方需持有 _regions_lock）"""
+        self._capture_boxes = compute_capture_boxes(self._capture_regions.values())
+        if self.history is not None:
+            self.history.retain(self._capture_regions.values())
+        with self._cache_lock:
+            full = self._frame_cache.get(self.FULL_FRAME_KEY)
+            self._frame_cache = {self.FULL_FRAME_KEY: full} if full is not None else {}
+    
+    def _find_capture_box(self, box):
+        for capture_box in self._capture_boxes:
+            if _box_contains(capture_box, box):
+                return capture_box
+        return None
+    
+    def enable_history(self, budget_mb: float = None) -> FrameHistory:
+        """
+        启用帧历史
+        
+        Args:
+            budget_mb: 内存预算（MB），None 表示使用默认预算；已启用时只修改预算
+        
+        Returns:
+            FrameHistory: 帧历史对象
+        """
+        if self.history is None:
+            self.history = FrameHistory() if budget_mb is None else FrameHistory(budget_mb)
+        elif budget_mb is not None:
+            self.history.set_budget(budget_mb)
+        return self.history
+    
+    def disable_history(self) -> None:
+        """停用并释放帧历史"""
+        history = self.history
+        self.history = None
+        if history is not None:
+            history.clear()
+    
+    def dump_history(self, directory, region=None, seconds: float = HISTORY_DUMP_SECONDS) -> int:
+        """
+        把最近 seconds 秒内的历史帧保存为 PNG（未启用帧历史时不保存）
+        
+        Args:
+            directory: 输出目录
+            region: 只保存该区域，None 表示所有监控区域
+            seconds: 回看的时长（秒）
+        
+        Returns:
+            int: 保存的图像数量
+        """
+        history = self.history
+        if history is None:
+            return 0
+        box = normalize_region(region) if region else None
+        return history.dump(directory, box, since=time.monotonic() - seconds)
+    
+    def _record_history(self, frame) -> None:
+        history = self.history
+        if history is None:
+            return
+        
+        with self._regions_lock:
+            regions = set(self._capture_regions.values())
+        try:
+            history.record(frame, regions)
+        except Exception:
+            pass
+    
+    def set_capture_backend(self, backend: CaptureBackend) -> None:
+        """
+        切换截图后端并清除缓存
+        
+        Args:
+            backend: 截图后端实例
+        """
+        old_backend = self.capture_backend
+        self.capture_backend = backend
+        self.clear_cache()
+        if old_backend is not backend:
+            old_backend.close()
+    
+    def _grab(self, key):
+        """实际截图：key 为截图框或 FULL_FRAME_KEY，并为帧填写元数据"""
+        start = time.monotonic()
+        frame = self.capture_backend.grab(None if key == self.FULL_FRAME_KEY else key)
+        if frame is not None:
+            frame.timestamp = time.monotonic()
+            frame.capture_duration = frame.timestamp - start
+        return frame
+    
+    def _get_frame(self, key, priority: int = 0, max_age: float = None):
+        """
+        获取缓存帧，必要时刷新
+        
+        帧龄不超过 max_age 的缓存直接返回（只持有极短的缓存锁）；超过时第一个线程负责截图，
+        其他线程等待这次截图完成。
+        """
+        if max_age is None:
+            max_age = self.cache_duration
+        
+        with self._cache_lock:
+            cached = self._frame_cache.get(key)
+            if cached is not None and cached.age < max_age:
+                self._stats["hits"] += 1
+                return cached
+            
+            inflight = self._inflight.get(key)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = threading.Event()
+                self._inflight[key] = inflight
+                self._stats["misses"] += 1
+            else:
+                self._stats["waits"] += 1
+        
+        if not is_owner:
+            wait_start = time.perf_counter()
+            inflight.wait(self.INFLIGHT_WAIT_TIMEOUT)
+            self._record_wait(priority, time.perf_counter() - wait_start)
+            with self._cache_lock:
+                return self._frame_cache.get(key)
+        
+        try:
+            with self.screenshot_lock.acquire(priority):
+                try:
+                    frame = self._grab(key)
+                except Exception:
+                    frame = None
+            
+            if frame is not None:
+                frame.build_tile_map(previous=cached)
+                with self._cache_lock:
+                    self._frame_cache[key] = frame
+                self._record_history(frame)
+            return frame
+        finally:
+            with self._cache_lock:
+                self._inflight.pop(key, None)
+            inflight.set()
+    
+    def _record_wait(self, priority, wait_time) -> None:
+        with self._cache_lock:
+            stats = self._wait_stats.setdefault(priority, {"count": 0, "total": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["total"] += wait_time
+            stats["max"] = max(stats["max"], wait_time)
+    
+    def get_cache_stats(self) -> dict:
+        """
+        获取缓存统计信息
+        
+        Returns:
+            dict: hits（缓存命中）、misses（实际截图）、waits（等待进行中的截图），
+                  wait_time_by_priority 为每个优先级的等待次数、总/平均/最大等待时间（秒）
+        """
+        with self._cache_lock:
+            wait_stats = {
+                priority: {
+                    "count": stats["count"],
+                    "total": stats["total"],
+                    "avg": stats["total"] / stats["count"] if stats["count"] else 0.0,
+                    "max": stats["max"],
+                }
+                for priority, stats in self._wait_stats.items()
+            }
+            return dict(self._stats, wait_time_by_priority=wait_stats)
+    
+    def format_cache_stats(self) -> str:
+        """生成用于日志的统计摘要"""
+        stats = self.get_cache_stats()
+        total = stats["hits"] + stats["misses"] + stats["waits"]
+        hit_rate = (stats["hits"] + stats["waits"]) / total if total else 0.0
+        waits = ", ".join(
+            f"优先级{priority} 平均 {wait['avg'] * 1000:.1f}ms 最大 {wait['max'] * 1000:.1f}ms"
+            for priority, wait in sorted(stats["wait_time_by_priority"].items())
+        )
+        return (f"截图缓存复用率: {hit_rate:.1%} (命中 {stats['hits']}, 等待 {stats['waits']}, "
+                f"截图 {stats['misses']})" + (f"; 等待耗时: {waits}" if waits else ""))
+    
+    def reset_cache_stats(self) -> None:
+        """重置缓存统计信息"""
+        with self._cache_lock:
+            self._stats = {"hits": 0, "misses": 0, "waits": 0}
+            self._wait_stats = {}
+    
+    def get_full_frame(self, priority: int = 0, max_age: float = None):
+        """
+        获取全屏帧（带缓存和优先级）
+        
+        Args:
+            priority: 优先级，数值越大优先级越高
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
+        
+        Returns:
+            Frame: 不可变截图帧，失败返回 None
+        """
+        return self._get_frame(self.FULL_FRAME_KEY, priority, max_age)
     
-    def get_full_screenshot(self, priority: int = 0):
+    def get_full_screenshot(self, priority: int = 0, max_age: float = None):
         """
         获取全屏截图（带缓存和优先级）
         
         Args:
             priority: 优先级，数值越大优先级越高
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
         
         Returns:
             PIL.Image: 截图副本，失败返回 None
         """
-        with self.screenshot_lock.acquire(priority):
-            current_time = time.time()
-            
-            if (self.last_full_screenshot is not None and 
-                current_time - self.last_time < self.cache_duration):
-                return self.last_full_screenshot.copy()
-            
-            try:
-                self.last_full_screenshot = ImageGrab.grab(all_screens=True)
-                self.last_time = current_time
-                return self.last_full_screenshot.copy()
-            except Exception:
-                return None
+        frame = self.get_full_frame(priority, max_age)
+        if frame is None:
+            return None
+        return frame.to_image()
     
-    def get_region_screenshot(self, region, priority: int = 0):
+    def get_region_view(self, region, priority: int = 0, max_age: float = None):
         """
-        获取区域截图（带缓存和优先级）
+        获取区域只读视图（带缓存和优先级，不复制像素）
         
         Args:
             region: 区域坐标 (x1, y1, x2, y2) - 屏幕绝对坐标
             priority: 优先级
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
         
         Returns:
-            PIL.Image: 区域截图，失败返回 None
+            numpy.ndarray: 只读 RGB 视图，失败返回 None
         """
         if not region:
             return None
         
-        full_screenshot = self.get_full_screenshot(priority)
-        if full_screenshot is None:
+        return self.get_region_views([region], priority, max_age)[0]
+    
+    def get_region_views(self, regions, priority: int = 0, max_age: float = None):
+        """
+        获取多个区域的只读视图（每个截图框最多取一次帧）
+        
+        Args:
+            regions: 区域坐标列表 [(x1, y1, x2, y2), ...] - 屏幕绝对坐标
+            priority: 优先级
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
+        
+        Returns:
+            list: 与 regions 一一对应的只读 RGB 视图，失败的区域为 None
+        """
+        results = []
+        for region, frame in zip(regions, self.get_region_frames(regions, priority, max_age)):
+            results.append(frame.view(normalize_region(region)) if frame is not None else None)
+        return results
+    
+    def get_region_frame(self, region, priority: int = 0, max_age: float = None):
+        """
+        获取包含区域的帧（带缓存和优先级）
+        
+        调用方通过 frame.view(region) 读取像素，通过 frame.changed(region) /
+        frame.region_signature(region) 判断区域是否变化，通过 frame.age 获取帧龄。
+        
+        Args:
+            region: 区域坐标 (x1, y1, x2, y2) - 屏幕绝对坐标
+            priority: 优先级
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
+        
+        Returns:
+            Frame: 包含该区域的帧，失败返回 None
+        """
+        if not region:
             return None
         
-        try:
-            x1, y1, x2, y2 = region
-            
-            offset_x, offset_y = get_virtual_screen_offset()
+        return self.get_region_frames([region], priority, max_age)[0]
+    
+    def get_region_frames(self, regions, priority: int = 0, max_age: float = None):
+        """
+        获取包含各区域的帧（每个截图框最多取一次帧）
+        
+        Args:
+            regions: 区域坐标列表 [(x1, y1, x2, y2), ...] - 屏幕绝对坐标
+            priority: 优先级
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
+        
+        Returns:
+            list: 与 regions 一一对应的 Frame，失败或区域无效为 None
+        """
+        if not regions:
+            return []
+        
+        results = [None] * len(regions)
+        frames = {}
+        
+        for index, region in enumerate(regions):
+            box = normalize_region(region) if region else None
+            if box is None:
+                continue
             
-            left = min(x1, x2) - offset_x
-            top = min(y1, y2) - offset_y
-            right = max(x1, x2) - offset_x
-            bottom = max(y1, y2) - offset_y
+            key = self._find_capture_box(box) or self.FULL_FRAME_KEY
+            if key not in frames:
+                frames[key] = self._get_frame(key, priority, max_age)
             
-            return full_screenshot.crop((left, top, right, bottom))
-        except Exception:
+            frame = frames[key]
+            if frame is not None and frame.view(box) is not None:
+                results[index] = frame
+        
+        return results
+    
+    def probe_pixels(self, probe_set, priority: int = 0, max_age: float = None):
+        """
+        对当前帧执行像素探针（一次向量化取值，不裁剪、不转换）
+        
+        Args:
+            probe_set: utils.recognition.PixelProbeSet，探针坐标为屏幕绝对坐标
+            priority: 优先级
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
+        
+        Returns:
+            tuple: (matched, hits)，截图失败返回 (False, None)
+        """
+        frame = self.get_region_frame(probe_set.bbox, priority, max_age)
+        if frame is None:
+            return (False, None)
+        return probe_set.evaluate(frame.array, frame.origin)
+    
+    def get_region_screenshot(self, region, priority: int = 0, max_age: float = None):
+        """
+        获取区域截图（带缓存和优先级）
+        
+        Args:
+            region: 区域坐标 (x1, y1, x2, y2) - 屏幕绝对坐标
+            priority: 优先级
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
+        
+        Returns:
+            PIL.Image: 区域截图，失败返回 None
+        """
+        if not region:
             return None
+        
+        return self.get_region_screenshots([region], priority, max_age)[0]
+    
+    def get_region_screenshots(self, regions, priority: int = 0, max_age: float = None):
+        """
+        获取多个区域截图（每个截图框最多取一次帧）
+        
+        Args:
+            regions: 区域坐标列表 [(x1, y1, x2, y2), ...] - 屏幕绝对坐标
+            priority: 优先级
+            max_age: 可接受的最大帧龄（秒），None 表示使用 cache_duration
+        
+        Returns:
+            list: 与 regions 一一对应的 PIL.Image，失败的区域为 None
+        """
+        return [to_image(view) for view in self.get_region_views(regions, priority, max_age)]
     
     def clear_cache(self):
         """清除缓存"""
-        with self.screenshot_lock.acquire(10):
-            self.last_full_screenshot = None
-            self.last_time = 0
+        with self._cache_lock:
+            self._frame_cache = {}
     
     def set_cache_duration(self, duration):
         """设置缓存持续时间"""
         self.cache_duration = duration
+
+
+class FrameSubscription:
+    """
+    帧总线订阅
+    
+    每个订阅只保留最新一帧：消费者处理过慢时旧帧会被覆盖（计入 dropped），
+    保证消费者拿到的永远是最新画面。
+    
+    get()/frames()/回调得到的是区域对象 FrameRegion（可当作只读 RGB 数组使用，
+    灰度/BGR/HSV 等派生表示在同一帧的消费者间共享）；对应的完整帧记录在 last_frame，
+    可用 last_frame.changed(region, since=...) 判断区域是否变化，last_frame.age 为帧龄。
+    max_age 限定投递帧的最大帧龄，总线按到期订阅中最严格的上限取帧。
+    
+    按需订阅（on_demand）不按间隔投递，只在调用 request()/fetch() 后的下一个 tick 投递一次，
+    适合自己决定识别时机的消费者（如 OCR 识别组）。
+    """
+    
+    def __init__(self, bus, region, callback=None, interval: float = 0.0,
+                 priority: int = 0, name: str = None, max_age: float = None,
+                 on_demand: bool = False):
+        self.bus = bus
+        self.region = region
+        self.callback = callback
+        self.interval = max(0.0, float(interval))
+        self.priority = priority
+        self.max_age = max_age
+        self.name = name or str(region)
+        self.on_demand = on_demand
+        self.closed = False
+        self._requested = False
+        
+        self._condition = threading.Condition()
+        self._pending = None
+        self._pending_time = 0
+        self.last_frame = None
+        self._last_delivery = time.monotonic()
+        
+        self.delivered = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_frame_age = 0.0
+    
+    def is_due(self, current_time) -> bool:
+        """是否到了向该订阅投递的时间"""
+        if self.closed:
+            return False
+        if self._requested:
+            return True
+        return not self.on_demand and current_time - self._last_delivery >= self.interval
+    
+    def request(self) -> None:
+        """请求在下一个 tick 投递一帧（立即唤醒采集线程）"""
+        self._requested = True
+        self.bus.wake()
+    
+    def fetch(self, timeout: float = None):
+        """
+        请求并等待一帧（按需订阅使用）
+        
+        Args:
+            timeout: 超时时间（秒），None 表示无限等待
+        
+        Returns:
+            FrameRegion: 区域对象，超时、截图失败或订阅已关闭返回 None
+        """
+        with self._condition:
+            # 丢弃请求之前的旧帧，保证拿到的是请求之后截取的画面
+            self._pending = None
+        self.request()
+        return self.get(timeout)
+    
+    def _deliver(self, frame, capture_time) -> None:
+        """由生产者线程调用，投递一帧"""
+        self._last_delivery = capture_time
+        self._requested = False
+        
+        if self.callback is not None:
+            self.last_frame = frame
+            try:
+                self.callback(frame.region(normalize_region(self.region)))
+            except Exception:
+                pass
+            self._record_lag(time.monotonic() - capture_time)
+            return
+        
+        with self._condition:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = frame
+            self._pending_time = capture_time
+            self._condition.notify_all()
+    
+    def _record_lag(self, lag) -> None:
+        self.delivered += 1
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if self.last_frame is not None:
+            self.last_frame_age = self.last_frame.age
+    
+    def get(self, timeout: float = None):
+        """
+        获取最新一帧
+        
+        Args:
+            timeout: 超时时间（秒），None 表示无限等待
+        
+        Returns:
+            FrameRegion: 区域对象，超时、截图失败或订阅已关闭返回 None
+        """
+        with self._condition:
+            if self._pending is None and not self.closed:
+                self._condition.wait(timeout)
+            
+            frame = self._pending
+            if frame is None:
+                return None
+            
+            self._pending = None
+            self.last_frame = frame
+            self._record_lag(time.monotonic() - self._pending_time)
+            return frame.region(normalize_region(self.region))
+    
+    def frames(self, stop_event: threading.Event = None, poll_interval: float = 0.5):
+        """
+        帧迭代器，直到订阅关闭或 stop_event 被设置
+        
+        Args:
+            stop_event: 停止事件（可选）
+            poll_interval: 检查停止条件的间隔（秒）
+        """
+        while not self.closed and not (stop_event and stop_event.is_set()):
+            image = self.get(timeout=poll_interval)
+            if image is not None:
+                yield image
+    
+    def close(self) -> None:
+        """取消订阅"""
+        if self.closed:
+            return
+        self.closed = True
+        with self._condition:
+            self._pending = None
+            self._condition.notify_all()
+        self.bus.unsubscribe(self)
+    
+    def get_stats(self) -> dict:
+        """获取订阅统计信息"""
+        return {
+            "name": self.name,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "last_frame_age": self.last_frame_age,
+        }
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class FrameBus:
+    """
+    共享帧总线
+    
+    单个采集线程按固定帧率截图，并把各订阅区域的裁剪结果分发给所有订阅者，
+    代替各模块各自轮询 ScreenshotManager。每个 tick 最多一次截图、一次锁竞争。
+    有订阅时自动启动采集线程，最后一个订阅取消时自动停止。
+    投递间隔、延迟和实测帧率都按 time.monotonic() 计算（与 Frame.timestamp 相同），
+    系统时间被调整时不会停止投递或提前投递。
+    """
+    
+    _instance = None
+    _lock = threading.Lock()
+    
+    DEFAULT_FRAME_RATE = 10
+    
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+        return cls._instance
+    
+    def __init__(self, frame_rate: float = DEFAULT_FRAME_RATE):
+        if hasattr(self, '_initialized') and self._initialized:
+            return
+        
+        self._initialized = True
+        self.frame_rate = frame_rate
+        self.screenshot_manager = ScreenshotManager()
+        
+        self._subscriptions = []
+        self._subscriptions_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+        
+        self.frame_count = 0
+        self._rate_window_start = 0
+        self._rate_window_frames = 0
+        self.measured_frame_rate = 0.0
+        self._closed_stats = []  # 已取消订阅的统计（保留到 reset_stats）
+    
+    def subscribe(self, region, callback=None, interval: float = 0.0,
+                  priority: int = 0, name: str = None, max_age: float = None,
+                  on_demand: bool = False) -> FrameSubscription:
+        """
+        订阅区域帧
+        
+        Args:
+            region: 区域坐标 (x1, y1, x2, y2) - 屏幕绝对坐标
+            callback: 回调函数 callback(region)，参数为区域对象 FrameRegion，在采集线程中调用，应尽量轻量；
+                      为 None 时通过 FrameSubscription.get()/frames() 拉取
+            interval: 最小投递间隔（秒），0 表示每个 tick 都投递
+            priority: 截图优先级
+            name: 订阅名称（用于统计）
+            max_age: 投递帧可接受的最大帧龄（秒），None 表示使用截图管理器的 cache_duration
+            on_demand: 按需订阅，只在 request()/fetch() 后投递
+        
+        Returns:
+            FrameSubscription: 订阅对象，不再需要时调用 close()
+        """
+        subscription = FrameSubscription(self, region, callback, interval, priority, name, max_age, on_demand)
+        self.screenshot_manager.register_capture_region(("bus", id(subscription)), region)
+        with self._subscriptions_lock:
+            self._subscriptions.append(subscription)
+            self._ensure_running()
+        return subscription
+    
+    def unsubscribe(self, subscription: FrameSubscription) -> None:
+        """取消订阅"""
+        self.screenshot_manager.unregister_capture_region(("bus", id(subscription)))
+        with self._subscriptions_lock:
+            try:
+                self._subscriptions.remove(subscription)
+            except ValueError:
+                pass
+            else:
+                if subscription.delivered or subscription.dropped:
+                    self._closed_stats.append(subscription.get_stats())
+            if not self._subscriptions:
+                self._stop_event.set()
+                self._wake_event.set()
+    
+    def wake(self) -> None:
+        """唤醒采集线程，立即执行一次 tick（处理按需订阅的请求）"""
+        self._wake_event.set()
+    
+    def set_frame_rate(self, frame_rate: float) -> None:
+        """设置采集帧率"""
+        self.frame_rate = max(0.1, float(frame_rate))
+    
+    def _ensure_running(self) -> None:
+        if self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set():
+            return
+        
+        # 旧线程（如果仍在退出中）持有自己的 stop_event，不影响新线程
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._capture_loop, args=(self._stop_event,), daemon=True)
+        self._thread.start()
+    
+    def _capture_loop(self, stop_event: threading.Event) -> None:
+        """采集线程主循环"""
+        self._rate_window_start = time.monotonic()
+        self._rate_window_frames = 0
+        
+        while not stop_event.is_set():
+            tick_start = time.monotonic()
+            # tick 期间到达的请求会让下一次等待立即返回
+            self._wake_event.clear()
+            
+            try:
+                self._tick(tick_start)
+            except Exception:
+                pass
+            
+            elapsed = time.monotonic() - tick_start
+            self._wake_event.wait(max(0.0, 1.0 / self.frame_rate - elapsed))
+    
+    def _tick(self, current_time) -> None:
+        with self._subscriptions_lock:
+            due = [sub for sub in self._subscriptions if sub.is_due(current_time)]
+        
+        if not due:
+            return
+        
+        priority = max(sub.priority for sub in due)
+        max_ages = [sub.max_age for sub in due if sub.max_age is not None]
+        max_age = min(max_ages) if max_ages else None
+        frames = self.screenshot_manager.get_region_frames([sub.region for sub in due], priority, max_age)
+        
+        self.frame_count += 1
+        self._rate_window_frames += 1
+        window = current_time - self._rate_window_start
+        if window >= 1.0:
+            self.measured_frame_rate = self._rate_window_frames / window
+            self._rate_window_start = current_time
+            self._rate_window_frames = 0
+        
+        for sub, frame in zip(due, frames):
+            if frame is not None:
+                sub._deliver(frame, current_time)
+    
+    def get_stats(self) -> dict:
+        """
+        获取总线统计信息
+        
+        Returns:
+            dict: 目标帧率、实测帧率、总帧数及每个订阅者（含 reset_stats 之后已取消的订阅）的投递/丢帧/延迟统计
+        """
+        with self._subscriptions_lock:
+            subscriptions = list(self._subscriptions)
+            closed_stats = list(self._closed_stats)
+        
+        return {
+            "frame_rate": self.frame_rate,
+            "measured_frame_rate": self.measured_frame_rate,
+            "frame_count": self.frame_count,
+            "subscribers": closed_stats + [sub.get_stats() for sub in subscriptions],
+        }
+    
+    def reset_stats(self) -> None:
+        """重置总帧数并丢弃已取消订阅的统计"""
+        with self._subscriptions_lock:
+            self.frame_count = 0
+            self._closed_stats = []
+    
+    def format_stats(self) -> str:
+        """生成用于日志的统计摘要"""
+        stats = self.get_stats()
+        subscribers = "; ".join(
+            f"{sub['name']} 投递 {sub['delivered']} 丢帧 {sub['dropped']} 最大延迟 {sub['max_lag'] * 1000:.0f}ms"
+            for sub in stats["subscribers"]
+        )
+        return (f"帧总线: 目标 {stats['frame_rate']:g}fps, 实测 {stats['measured_frame_rate']:.1f}fps, "
+                f"共 {stats['frame_count']} 帧" + (f" ({subscribers})" if subscribers else ""))
@@ -0,0 +1,375 @@
+import multiprocessing
+import pickle
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+
+DEFAULT_SLOT_COUNT = 4
+DEFAULT_SLOT_BYTES = 3840 * 2160 * 3
+
+HEADER_DTYPE = np.dtype([
+    ('frame_id', np.int64),
+    ('timestamp', np.float64),
+    ('height', np.int32),
+    ('width', np.int32),
+    ('channels', np.int32),
+    ('origin_x', np.int32),
+    ('origin_y', np.int32),
+    ('refcount', np.int32),
+])
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    附加到已有的共享内存段
+
+    共享内存的生命周期只由创建方（SharedFrameStore）管理：Python 3.13 起附加方不登记到
+    resource_tracker；更早的版本中工作进程由创建方启动，共用同一个 resource_tracker，
+    重复登记不会导致共享内存被提前删除。
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameHandle:
+    """
+    共享帧存储的可序列化描述，传给工作进程后用 SharedFrameReader(handle) 附加
+
+    只能在创建进程时作为参数传递（其中的锁不支持在已运行的进程间 pickle）。
+    """
+
+    def __init__(self, header_name: str, slot_names: list, slot_bytes: int, lock):
+        self.header_name = header_name
+        self.slot_names = slot_names
+        self.slot_bytes = slot_bytes
+        self.lock = lock
+
+
+class SharedFrameRef:
+    """指向某个槽位中某一帧的轻量引用（可 pickle，通过管道/队列发送给工作进程）"""
+
+    __slots__ = ['slot', 'frame_id']
+
+    def __init__(self, slot: int, frame_id: int):
+        self.slot = slot
+        self.frame_id = frame_id
+
+    def __getstate__(self):
+        return (self.slot, self.frame_id)
+
+    def __setstate__(self, state):
+        self.slot, self.frame_id = state
+
+    def __repr__(self):
+        return f"SharedFrameRef(slot={self.slot}, frame_id={self.frame_id})"
+
+
+class SharedFrameView:
+    """
+    工作进程读取到的共享帧（只读 NumPy 视图，不复制像素）
+
+    使用完毕后调用 release()（或使用 with 语句），槽位引用计数归零后才会被重新写入。
+    """
+
+    def __init__(self, reader, slot: int, array: np.ndarray, frame_id: int,
+                 timestamp: float, origin: tuple):
+        self._reader = reader
+        self.slot = slot
+        self.array = array
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.origin = origin
+        self.released = False
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+    def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.array = None
+        self._reader._release(self.slot)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+
+class SharedFrameReader:
+    """工作进程侧：附加到共享帧存储并按引用读取帧"""
+
+    def __init__(self, handle: SharedFrameHandle):
+        self._lock = handle.lock
+        self._header_shm = _attach_shared_memory(handle.header_name)
+        self._headers = np.ndarray((len(handle.slot_names),), dtype=HEADER_DTYPE,
+                                   buffer=self._header_shm.buf)
+        self._slots = [_attach_shared_memory(name) for name in handle.slot_names]
+
+    def get(self, ref: SharedFrameRef) -> Optional[SharedFrameView]:
+        """
+        读取引用指向的帧
+
+        Args:
+            ref: 生产者发送的 SharedFrameRef
+
+        Returns:
+            SharedFrameView: 只读视图，槽位已被回收（帧编号不匹配）时返回 None
+        """
+        with self._lock:
+            header = self._headers[ref.slot]
+            if int(header['frame_id']) != ref.frame_id or header['refcount'] <= 0:
+                return None
+            header['refcount'] += 1
+            shape = (int(header['height']), int(header['width']), int(header['channels']))
+            timestamp = float(header['timestamp'])
+            origin = (int(header['origin_x']), int(header['origin_y']))
+
+        array = np.ndarray(shape, dtype=np.uint8, buffer=self._slots[ref.slot].buf)
+        array.setflags(write=False)
+        return SharedFrameView(self, ref.slot, array, ref.frame_id, timestamp, origin)
+
+    def _release(self, slot: int) -> None:
+        with self._lock:
+            self._headers[slot]['refcount'] -= 1
+
+    def close(self) -> None:
+        """断开共享内存（所有 SharedFrameView 需先 release）"""
+        self._headers = None
+        for shm in [self._header_shm] + self._slots:
+            try:
+                shm.close()
+            except Exception:
+                pass
+
+
+class SharedFrameStore:
+    """
+    基于 multiprocessing.shared_memory 的共享帧存储（生产者侧）
+
+    固定数量的槽位，每个槽位一段共享内存；头部表记录每个槽位的帧编号、形状、时间戳、
+    原点和引用计数。put() 把帧写入空闲槽位（引用计数为 0），同一 key 的上一帧由存储
+    持有的引用随之释放；工作进程通过 SharedFrameReader 附加后按 SharedFrameRef 读取
+    零拷贝视图，用完 release，引用计数归零的槽位被循环使用。
+    """
+
+    def __init__(self, slot_count: int = DEFAULT_SLOT_COUNT, slot_bytes: int = DEFAULT_SLOT_BYTES,
+                 context: str = 'spawn'):
+        """
+        Args:
+            slot_count: 槽位数量
+            slot_bytes: 每个槽位的字节数（超过该大小的帧不写入）
+            context: 工作进程使用的 multiprocessing 启动方式（Windows 下只能是 spawn）
+        """
+        self.slot_count = int(slot_count)
+        self.slot_bytes = int(slot_bytes)
+        self._lock = multiprocessing.get_context(context).Lock()
+
+        self._header_shm = shared_memory.SharedMemory(create=True, size=HEADER_DTYPE.itemsize * self.slot_count)
+        self._headers = np.ndarray((self.slot_count,), dtype=HEADER_DTYPE, buffer=self._header_shm.buf)
+        self._headers[:] = 0
+        self._slots = [shared_memory.SharedMemory(create=True, size=self.slot_bytes)
+                       for _ in range(self.slot_count)]
+
+        self._owned = {}  # key -> 存储自身持有引用的槽位
+        self._owned_lock = threading.Lock()
+        self._next_slot = 0
+        self._closed = False
+
+        self.written = 0
+        self.skipped = 0
+
+    @property
+    def handle(self) -> SharedFrameHandle:
+        """传给工作进程的描述"""
+        return SharedFrameHandle(self._header_shm.name, [shm.name for shm in self._slots],
+                                 self.slot_bytes, self._lock)
+
+    def _acquire_free_slot(self) -> Optional[int]:
+        """查找引用计数为 0 的槽位并占用（调用方需持有 _lock）"""
+        for offset in range(self.slot_count):
+            slot = (self._next_slot + offset) % self.slot_count
+            if self._headers[slot]['refcount'] == 0:
+                self._headers[slot]['refcount'] = 1
+                self._headers[slot]['frame_id'] = -1
+                self._next_slot = (slot + 1) % self.slot_count
+                return slot
+        return None
+
+    def put(self, frame, key=None) -> Optional[SharedFrameRef]:
+        """
+        把帧写入共享内存
+
+        Args:
+            frame: Frame 截图帧
+            key: 帧来源标识（如截图框），同一 key 只保留最新一帧的存储引用
+
+        Returns:
+            SharedFrameRef: 帧引用，存储已关闭、帧过大或没有空闲槽位时返回 None
+        """
+        array = frame.array
+        if self._closed or array.nbytes > self.slot_bytes or array.dtype != np.uint8:
+            self.skipped += 1
+            return None
+
+        with self._lock:
+            slot = self._acquire_free_slot()
+        if slot is None:
+            self.skipped += 1
+            return None
+
+        target = np.ndarray(array.shape, dtype=np.uint8, buffer=self._slots[slot].buf)
+        target[...] = array
+        del target
+
+        height, width = array.shape[:2]
+        channels = array.shape[2] if array.ndim == 3 else 1
+        with self._lock:
+            header = self._headers[slot]
+            header['timestamp'] = frame.timestamp
+            header['height'] = height
+            header['width'] = width
+            header['channels'] = channels
+            header['origin_x'] = frame.origin[0]
+            header['origin_y'] = frame.origin[1]
+            header['frame_id'] = frame.frame_id
+
+        with self._owned_lock:
+            previous = self._owned.get(key)
+            self._owned[key] = slot
+        if previous is not None:
+            with self._lock:
+                self._headers[previous]['refcount'] -= 1
+
+        self.written += 1
+        return SharedFrameRef(slot, frame.frame_id)
+
+    def discard(self, key=None) -> None:
+        """释放存储对某个 key 最新一帧持有的引用（读取方用完后槽位即可复用）"""
+        with self._owned_lock:
+            slot = self._owned.pop(key, None)
+        if slot is not None and not self._closed:
+            with self._lock:
+                self._headers[slot]['refcount'] -= 1
+
+    def get_stats(self) -> dict:
+        """
+        获取存储统计信息
+
+        Returns:
+            dict: slot_count、slot_bytes、written（写入帧数）、skipped（未写入帧数）、
+                  refcounts（各槽位当前引用计数）
+        """
+        with self._lock:
+            refcounts = [int(count) for count in self._headers['refcount']]
+        return {
+            "slot_count": self.slot_count,
+            "slot_bytes": self.slot_bytes,
+            "written": self.written,
+            "skipped": self.skipped,
+            "refcounts": refcounts,
+        }
+
+    def close(self) -> None:
+        """释放并删除所有共享内存"""
+        if self._closed:
+            return
+        self._closed = True
+        self._headers = None
+        for shm in [self._header_shm] + self._slots:
+            try:
+                shm.close()
+                shm.unlink()
+            except Exception:
+                pass
+
+
+def _handoff_worker(conn, handle) -> None:
+    """基准测试工作进程：收到帧后读取一个像素并回复"""
+    reader = SharedFrameReader(handle) if handle is not None else None
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            if reader is not None and isinstance(message, SharedFrameRef):
+                view = reader.get(message)
+                value = int(view.array[0, 0, 0]) if view is not None else -1
+                if view is not None:
+                    view.release()
+            else:
+                value = int(np.asarray(pickle.loads(message))[0, 0, 0])
+            conn.send(value)
+    finally:
+        if reader is not None:
+            reader.close()
+
+
+def benchmark_frame_handoff(size=(1920, 1080), rounds: int = 20) -> dict:
+    """
+    对比把整帧交给工作进程的两种方式的延迟：pickle PIL 图像 vs 共享内存引用
+
+    Args:
+        size: 帧尺寸 (width, height)
+        rounds: 每种方式的交接次数
+
+    Returns:
+        dict: {"pickle": {...}, "shared_memory": {...}}，包含平均/最大交接延迟（毫秒）
+              和每次通过管道传输的字节数
+    """
+    from PIL import Image
+    from utils.frame import Frame
+
+    width, height = size
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels)
+
+    context = multiprocessing.get_context('spawn')
+    store = SharedFrameStore(slot_count=2, slot_bytes=pixels.nbytes)
+    results = {}
+
+    try:
+        for mode in ("pickle", "shared_memory"):
+            parent_conn, child_conn = context.Pipe()
+            handle = store.handle if mode == "shared_memory" else None
+            worker = context.Process(target=_handoff_worker, args=(child_conn, handle), daemon=True)
+            worker.start()
+
+            latencies = []
+            payload_bytes = 0
+            for index in range(rounds):
+                start = time.perf_counter()
+                if mode == "pickle":
+                    message = pickle.dumps(image, protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    frame = Frame(pixels)
+                    frame.frame_id = index + 1
+                    message = store.put(frame)
+                payload_bytes = len(message) if isinstance(message, bytes) else len(pickle.dumps(message))
+                parent_conn.send(message)
+                parent_conn.recv()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            parent_conn.send(None)
+            worker.join(timeout=5)
+
+            results[mode] = {
+                "avg_ms": sum(latencies) / len(latencies),
+                "max_ms": max(latencies),
+                "payload_bytes": payload_bytes,
+            }
+    finally:
+        store.close()
+
+    return results
@@ -4,6 +4,7 @@ import subprocess
 import pytesseract
 from tkinter import messagebox
 from PIL import Image
+from utils.recognition import get_ocr_engine
 
 
 class TesseractManager:
@@ -252,6 +253,8 @@ class TesseractManager:
             self.app.tesseract_path = new_path
             pytesseract.pytesseract.tesseract_cmd = new_path
             self.app.tesseract_available = True
+            # 关闭使用旧路径启动的 OCR 工作进程，下次识别时按新路径重新启动
+            get_ocr_engine().close()
 
             self.app.logging_manager.log_message(f"已设置Tesseract路径: {new_path}")
             self.app.status_var.set("就绪")
@@ -0,0 +1,416 @@
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+
+# 在留出语料上校准（calibrate_text_filter）：低于 1.0 的灵敏度会误跳过约 2% 的有文字区域，
+# 默认只跳过没有任何墨迹的图像
+DEFAULT_SENSITIVITY = 1.0
+FORCE_OCR_EVERY = 10  # 连续跳过该次数后强制识别一次，误判最多延迟这么多轮
+CALIBRATION_SEED = 1  # 校准语料的随机种子
+BENCHMARK_SEED = 0  # 评估语料（留出语料）的随机种子，与校准语料不重叠
+MIN_INK_RATIO = 0.002  # 墨迹像素占比下限，低于该值视为空白
+MAX_INK_RATIO = 0.45  # 文字的墨迹像素占比上限（少数类）
+MAX_REQUIRED_COMPONENTS = 4  # sensitivity 为 0 时要求的类文字连通域数量
+
+
+def _ink_mask(image) -> np.ndarray:
+    """
+    二值图像中的墨迹像素（少数类）
+
+    _preprocess_image 的输出只有 0/255，文字可能是白底黑字也可能是黑底白字，取像素较少的一类作为墨迹。
+    """
+    array = np.asarray(image)
+    if array.ndim == 3:
+        array = array[:, :, 0]
+    ink = array < 128
+    if np.count_nonzero(ink) * 2 > ink.size:
+        ink = ~ink
+    return ink
+
+
+def _text_components(ink: np.ndarray) -> Tuple[int, np.ndarray]:
+    """
+    统计连通域
+
+    Returns:
+        (连通域总数, 类文字连通域的高度数组)：类文字连通域的高度不小于 3 像素、不占满整行，
+        且填充率介于细笔画和实心块之间
+    """
+    height, width = ink.shape
+    if CV2_AVAILABLE:
+        count, _, stats, _ = cv2.connectedComponentsWithStats(ink.view(np.uint8), connectivity=8)
+        stats = stats[1:]
+        widths = stats[:, cv2.CC_STAT_WIDTH]
+        heights = stats[:, cv2.CC_STAT_HEIGHT]
+        areas = stats[:, cv2.CC_STAT_AREA]
+        total = count - 1
+    else:
+        # 无 OpenCV 时按列投影切分字形：每段连续含墨迹的列视为一个连通域；
+        # 先去掉几乎贯穿整行/整列的线条（界面边框、分隔线），否则所有列都会连成一段
+        ink = ink & (ink.mean(axis=1) < 0.9)[:, None] & (ink.mean(axis=0) < 0.9)[None, :]
+        columns = ink.any(axis=0)
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], columns, [False])).astype(np.int8)))
+        starts, ends = edges[0::2], edges[1::2]
+        widths = ends - starts
+        heights = np.array([np.ptp(np.flatnonzero(ink[:, start:end].any(axis=1))) + 1
+                            for start, end in zip(starts, ends)], dtype=np.int64)
+        areas = np.array([np.count_nonzero(ink[:, start:end]) for start, end in zip(starts, ends)],
+                         dtype=np.int64)
+        total = len(starts)
+
+    if not total:
+        return 0, np.zeros(0, dtype=np.int64)
+    fill = areas / np.maximum(1, widths * heights)
+    text_like = ((heights >= 3) & (areas >= 4) & (widths < width * 0.6) &
+                 (fill >= 0.08) & (fill <= 0.9))
+    return total, heights[text_like]
+
+
+def text_presence_stats(image) -> dict:
+    """
+    计算二值图像的笔画和连通域统计
+
+    Args:
+        image: _preprocess_image 输出的二值图像（PIL.Image 或 numpy.ndarray）
+
+    Returns:
+        dict: ink_ratio（墨迹占比）、stroke_width（水平方向平均笔画宽度）、
+              components（连通域数）、text_components（类文字连通域数）、
+              text_height（类文字连通域高度的中位数，即估计的字形高度）
+    """
+    ink = _ink_mask(image)
+    ink_count = np.count_nonzero(ink)
+    ink_ratio = ink_count / ink.size if ink.size else 0.0
+    if ink_count == 0:
+        return {"ink_ratio": 0.0, "stroke_width": 0.0, "components": 0, "text_components": 0,
+                "text_height": 0.0}
+
+    # 每行中墨迹段的起点数 = 水平笔画数
+    runs = np.count_nonzero(ink[:, 1:] & ~ink[:, :-1]) + np.count_nonzero(ink[:, 0])
+    components, text_heights = _text_components(ink)
+    if ink_ratio > 0.1:
+        # 渐变或色块背景被阈值分成两半时，文字可能属于多数类，两种极性都统计
+        components_inverse, text_heights_inverse = _text_components(~ink)
+        if len(text_heights_inverse) > len(text_heights):
+            components, text_heights = components_inverse, text_heights_inverse
+    return {
+        "ink_ratio": ink_ratio,
+        "stroke_width": ink_count / max(1, runs),
+        "components": components,
+        "text_components": len(text_heights),
+        "text_height": float(np.median(text_heights)) if len(text_heights) else 0.0,
+    }
+
+
+def segment_text_lines(image, min_gap: int = 2, min_height: int = 3, padding: int = 2) -> List[Tuple[int, int]]:
+    """
+    用水平投影把二值图像切分为文字行
+
+    每行的墨迹像素数构成投影曲线，连续的非空行组成一个文字行；间隔小于 min_gap 的行合并
+    （i、j 的点等），贯穿整行的线条（边框、分隔线）不计入投影。
+
+    Args:
+        image: _preprocess_image 输出的二值图像
+        min_gap: 两行之间的最小空白行数
+        min_height: 文字行的最小高度
+        padding: 每行上下扩展的像素数（Tesseract 需要少量边距）
+
+    Returns:
+        list: [(top, bottom), ...]，从上到下排列，bottom 不包含
+    """
+    ink = _ink_mask(image)
+    height, width = ink.shape
+    profile = np.count_nonzero(ink, axis=1)
+    rows = (profile > 0) & (profile < width * 0.9)
+    if not rows.any():
+        return []
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], rows, [False])).astype(np.int8)))
+    runs = []
+    for top, bottom in zip(edges[0::2], edges[1::2]):
+        if runs and top - runs[-1][1] < min_gap:
+            runs[-1][1] = bottom
+        else:
+            runs.append([top, bottom])
+
+    return [(max(0, int(top) - padding), min(height, int(bottom) + padding))
+            for top, bottom in runs if bottom - top >= min_height]
+
+
+class TextPresenceFilter:
+    """
+    文字存在性预过滤
+
+    OCR 之前对预处理后的二值图像做向量化的笔画/连通域统计，判断区域中明显没有文字
+    （空白、纯色背景、大块色块、噪点）时跳过 Tesseract 调用。
+    sensitivity 越高越倾向于认为有文字（误跳过更少、节省更少），1.0 只跳过完全空白的图像。
+    连续跳过 force_every 次后强制识别一次，误判的区域不会一直得不到识别；
+    计数按过滤器实例统计，每个识别组应使用自己的实例。
+    """
+
+    def __init__(self, sensitivity: float = DEFAULT_SENSITIVITY, enabled: bool = True,
+                 force_every: int = FORCE_OCR_EVERY):
+        """
+        Args:
+            sensitivity: 灵敏度 0.0-1.0
+            enabled: 是否启用（禁用时 has_text 总是返回 True）
+            force_every: 连续跳过多少次后强制识别一次，0 表示不强制
+        """
+        self.sensitivity = sensitivity
+        self.enabled = enabled
+        self.force_every = max(0, int(force_every))
+        self._lock = threading.Lock()
+        self._consecutive_skips = 0
+        self.checked = 0
+        self.skipped = 0
+        self.forced = 0
+        self.elapsed = 0.0
+
+    @property
+    def sensitivity(self) -> float:
+        return self._sensitivity
+
+    @sensitivity.setter
+    def sensitivity(self, value: float) -> None:
+        self._sensitivity = min(1.0, max(0.0, float(value)))
+
+    def classify(self, stats: dict) -> bool:
+        """根据统计信息判断是否可能有文字"""
+        if stats["ink_ratio"] <= 0:
+            return False
+        if self._sensitivity >= 1.0:
+            return True
+
+        loosen = 1.0 + self._sensitivity * 2
+        if stats["ink_ratio"] < MIN_INK_RATIO / loosen or stats["ink_ratio"] > MAX_INK_RATIO * loosen:
+            return False
+        required = max(1, int(round(MAX_REQUIRED_COMPONENTS * (1.0 - self._sensitivity))))
+        return stats["text_components"] >= required
+
+    def has_text(self, image) -> bool:
+        """
+        判断图像中是否可能有文字
+
+        Args:
+            image: _preprocess_image 输出的二值图像
+
+        Returns:
+            bool: False 表示可以跳过 OCR（连续跳过达到 force_every 次时返回 True）
+        """
+        if not self.enabled:
+            return True
+
+        start = time.perf_counter()
+        present = self.classify(text_presence_stats(image))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.checked += 1
+            self.elapsed += elapsed
+            if present:
+                self._consecutive_skips = 0
+            elif self.force_every and self._consecutive_skips + 1 >= self.force_every:
+                self._consecutive_skips = 0
+                self.forced += 1
+                present = True
+            else:
+                self._consecutive_skips += 1
+                self.skipped += 1
+        return present
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: checked、skipped、forced（强制识别次数）、skip_rate、avg_ms（平均判断耗时）
+        """
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "skipped": self.skipped,
+                "forced": self.forced,
+                "skip_rate": self.skipped / self.checked if self.checked else 0.0,
+                "avg_ms": self.elapsed * 1000 / self.checked if self.checked else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.checked = self.skipped = self.forced = 0
+            self._consecutive_skips = 0
+            self.elapsed = 0.0
+
+    def format_stats(self) -> str:
+        """生成用于日志的统计摘要"""
+        stats = self.get_stats()
+        return (f"文字预过滤: 检查 {stats['checked']} 次, 跳过OCR {stats['skipped']} 次 "
+                f"({stats['skip_rate']:.1%}), 强制识别 {stats['forced']} 次, 平均耗时 {stats['avg_ms']:.3f}ms")
+
+
+def _load_font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow 10.1 之前的默认字体不支持字号
+        return ImageFont.load_default()
+
+
+def _synthetic_background(rng, width: int, height: int) -> Image.Image:
+    kind = rng.integers(0, 5)
+    if kind == 0:
+        array = np.full((height, width), rng.integers(0, 256), dtype=np.uint8)
+    elif kind == 1:
+        start, end = rng.integers(0, 256, 2)
+        array = np.linspace(start, end, width, dtype=np.float32)[None, :].repeat(height, axis=0).astype(np.uint8)
+    elif kind == 2:
+        base = rng.integers(40, 216)
+        array = np.clip(base + rng.normal(0, 12, (height, width)), 0, 255).astype(np.uint8)
+    elif kind == 3:
+        # 大块色块（按钮、图标底色）
+        array = np.full((height, width), rng.integers(0, 256), dtype=np.uint8)
+        x0, y0 = rng.integers(0, max(1, width // 2)), rng.integers(0, max(1, height // 2))
+        array[y0:y0 + height // 2, x0:x0 + width // 3] = rng.integers(0, 256)
+    else:
+        # 界面边框
+        array = np.full((height, width), rng.integers(150, 256), dtype=np.uint8)
+        array[[0, -1], :] = 20
+        array[:, [0, -1]] = 20
+    return Image.fromarray(array).convert('RGB')
+
+
+def build_text_corpus(samples: int = 200, size=(200, 40), seed: int = 0) -> List[Tuple[Image.Image, bool]]:
+    """
+    生成合成语料：随机背景上有/无随机文字的区域截图（各占一半）
+
+    Args:
+        samples: 样本数量
+        size: 区域尺寸 (width, height)
+        seed: 随机种子
+
+    Returns:
+        list: [(RGB 图像, 是否有文字), ...]
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    corpus = []
+    for index in range(samples):
+        image = _synthetic_background(rng, width, height)
+        has_text = index % 2 == 0
+        if has_text:
+            font = _load_font(int(rng.integers(max(8, height // 3), max(9, height - 6))))
+            text = "".join(rng.choice(list(alphabet), int(rng.integers(2, 12))))
+            background = np.asarray(image.convert('L')).mean()
+            color = 255 if background < 128 else 0
+            ImageDraw.Draw(image).text((int(rng.integers(0, width // 4)), 2), text,
+                                       fill=(color, color, color), font=font)
+            if rng.random() < 0.3:
+                image = image.filter(ImageFilter.GaussianBlur(0.6))
+        corpus.append((image, has_text))
+    return corpus
+
+
+def calibrate_text_filter(corpus=None, holdout=None, max_false_skip: float = 0.01,
+                          candidates=(0.0, 0.2, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)) -> dict:
+    """
+    在校准语料上选择灵敏度，并在留出语料上评估选定的灵敏度
+
+    选择误跳过率不超过 max_false_skip 的最低灵敏度（跳过最多无文字样本）。校准语料和留出语料
+    使用不同的随机种子，留出语料上的结果才能反映实际的误跳过率。
+
+    Args:
+        corpus: 校准语料 [(图像, 是否有文字), ...]，None 表示 build_text_corpus(seed=CALIBRATION_SEED)
+        holdout: 留出语料，None 表示 build_text_corpus(seed=BENCHMARK_SEED)
+        max_false_skip: 允许的误跳过率（有文字却被跳过的比例）
+        candidates: 候选灵敏度
+
+    Returns:
+        dict: {"sensitivity": 选定的灵敏度, "results": {灵敏度: 校准语料上的结果},
+               "holdout": 选定灵敏度在留出语料上的结果}
+    """
+    from utils.image import _preprocess_image
+
+    corpus = corpus if corpus is not None else build_text_corpus(seed=CALIBRATION_SEED)
+    holdout = holdout if holdout is not None else build_text_corpus(seed=BENCHMARK_SEED)
+    stats = [(text_presence_stats(_preprocess_image(image)), has_text) for image, has_text in corpus]
+
+    results = {}
+    chosen = 1.0
+    for sensitivity in sorted(candidates):
+        text_filter = TextPresenceFilter(sensitivity)
+        results[sensitivity] = _score(text_filter, stats)
+        if results[sensitivity]["false_skip_rate"] <= max_false_skip and chosen == 1.0:
+            chosen = sensitivity
+
+    holdout_stats = [(text_presence_stats(_preprocess_image(image)), has_text) for image, has_text in holdout]
+    return {"sensitivity": chosen, "results": results,
+            "holdout": _score(TextPresenceFilter(chosen), holdout_stats)}
+
+
+def _score(text_filter: TextPresenceFilter, stats) -> dict:
+    text_total = sum(1 for _, has_text in stats if has_text)
+    blank_total = len(stats) - text_total
+    false_skips = sum(1 for item, has_text in stats if has_text and not text_filter.classify(item))
+    true_skips = sum(1 for item, has_text in stats if not has_text and not text_filter.classify(item))
+    return {
+        "false_skip_rate": false_skips / text_total if text_total else 0.0,
+        "blank_skip_rate": true_skips / blank_total if blank_total else 0.0,
+    }
+
+
+def benchmark_text_prefilter(samples: int = 200, size=(200, 40), sensitivity: float = DEFAULT_SENSITIVITY,
+                             ocr_ms: Optional[float] = None, seed: int = BENCHMARK_SEED) -> dict:
+    """
+    在合成语料上评估预过滤的准确率和节省的 CPU 时间（不含强制识别）
+
+    Args:
+        samples: 语料样本数（有/无文字各半）
+        size: 区域尺寸 (width, height)
+        sensitivity: 灵敏度
+        ocr_ms: 单次 OCR 耗时（毫秒），None 时在 tesseract 可用的情况下实测，否则按 100ms 估算
+        seed: 语料随机种子，默认与 calibrate_text_filter 的校准语料不同
+
+    Returns:
+        dict: false_skip_rate（有文字被跳过的比例）、blank_skip_rate（无文字被跳过的比例）、
+              filter_ms（单次判断平均耗时）、ocr_ms、saved_ms（整个语料节省的 OCR 时间，已扣除判断耗时）
+    """
+    from utils.image import _preprocess_image
+
+    corpus = build_text_corpus(samples, size, seed)
+    images = [(_preprocess_image(image), has_text) for image, has_text in corpus]
+    text_filter = TextPresenceFilter(sensitivity, force_every=0)
+
+    start = time.perf_counter()
+    decisions = [text_filter.has_text(image) for image, _ in images]
+    filter_ms = (time.perf_counter() - start) * 1000 / len(images)
+
+    if ocr_ms is None:
+        ocr_ms = 100.0
+        try:
+            from utils.recognition import get_ocr_engine
+            engine = get_ocr_engine()
+            start = time.perf_counter()
+            for image, _ in images[:10]:
+                engine.image_to_data(image)
+            ocr_ms = (time.perf_counter() - start) * 1000 / min(10, len(images))
+        except Exception:
+            pass
+
+    text_total = sum(1 for _, has_text in images if has_text)
+    blank_total = len(images) - text_total
+    false_skips = sum(1 for (_, has_text), present in zip(images, decisions) if has_text and not present)
+    skipped = decisions.count(False)
+    return {
+        "false_skip_rate": false_skips / text_total if text_total else 0.0,
+        "blank_skip_rate": (skipped - false_skips) / blank_total if blank_total else 0.0,
+        "filter_ms": filter_ms,
+        "ocr_ms": ocr_ms,
+        "saved_ms": skipped * ocr_ms - filter_ms * len(images),
+    }
@@ -1,10 +1,20 @@
 import ctypes
-import win32gui
-import win32ui
-import win32con
+import threading
+import time
 from PIL import Image
 from typing import Optional, List, Tuple
 
+from utils.capture import WindowCaptureBackend
+from utils.frame import Frame
+
+try:
+    import win32gui
+    import win32ui
+    import win32con
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
 
 def find_window_by_title(keyword: str) -> Optional[int]:
     """
@@ -230,6 +240,43 @@ def capture_window(hwnd: int) -> Optional[Image.Image]:
             pass
 
 
+class Win32WindowCaptureBackend(WindowCaptureBackend):
+    """PrintWindow 窗口截图后端（默认）"""
+    
+    name = "printwindow"
+    
+    def capture_window(self, hwnd: int):
+        if not WIN32_AVAILABLE:
+            return None
+        return capture_window(hwnd)
+
+
+_window_capture_backend = None
+_window_capture_backend_lock = threading.Lock()
+
+
+def get_window_capture_backend() -> WindowCaptureBackend:
+    """获取当前窗口截图后端"""
+    global _window_capture_backend
+    if _window_capture_backend is None:
+        with _window_capture_backend_lock:
+            if _window_capture_backend is None:
+                _window_capture_backend = Win32WindowCaptureBackend()
+    return _window_capture_backend
+
+
+def set_window_capture_backend(backend: Optional[WindowCaptureBackend]) -> None:
+    """
+    替换窗口截图后端
+    
+    Args:
+        backend: WindowCaptureBackend 实例（如 FrameWindowCaptureBackend），None 表示恢复默认
+    """
+    global _window_capture_backend
+    with _window_capture_backend_lock:
+        _window_capture_backend = backend
+
+
 def capture_window_region(hwnd: int, region: tuple) -> Optional[Image.Image]:
     """
     后台截图指定区域
@@ -244,7 +291,7 @@ def capture_window_region(hwnd: int, region: tuple) -> Optional[Image.Image]:
     if not hwnd or not region:
         return None
     
-    full_image = capture_window(hwnd)
+    full_image = get_window_capture_backend().capture_window(hwnd)
     if full_image is None:
         return None
     
@@ -265,6 +312,142 @@ def capture_window_region(hwnd: int, region: tuple) -> Optional[Image.Image]:
         return None
 
 
+class WindowCaptureService:
+    """
+    按窗口合并的后台截图服务
+    
+    同一窗口在一个 tick（帧龄不超过 max_age）内最多截图一次，绑定到该窗口的所有监控组
+    共享这一帧并各自裁剪区域；同时到达的请求只有一个线程真正截图，其他线程等待结果。
+    窗口 API 调用通过 WindowCaptureBackend 接口完成，可注入伪造的窗口来源。
+    """
+    
+    DEFAULT_TICK = 1.0
+    INFLIGHT_WAIT_TIMEOUT = 5.0
+    
+    def __init__(self, backend: WindowCaptureBackend = None, tick: float = DEFAULT_TICK):
+        """
+        Args:
+            backend: 窗口截图后端，None 表示使用全局后端（get_window_capture_backend）
+            tick: 默认可接受的最大帧龄（秒）
+        """
+        self.backend = backend
+        self.tick = tick
+        
+        self._frames = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        
+        self.captures = 0
+        self.hits = 0
+    
+    def _capture(self, hwnd: int) -> Optional[Frame]:
+        backend = self.backend or get_window_capture_backend()
+        start = time.monotonic()
+        image = backend.capture_window(hwnd)
+        if image is None:
+            return None
+        
+        frame = Frame.from_image(image)
+        frame.timestamp = time.monotonic()
+        frame.capture_duration = frame.timestamp - start
+        return frame
+    
+    def get_window_frame(self, hwnd: int, max_age: float = None) -> Optional[Frame]:
+        """
+        获取窗口截图帧（窗口相对坐标，原点为 (0, 0)）
+        
+        Args:
+            hwnd: 窗口句柄
+            max_age: 可接受的最大帧龄（秒），None 表示使用 tick
+        
+        Returns:
+            Frame: 窗口截图帧，失败返回 None
+        """
+        if not hwnd:
+            return None
+        if max_age is None:
+            max_age = self.tick
+        
+        with self._lock:
+            cached = self._frames.get(hwnd)
+            if cached is not None and cached.age < max_age:
+                self.hits += 1
+                return cached
+            
+            inflight = self._inflight.get(hwnd)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = threading.Event()
+                self._inflight[hwnd] = inflight
+                self.captures += 1
+        
+        if not is_owner:
+            inflight.wait(self.INFLIGHT_WAIT_TIMEOUT)
+            with self._lock:
+                self.hits += 1
+                return self._frames.get(hwnd)
+        
+        try:
+            try:
+                frame = self._capture(hwnd)
+            except Exception:
+                frame = None
+            
+            with self._lock:
+                if frame is not None:
+                    self._frames[hwnd] = frame
+                else:
+                    self._frames.pop(hwnd, None)
+            return frame
+        finally:
+            with self._lock:
+                self._inflight.pop(hwnd, None)
+            inflight.set()
+    
+    def capture_region(self, hwnd: int, region: tuple, max_age: float = None):
+        """
+        获取窗口区域
+        
+        Args:
+            hwnd: 窗口句柄
+            region: 区域坐标 (x1, y1, x2, y2)，窗口相对坐标
+            max_age: 可接受的最大帧龄（秒），None 表示使用 tick
+        
+        Returns:
+            FrameRegion: 区域对象（同一帧同一区域在各组间共享），失败返回 None
+        """
+        if not region:
+            return None
+        
+        frame = self.get_window_frame(hwnd, max_age)
+        if frame is None:
+            return None
+        
+        try:
+            x1, y1, x2, y2 = (int(value) for value in region)
+        except (TypeError, ValueError):
+            return None
+        return frame.region((x1, y1, x2, y2))
+    
+    def invalidate(self, hwnd: int = None) -> None:
+        """丢弃缓存的窗口帧，hwnd 为 None 时丢弃全部"""
+        with self._lock:
+            if hwnd is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(hwnd, None)
+    
+    def get_stats(self) -> dict:
+        """
+        获取统计信息
+        
+        Returns:
+            dict: captures（实际截图次数）、hits（共享已有截图的次数）、windows（缓存的窗口数）
+        """
+        with self._lock:
+            return {"captures": self.captures, "hits": self.hits, "windows": len(self._frames)}
+
+
 def get_window_size(hwnd: int) -> Optional[Tuple[int, int]]:
     """
     获取窗口尺寸